@@ -1,15 +1,32 @@
 # api/main.py
-from fastapi import FastAPI, UploadFile, File
-from fastapi.responses import JSONResponse
+from fastapi import FastAPI, UploadFile, File, Query
+from fastapi.responses import JSONResponse, PlainTextResponse, StreamingResponse
 from pathlib import Path
-import shutil
+import io
+import json
 import logging
+import math
 import os
 import asyncpg
 import asyncio
-import re
+import time
+import uuid
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import asynccontextmanager
+import anyio
 import pandas as pd
+import pyarrow as pa
 from dateutil import tz
+import sys
+
+# Módulos compartidos con el pipeline (carpeta pipeline/)
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "pipeline"))
+from cobertura import COBERTURA_FILE, obtener_cobertura  # noqa: E402
+from datohorario import leer_datohorario  # noqa: E402
+from estaciones import ANCHO_NOMBRE, obtener_catalogo  # noqa: E402
+from metricas import AgregadorMetricas  # noqa: E402
+from provincias import MULTIPROVINCIA, PROVINCIAS, particion_provincia  # noqa: E402
+from submuestreo import filas_lttb  # noqa: E402
 
 app = FastAPI()
 
@@ -22,58 +39,125 @@ logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger("uvicorn")
 
 # --- Config ---
+# Una provincia (PROVINCIA_OBJETIVO) o varias (PROVINCIAS, separadas por comas)
 provincia_env = os.getenv("PROVINCIA_OBJETIVO")
-if not provincia_env:
+if not provincia_env and not PROVINCIAS:
     raise RuntimeError("❌ La variable de entorno PROVINCIA_OBJETIVO no está definida")
-PROVINCIA_OBJETIVO = provincia_env.strip()
+PROVINCIAS_OBJETIVO = PROVINCIAS or [provincia_env.strip()]
 
 BASE_DIR = Path(".").resolve()
 RAW_DIR = BASE_DIR / "data" / "raw"
 ESTACIONES_FILE = RAW_DIR / "estaciones" / "estaciones_smn.txt"
+# Agregados continuos diarios/mensuales (db/init/03_agregados_smn.sql) y su período
+AGREGADOS = {"smn_obs_diario": "D", "smn_obs_mensual": "M"}
 LOCAL_TZ = tz.gettz("America/Argentina/Buenos_Aires")
 SIM_DELAY_MS = 250
 
-# --- Funciones utilitarias ---
-def cargar_estaciones_provincia(provincia):
-    with open(ESTACIONES_FILE, "r", encoding="latin1") as f:
-        lines = f.readlines()[2:]  # omite encabezados
-
-    pattern = re.compile(
-        r"^(?P<nombre>.+?)\s{2,}(?P<provincia>.+?)\s{2,}(?P<lat_gr>-?\d+)\s+(?P<lat_min>\d+)\s+(?P<lon_gr>-?\d+)\s+(?P<lon_min>\d+)\s+(?P<altura_m>\d+)\s+(?P<numero>\d+)\s+(?P<numero_oaci>\S+)\s*$"
+# Subida de archivos en bloques (no bloquea el event loop mientras se escribe a disco)
+TAMANIO_BLOQUE = 1024 * 1024
+# Procesos que parsean datohorario fuera del event loop
+PARSEO_WORKERS = int(os.getenv("PARSEO_WORKERS", "2"))
+
+# Pool de conexiones a PostgreSQL (compartido por todos los requests)
+PG_POOL_MIN = int(os.getenv("PG_POOL_MIN", "1"))
+PG_POOL_MAX = int(os.getenv("PG_POOL_MAX", "10"))
+# Sentencias preparadas que cachea cada conexión del pool (se reutilizan entre requests)
+PG_STATEMENT_CACHE = int(os.getenv("PG_STATEMENT_CACHE", "100"))
+
+# Columnas de smn_obs que se cargan desde datohorario
+COLUMNAS_OBS = ["estacion_nombre", "fecha_hora", "temp_c", "hum_pct", "pnm_hpa", "wind_dir_deg", "wind_speed_kmh"]
+
+# Inserción fila a fila (sentencia preparada que reutiliza cada conexión del pool)
+SQL_INSERT_OBS = """
+    INSERT INTO smn_obs (
+      estacion_nombre, fecha_hora, temp_c, hum_pct, pnm_hpa, wind_dir_deg, wind_speed_kmh
+    ) VALUES (
+      $1, $2, $3, $4, $5, $6, $7
     )
+    ON CONFLICT (estacion_nombre, fecha_hora) DO NOTHING
+"""
+
+# Tabla temporal de la transacción para la carga masiva con COPY
+SQL_STAGING = """
+    CREATE TEMP TABLE smn_obs_staging (
+      estacion_nombre TEXT,
+      fecha_hora      TIMESTAMPTZ,
+      temp_c          DOUBLE PRECISION,
+      hum_pct         DOUBLE PRECISION,
+      pnm_hpa         DOUBLE PRECISION,
+      wind_dir_deg    DOUBLE PRECISION,
+      wind_speed_kmh  DOUBLE PRECISION
+    ) ON COMMIT DROP
+"""
+
+SQL_UPSERT_STAGING = """
+    INSERT INTO smn_obs (
+      estacion_nombre, fecha_hora, temp_c, hum_pct, pnm_hpa, wind_dir_deg, wind_speed_kmh
+    )
+    SELECT DISTINCT ON (estacion_nombre, fecha_hora)
+      estacion_nombre, fecha_hora, temp_c, hum_pct, pnm_hpa, wind_dir_deg, wind_speed_kmh
+    FROM smn_obs_staging
+    ORDER BY estacion_nombre, fecha_hora
+    ON CONFLICT (estacion_nombre, fecha_hora) DO NOTHING
+"""
+
+# Lectura de series: variable de smn_obs → (promedio, valores promediados) en el agregado diario (smn_obs_diario)
+VARIABLES_SERIE = {
+    "temp_c": ("temp_mean", "temp_obs"),
+    "hum_pct": ("hum_mean", "hum_obs"),
+    "pnm_hpa": ("pnm_mean", "pnm_obs"),
+    "wind_dir_deg": ("wind_dir_mean", "wind_dir_obs"),
+    "wind_speed_kmh": ("wind_speed_mean", "wind_speed_obs"),
+}
+PUNTOS_MAX = 5000
+LOTE_RESPUESTA = 1000  # filas por bloque de la respuesta en streaming
+ZONA_BUCKETS = "America/Argentina/Buenos_Aires"  # mismos cortes que los agregados continuos
+# LTTB elige entre FACTOR_LTTB × puntos buckets previos (la consulta nunca trae la serie cruda completa)
+FACTOR_LTTB = 4
+
+SQL_SERIE_HORARIA = """
+    SELECT time_bucket($4::interval, fecha_hora, '{zona}') AS fecha_hora, {columnas}
+    FROM smn_obs
+    WHERE estacion_nombre = $1 AND fecha_hora >= $2 AND fecha_hora < $3
+    GROUP BY 1
+    ORDER BY 1
+"""
+
+# Buckets de un día o más: desde el agregado diario, promediando cada día según sus valores de la variable
+SQL_SERIE_DIARIA = """
+    SELECT time_bucket($4::interval, fecha, '{zona}') AS fecha_hora, {columnas}
+    FROM smn_obs_diario
+    WHERE estacion_nombre = $1 AND fecha >= $2 AND fecha < $3
+    GROUP BY 1
+    ORDER BY 1
+"""
+
+# Horizonte de la política de retención de smn_obs (NULL sin política): antes de ese instante los
+# datos horarios se borran y los agregados guardan la única copia de la historia
+SQL_HORIZONTE_RETENCION = """
+    SELECT now() - (config->>'drop_after')::interval
+    FROM timescaledb_information.jobs
+    WHERE proc_name = 'policy_retention' AND hypertable_name = 'smn_obs'
+"""
 
-    data = [match.groupdict() for line in lines if (match := pattern.match(line))]
-    df = pd.DataFrame(data)
-    df['provincia'] = df['provincia'].str.strip().str.upper()
-    return df[df['provincia'] == provincia.upper()]['nombre'].str.strip().unique()
-
-def leer_y_filtrar_datohorario(archivo_txt: Path, provincia_objetivo: str) -> pd.DataFrame:
-    estaciones_prov = cargar_estaciones_provincia(provincia_objetivo)
-    logger.info(f"📍 Estaciones en {provincia_objetivo} ({len(estaciones_prov)}): {list(estaciones_prov)}")
-
-    with open(archivo_txt, "r", encoding="latin1") as f:
-        lines = f.readlines()
-
-    columnas = re.split(r"\s{2,}", lines[0].strip())
-    data = [
-        re.split(r"\s{2,}", line.strip(), maxsplit=len(columnas)-1)
-        for line in lines[2:]  # omite encabezado + unidades
-        if len(line.strip()) > 0 and not line.isspace()
-    ]
-
-    df = pd.DataFrame(data, columns=columnas)
-    df.columns = df.columns.str.strip()
-    df["NOMBRE"] = df["NOMBRE"].str.strip()
-
-    # Filtrar por estaciones de la provincia
-    nombres_provincia = set(estaciones_prov)
-    df = df[df["NOMBRE"].isin(nombres_provincia)]
-
-    # Datetime: DDMMYYYY + HH (zero-pad)
-    df["fecha_hora"] = pd.to_datetime(
-        df["FECHA"].astype(str) + df["HORA"].astype(str).str.zfill(2),
-        format="%d%m%Y%H",
-        errors="coerce",
+# --- Funciones utilitarias ---
+def cargar_estaciones_provincias(provincias):
+    # Catálogo compartido con el pipeline: se relee solo si cambia estaciones_smn.txt
+    catalogo = obtener_catalogo(ESTACIONES_FILE)
+    return [estacion for provincia in provincias for estacion in catalogo.estaciones_provincia(provincia)]
+
+def leer_y_filtrar_datohorario(archivo_txt: Path, provincias: list[str]) -> pd.DataFrame:
+    estaciones_prov = cargar_estaciones_provincias(provincias)
+    logger.info(f"📍 Estaciones en {', '.join(provincias)} ({len(estaciones_prov)}): {list(estaciones_prov)}")
+
+    # Lectura de ancho fijo tipada, filtrando por las estaciones de las provincias
+    df = leer_datohorario(archivo_txt, estaciones_prov, ANCHO_NOMBRE)
+
+    # Datetime: FECHA + HORA en hora local de Argentina (el instante real, no la hora local como UTC:
+    # los agregados continuos cortan los días en hora local). Las horas inexistentes o ambiguas de
+    # los cambios de horario de 2007-2009 quedan sin fecha y se descartan abajo.
+    df["fecha_hora"] = (df["FECHA"] + pd.to_timedelta(df["HORA"], unit="h")).dt.tz_localize(
+        LOCAL_TZ, ambiguous="NaT", nonexistent="NaT"
     )
 
     # Renombrar a nombres de columnas de la tabla
@@ -89,14 +173,9 @@ def leer_y_filtrar_datohorario(archivo_txt: Path, provincia_objetivo: str) -> pd
         inplace=True,
     )
 
-    # ---- Tipar numéricos ----
+    # Valores faltantes como None (NULL en la base, no NaN)
     for c in ["temp_c", "hum_pct", "pnm_hpa", "wind_dir_deg", "wind_speed_kmh"]:
-        df[c] = (
-            df[c]
-            .astype(str)
-            .str.replace(",", ".", regex=False)
-            .pipe(pd.to_numeric, errors="coerce")
-        )
+        df[c] = df[c].astype(object).where(df[c].notna(), None)
 
     # Quitar filas sin fecha válida
     df = df[df["fecha_hora"].notna()]
@@ -112,65 +191,129 @@ def leer_y_filtrar_datohorario(archivo_txt: Path, provincia_objetivo: str) -> pd
             "wind_speed_kmh",
         ]
     ]
-    
-async def insertar_uno_a_uno_async(df: pd.DataFrame, delay_ms: int = 250, limit: int = 0) -> dict:
-    total = len(df) if limit <= 0 else min(limit, len(df))
-    insertados = 0
-    omitidos = 0
-    delay_s = max(0, delay_ms) / 1000.0
 
-    logger.info(f"📡 Conectando a PostgreSQL en {os.getenv('PG_HOST')}:{os.getenv('PG_PORT')}...")
-    conn = await asyncpg.connect(
+# Parseo completo de un archivo (se ejecuta en un proceso del pool de parseo)
+def parsear_datohorario(archivo_txt: Path, provincias: list[str]) -> pd.DataFrame:
+    df = leer_y_filtrar_datohorario(archivo_txt, provincias)
+    return df.sort_values("fecha_hora")
+
+# Escritura del archivo subido en bloques, sin bloquear el event loop
+async def guardar_upload(file: UploadFile, destino: Path) -> int:
+    total = 0
+    async with await anyio.open_file(destino, "wb") as buffer:
+        while bloque := await file.read(TAMANIO_BLOQUE):
+            await buffer.write(bloque)
+            total += len(bloque)
+    return total
+
+async def crear_pool_db():
+    logger.info(f"📡 Creando pool de PostgreSQL en {os.getenv('PG_HOST')}:{os.getenv('PG_PORT')} ({PG_POOL_MIN}-{PG_POOL_MAX} conexiones)...")
+    return await asyncpg.create_pool(
         host=os.getenv("PG_HOST"),
         port=int(os.getenv("PG_PORT")),
         user=os.getenv("PG_USER"),
         password=os.getenv("PG_PASSWORD"),
-        database=os.getenv("PG_DB")
+        database=os.getenv("PG_DB"),
+        min_size=PG_POOL_MIN,
+        max_size=PG_POOL_MAX,
+        statement_cache_size=PG_STATEMENT_CACHE,
     )
-    logger.info(f"✅ Conectado. Insertando {total} registros...")
 
-    sql_insert = """
-        INSERT INTO smn_obs (
-          estacion_nombre, fecha_hora, temp_c, hum_pct, pnm_hpa, wind_dir_deg, wind_speed_kmh
-        ) VALUES (
-          $1, $2, $3, $4, $5, $6, $7
-        )
-        ON CONFLICT (estacion_nombre, fecha_hora) DO NOTHING
-    """
+# Tiempos de espera para obtener una conexión del pool
+estadisticas_pool = {
+    "adquisiciones": 0,
+    "esperando": 0,
+    "espera_total_ms": 0.0,
+    "espera_max_ms": 0.0,
+}
+
+# Errores de conexión a la base (no se pudo crear el pool o se cayó la conexión), a diferencia de
+# los errores de un registro o una sentencia
+ERRORES_CONEXION = (OSError, asyncio.TimeoutError, asyncpg.PostgresConnectionError, asyncpg.InterfaceError)
+
+# El pool se crea al iniciar la API; si la base no respondía, en el primer request que la use.
+# Cualquier error al crearlo (también credenciales o base inexistente) es un error de conexión.
+async def obtener_pool():
+    if app.state.pool is None:
+        async with app.state.pool_lock:
+            if app.state.pool is None:
+                try:
+                    app.state.pool = await crear_pool_db()
+                except asyncpg.PostgresError as e:
+                    raise ConnectionError(str(e)) from e
+    return app.state.pool
+
+@asynccontextmanager
+async def conexion_db():
+    pool = await obtener_pool()
+    inicio = time.perf_counter()
+    estadisticas_pool["esperando"] += 1
+    try:
+        conn = await pool.acquire()
+    finally:
+        estadisticas_pool["esperando"] -= 1
+
+    espera_ms = (time.perf_counter() - inicio) * 1000
+    estadisticas_pool["adquisiciones"] += 1
+    estadisticas_pool["espera_total_ms"] += espera_ms
+    estadisticas_pool["espera_max_ms"] = max(estadisticas_pool["espera_max_ms"], espera_ms)
+    try:
+        yield conn
+    finally:
+        await pool.release(conn)
+
+async def insertar_uno_a_uno_async(df: pd.DataFrame, delay_ms: int = 250, limit: int = 0) -> dict:
+    total = len(df) if limit <= 0 else min(limit, len(df))
+    insertados = 0
+    omitidos = 0
+    delay_s = max(0, delay_ms) / 1000.0
+    # Rango de fecha_hora de las filas insertadas, para refrescar los agregados al terminar
+    desde = hasta = None
+
+    logger.info(f"✅ Insertando {total} registros...")
 
     try:
         count = 0
         for _, r in df.iterrows():
+            # Mensaje detallado por registro
+            detalle = (
+                f"🕒 {r['fecha_hora']} | "
+                f"📍 {r['estacion_nombre']} | "
+                f"🌡️ Temp: {r.get('temp_c')}°C | "
+                f"💧 Hum: {r.get('hum_pct')}% | "
+                f"🌬️  Presión: {r.get('pnm_hpa')} hPa | "
+                f"🧭 Dir. viento: {r.get('wind_dir_deg')}° | "
+                f"💨 Vel. viento: {r.get('wind_speed_kmh')} km/h"
+            )
+
             try:
-                result = await conn.execute(
-                    sql_insert,
-                    r["estacion_nombre"],
-                    r["fecha_hora"].to_pydatetime(),
-                    r.get("temp_c"),
-                    r.get("hum_pct"),
-                    r.get("pnm_hpa"),
-                    r.get("wind_dir_deg"),
-                    r.get("wind_speed_kmh")
-                )
-
-                # Mensaje detallado por registro
-                detalle = (
-                    f"🕒 {r['fecha_hora']} | "
-                    f"📍 {r['estacion_nombre']} | "
-                    f"🌡️ Temp: {r.get('temp_c')}°C | "
-                    f"💧 Hum: {r.get('hum_pct')}% | "
-                    f"🌬️  Presión: {r.get('pnm_hpa')} hPa | "
-                    f"🧭 Dir. viento: {r.get('wind_dir_deg')}° | "
-                    f"💨 Vel. viento: {r.get('wind_speed_kmh')} km/h"
-                )
-
-                if result and result.startswith("INSERT"):
+                # Se toma una conexión por registro para no retenerla durante la demora;
+                # la sentencia preparada queda en el cache de cada conexión del pool
+                async with conexion_db() as conn:
+                    result = await conn.execute(
+                        SQL_INSERT_OBS,
+                        r["estacion_nombre"],
+                        r["fecha_hora"].to_pydatetime(),
+                        r.get("temp_c"),
+                        r.get("hum_pct"),
+                        r.get("pnm_hpa"),
+                        r.get("wind_dir_deg"),
+                        r.get("wind_speed_kmh")
+                    )
+
+                if result and result.startswith("INSERT 0 1"):
                     insertados += 1
+                    desde = r["fecha_hora"] if desde is None else min(desde, r["fecha_hora"])
+                    hasta = r["fecha_hora"] if hasta is None else max(hasta, r["fecha_hora"])
                     logger.info(f"✅ Insertado → {detalle}")
                 else:
                     omitidos += 1
                     logger.info(f"⚠️ Omitido (duplicado/conflicto) → {detalle}")
 
+            except ERRORES_CONEXION as ex:
+                # Sin base no tiene sentido seguir reintentando registro por registro
+                logger.error(f"❌ Sin conexión a PostgreSQL en → {detalle} | Error: {ex}")
+                raise
             except Exception as ex:
                 logger.error(f"❌ Error insertando → {detalle} | Error: {ex}")
                 omitidos += 1
@@ -183,8 +326,12 @@ async def insertar_uno_a_uno_async(df: pd.DataFrame, delay_ms: int = 250, limit:
                 await asyncio.sleep(delay_s)
 
     finally:
-        await conn.close()
-        logger.info("🔌 Conexión cerrada.")
+        logger.info(f"🔌 Fin de la inserción fila a fila ({count} registros).")
+
+    # Las filas fuera de la ventana de la política de refresco no se materializarían nunca
+    if insertados > 0:
+        async with conexion_db() as conn:
+            await refrescar_agregados(conn, desde, hasta)
 
     logger.info(f"📊 Resumen final → Procesadas: {total} | Insertadas: {insertados} | Omitidas: {omitidos}")
     return {
@@ -195,12 +342,206 @@ async def insertar_uno_a_uno_async(df: pd.DataFrame, delay_ms: int = 250, limit:
     }
 
 
+# Ancho de bucket para que el rango quede en a lo sumo `puntos` buckets: horas enteras (la
+# resolución de smn_obs) y días enteros desde un día (se lee el agregado diario)
+def ancho_bucket(desde: pd.Timestamp, hasta: pd.Timestamp, puntos: int) -> pd.Timedelta:
+    horas = max(1, math.ceil((hasta - desde) / pd.Timedelta(hours=1) / puntos))
+    if horas >= 24:
+        return pd.Timedelta(days=math.ceil(horas / 24))
+    return pd.Timedelta(hours=horas)
+
+def sql_serie(variables: list, ancho: pd.Timedelta) -> str:
+    if ancho >= pd.Timedelta(days=1):
+        # Cada día pesa por los valores que entraron en su promedio, como el promedio horario
+        columnas = ", ".join(
+            f"sum({VARIABLES_SERIE[v][0]} * {VARIABLES_SERIE[v][1]}) / NULLIF(sum({VARIABLES_SERIE[v][1]}), 0) AS {v}"
+            for v in variables
+        )
+        return SQL_SERIE_DIARIA.format(zona=ZONA_BUCKETS, columnas=columnas)
+    columnas = ", ".join(
+        f"avg({v}) FILTER (WHERE {v} <= 360) AS {v}" if v == "wind_dir_deg" else f"avg({v}) AS {v}"
+        for v in variables
+    )
+    return SQL_SERIE_HORARIA.format(zona=ZONA_BUCKETS, columnas=columnas)
+
+# Serie de una estación ya reducida en la base (time_bucket) y, con LTTB, a `puntos` filas
+async def consultar_serie(estacion: str, desde: pd.Timestamp, hasta: pd.Timestamp, variables: list,
+                          puntos: int, metodo: str) -> tuple:
+    ancho = ancho_bucket(desde, hasta, puntos * FACTOR_LTTB if metodo == "lttb" else puntos)
+    async with conexion_db() as conn:
+        filas = await conn.fetch(
+            sql_serie(variables, ancho), estacion, desde.to_pydatetime(), hasta.to_pydatetime(), ancho.to_pytimedelta()
+        )
+
+    df = pd.DataFrame([dict(fila) for fila in filas], columns=["fecha_hora", *variables])
+    df[variables] = df[variables].astype("float64")
+    if metodo == "lttb" and len(df) > puntos:
+        x = pd.to_datetime(df["fecha_hora"], utc=True).astype("int64").to_numpy()
+        df = df.iloc[filas_lttb(x, [df[v].to_numpy() for v in variables], puntos)]
+    return df.reset_index(drop=True), ancho
+
+# Respuesta JSON en bloques: encabezado, filas de a LOTE_RESPUESTA y cierre
+def serie_json(encabezado: dict, df: pd.DataFrame):
+    yield json.dumps(encabezado)[:-1] + ', "datos": ['
+    datos = df.drop(columns="fecha_hora")
+    datos = datos.astype(object).where(datos.notna(), None)
+    datos.insert(0, "fecha_hora", pd.to_datetime(df["fecha_hora"], utc=True).dt.strftime("%Y-%m-%dT%H:%M:%SZ"))
+    for inicio in range(0, len(datos), LOTE_RESPUESTA):
+        bloque = datos.iloc[inicio:inicio + LOTE_RESPUESTA].to_dict(orient="records")
+        yield ("," if inicio else "") + json.dumps(bloque)[1:-1]
+    yield "]}"
+
+# Respuesta Arrow IPC (stream): un record batch por cada LOTE_RESPUESTA filas
+def serie_arrow(encabezado: dict, df: pd.DataFrame):
+    df = df.assign(fecha_hora=pd.to_datetime(df["fecha_hora"], utc=True))
+    tabla = pa.Table.from_pandas(df, preserve_index=False)
+    tabla = tabla.replace_schema_metadata({"serie": json.dumps(encabezado)})
+    buffer = io.BytesIO()
+    with pa.ipc.new_stream(buffer, tabla.schema) as escritor:
+        for lote in tabla.to_batches(max_chunksize=LOTE_RESPUESTA):
+            escritor.write_batch(lote)
+            yield buffer.getvalue()
+            buffer.seek(0)
+            buffer.truncate()
+    yield buffer.getvalue()
+
+# Los instantes sin zona horaria se toman en hora local de Argentina, como las horas de datohorario
+def instante_utc(valor: str) -> pd.Timestamp:
+    instante = pd.Timestamp(valor)
+    if instante.tzinfo is None:
+        instante = instante.tz_localize(LOCAL_TZ)
+    return instante.tz_convert("UTC")
+
+# Re-materializa los agregados en el rango de fecha_hora insertado por la API (la política de
+# refresco solo cubre la ventana reciente). Se amplía un período a cada lado porque los cortes son
+# en hora local. Los períodos que empiezan antes del horizonte de la retención no se refrescan: sus
+# datos horarios ya se borraron (o se borrarán) y se rematerializarían sin ellos.
+async def refrescar_agregados(conn, desde: pd.Timestamp, hasta: pd.Timestamp):
+    try:
+        horizonte = await conn.fetchval(SQL_HORIZONTE_RETENCION)
+    except asyncpg.PostgresError as e:
+        logger.warning(f"⚠️ No se pudo leer la retención de smn_obs, no se refrescan los agregados: {e}")
+        return
+    desde, hasta = (t.tz_convert(LOCAL_TZ).tz_localize(None) if t.tzinfo else t for t in (desde, hasta))
+    if horizonte is not None:
+        horizonte = pd.Timestamp(horizonte).tz_convert(LOCAL_TZ).tz_localize(None)
+    for vista, periodo in AGREGADOS.items():
+        inicio = (desde - pd.Timedelta(days=1)).to_period(periodo).start_time
+        fin = (hasta + pd.Timedelta(days=1)).to_period(periodo).end_time.ceil("D")
+        if horizonte is not None:
+            # Primer período que empieza después del horizonte
+            inicio = max(inicio, (horizonte.to_period(periodo) + 1).start_time)
+            if inicio >= fin:
+                logger.info(f"⏩ {vista}: los períodos insertados empiezan antes del horizonte de la retención, no se refrescan")
+                continue
+        try:
+            await conn.execute(
+                f"CALL refresh_continuous_aggregate('{vista}', '{inicio:%Y-%m-%d} 00:00+00', '{fin:%Y-%m-%d} 00:00+00')"
+            )
+            logger.info(f"🧮 Agregado {vista} refrescado entre {inicio:%Y-%m-%d} y {fin:%Y-%m-%d}")
+        except asyncpg.PostgresError as e:
+            logger.warning(f"⚠️ No se pudo refrescar {vista}: {e}")
+
+# Carga masiva: COPY a una tabla temporal y un único INSERT ... SELECT con ON CONFLICT.
+# Devuelve los mismos conteos que la inserción fila a fila (los duplicados dentro del
+# archivo y los ya existentes en smn_obs cuentan como omitidos).
+async def insertar_bulk_async(df: pd.DataFrame) -> dict:
+    total = len(df)
+    records = [
+        (r.estacion_nombre, r.fecha_hora.to_pydatetime(), r.temp_c, r.hum_pct, r.pnm_hpa, r.wind_dir_deg, r.wind_speed_kmh)
+        for r in df[COLUMNAS_OBS].itertuples(index=False)
+    ]
+
+    logger.info(f"✅ Carga masiva de {total} registros...")
+    async with conexion_db() as conn:
+        async with conn.transaction():
+            await conn.execute(SQL_STAGING)
+            await conn.copy_records_to_table("smn_obs_staging", records=records, columns=COLUMNAS_OBS)
+            status = await conn.execute(SQL_UPSERT_STAGING)
+
+        # status: "INSERT 0 <filas insertadas>"
+        insertados = int(status.split()[-1])
+        if insertados > 0:
+            await refrescar_agregados(conn, df["fecha_hora"].min(), df["fecha_hora"].max())
+
+    omitidos = total - insertados
+
+    logger.info(f"📊 Resumen final → Procesadas: {total} | Insertadas: {insertados} | Omitidas: {omitidos}")
+    return {
+        "procesados": total,
+        "insertados": insertados,
+        "omitidos": omitidos,
+        "delay_ms": 0
+    }
+
+# Guarda el archivo recibido, lo parsea y lo carga (masivo o fila a fila con demora)
+async def ingestar_archivo(file: UploadFile, bulk: bool) -> dict:
+    # Nombre único por request: cargas simultáneas con el mismo nombre de archivo no comparten el
+    # temporal, y el nombre que manda el cliente (que puede traer "../") solo se usa en los logs
+    tmp_path = SIMULATE_DIR / f"carga_{uuid.uuid4().hex}.txt"
+    logger.info(f"📥 Archivo de dato horario recibido: {file.filename}")
+    try:
+        await guardar_upload(file, tmp_path)
+        logger.info(f"📂 Archivo guardado temporalmente en: {tmp_path}")
+
+        # El parseo (CPU) corre en otro proceso para no frenar los demás requests
+        loop = asyncio.get_running_loop()
+        df = await loop.run_in_executor(app.state.parseo, parsear_datohorario, tmp_path, PROVINCIAS_OBJETIVO)
+        logger.info(f"📊 Datos procesados: {len(df)} filas")
+
+        logger.info("⏳ Iniciando inserción en la base de datos...")
+        if bulk:
+            return await insertar_bulk_async(df)
+        return await insertar_uno_a_uno_async(df, delay_ms=SIM_DELAY_MS, limit=0)
+    finally:
+        tmp_path.unlink(missing_ok=True)
+
 # --- Endpoints ---
 @app.on_event("startup")
 async def startup_event():
+    # Sin base la API arranca igual: /upload/, /coverage/ y /metrics no la usan
+    app.state.pool = None
+    app.state.pool_lock = asyncio.Lock()
+    try:
+        app.state.pool = await crear_pool_db()
+    except (OSError, asyncio.TimeoutError, asyncpg.PostgresError) as e:
+        logger.warning(f"⚠️ No se pudo conectar a PostgreSQL ({e}); se reintenta en el primer request que use la base")
+    app.state.parseo = ProcessPoolExecutor(max_workers=PARSEO_WORKERS)
     logger.info("✅ API iniciada correctamente")
     logger.info("📥 Upload de dato horario: POST /upload/")
     logger.info("⏱️  Simulación tiempo real: POST /simulate/")
+    logger.info("📦 Ingesta masiva (COPY): POST /ingest/")
+    logger.info("📈 Estado del pool de conexiones: GET /pool/")
+    logger.info("🧮 Horas faltantes por estación: GET /coverage/{estacion}")
+    logger.info("📉 Series submuestreadas: GET /series/{estacion}")
+    logger.info("⏱️  Métricas de las etapas del pipeline (Prometheus): GET /metrics")
+
+@app.on_event("shutdown")
+async def shutdown_event():
+    if app.state.pool is not None:
+        await app.state.pool.close()
+    app.state.parseo.shutdown(wait=False, cancel_futures=True)
+    logger.info("🔌 Pool de conexiones y procesos de parseo cerrados.")
+
+# Estado del pool: conexiones en uso/libres y tiempo de espera para obtener una
+@app.get("/pool/")
+async def pool_stats():
+    try:
+        pool = await obtener_pool()
+    except ERRORES_CONEXION as e:
+        return JSONResponse(status_code=503, content={"error": f"Sin conexión a PostgreSQL: {e}"})
+    adquisiciones = estadisticas_pool["adquisiciones"]
+    return JSONResponse(content={
+        "min": pool.get_min_size(),
+        "max": pool.get_max_size(),
+        "abiertas": pool.get_size(),
+        "libres": pool.get_idle_size(),
+        "en_uso": pool.get_size() - pool.get_idle_size(),
+        "esperando": estadisticas_pool["esperando"],
+        "adquisiciones": adquisiciones,
+        "espera_promedio_ms": round(estadisticas_pool["espera_total_ms"] / adquisiciones, 3) if adquisiciones else 0.0,
+        "espera_max_ms": round(estadisticas_pool["espera_max_ms"], 3),
+    })
 
 @app.post("/upload/")
 async def upload_file(file: UploadFile = File(...)):
@@ -210,29 +551,105 @@ async def upload_file(file: UploadFile = File(...)):
             logger.info(f"⏩ Archivo ya existe, se ignora: {file.filename}")
             return JSONResponse(content={"message": f"Archivo '{file.filename}' ya existe y no fue sobrescrito."})
 
-        with open(file_path, "wb") as buffer:
-            shutil.copyfileobj(file.file, buffer)
-        logger.info(f"✅ Archivo recibido: {file.filename}")
+        tamanio = await guardar_upload(file, file_path)
+        logger.info(f"✅ Archivo recibido: {file.filename} ({tamanio} bytes)")
         return JSONResponse(content={"message": f"Archivo '{file.filename}' subido correctamente."})
     except Exception as e:
         logger.error(f"❌ Error al subir el archivo '{file.filename}': {e}")
         return JSONResponse(status_code=500, content={"error": str(e)})
 
+# Simulación en tiempo real: inserta fila a fila cada SIM_DELAY_MS (bulk=true carga todo de una vez)
 @app.post("/simulate/")
-async def simulate_datohorario(file: UploadFile = File(...)):
-    tmp_path = SIMULATE_DIR / file.filename
-    logger.info(f"📥 Archivo de dato horario recibido: {file.filename}")
-    with open(tmp_path, "wb") as buffer:
-        shutil.copyfileobj(file.file, buffer)
+async def simulate_datohorario(file: UploadFile = File(...), bulk: bool = False):
+    try:
+        result = await ingestar_archivo(file, bulk=bulk)
+    except ERRORES_CONEXION as e:
+        return JSONResponse(status_code=503, content={"error": f"Sin conexión a PostgreSQL: {e}"})
+    return JSONResponse(content=result)
+
+# Ingesta masiva de un archivo datohorario completo en una sola transacción
+@app.post("/ingest/")
+async def ingest_datohorario(file: UploadFile = File(...)):
+    try:
+        result = await ingestar_archivo(file, bulk=True)
+    except ERRORES_CONEXION as e:
+        return JSONResponse(status_code=503, content={"error": f"Sin conexión a PostgreSQL: {e}"})
+    return JSONResponse(content=result)
+
+# Índice de cobertura de la estación: el de Plata o, con PROVINCIAS, el de la provincia de la estación
+def ruta_cobertura(nombre):
+    if not MULTIPROVINCIA:
+        return COBERTURA_FILE
+    provincia = obtener_catalogo(ESTACIONES_FILE).provincia_de(nombre)
+    if provincia is None:
+        return COBERTURA_FILE
+    return COBERTURA_FILE.parent / particion_provincia(provincia) / COBERTURA_FILE.name
+
+# Horas esperadas sin observación de una estación en un rango (índice de cobertura de Plata).
+# Sin from/to se usa el rango completo del índice.
+@app.get("/coverage/{estacion}")
+async def coverage(estacion: str, desde: str | None = Query(None, alias="from"), hasta: str | None = Query(None, alias="to")):
+    nombre = estacion.strip().upper()
+    indice = obtener_cobertura(ruta_cobertura(nombre))
+    if nombre not in indice.posicion:
+        return JSONResponse(status_code=404, content={"error": f"Estación '{estacion}' sin datos en el índice de cobertura"})
+    try:
+        desde = pd.Timestamp(desde) if desde else pd.Timestamp(indice.inicio)
+        hasta = pd.Timestamp(hasta) if hasta else pd.Timestamp(indice.fin) + pd.Timedelta(hours=23)
+    except ValueError as e:
+        return JSONResponse(status_code=400, content={"error": f"Fecha inválida: {e}"})
+    if hasta < desde:
+        return JSONResponse(status_code=400, content={"error": "'to' es anterior a 'from'"})
+    return JSONResponse(content=indice.consultar(nombre, desde, hasta))
+
+# Serie de una estación en un rango, reducida en el servidor a lo sumo `puntos` filas: promedios
+# por bucket de tiempo (metodo=bucket) o LTTB sobre buckets más finos (metodo=lttb). Con
+# formato=arrow la respuesta es un stream Arrow IPC; si no, JSON en bloques.
+@app.get("/series/{estacion}")
+async def series(
+    estacion: str,
+    desde: str | None = Query(None, alias="from"),
+    hasta: str | None = Query(None, alias="to"),
+    variables: str = "temp_c",
+    puntos: int = Query(1000, ge=3, le=PUNTOS_MAX),
+    metodo: str = Query("bucket", pattern="^(bucket|lttb)$"),
+    formato: str = Query("json", pattern="^(json|arrow)$"),
+):
+    columnas = [v.strip() for v in variables.split(",") if v.strip()]
+    invalidas = [v for v in columnas if v not in VARIABLES_SERIE]
+    if not columnas or invalidas:
+        return JSONResponse(status_code=400, content={"error": f"Variables inválidas: {invalidas}", "disponibles": list(VARIABLES_SERIE)})
+    try:
+        hasta = instante_utc(hasta) if hasta else pd.Timestamp.now(tz="UTC").ceil("h")
+        desde = instante_utc(desde) if desde else hasta - pd.Timedelta(days=365)
+    except ValueError as e:
+        return JSONResponse(status_code=400, content={"error": f"Fecha inválida: {e}"})
+    if hasta <= desde:
+        return JSONResponse(status_code=400, content={"error": "'to' debe ser posterior a 'from'"})
+
+    nombre = estacion.strip().upper()
+    inicio = time.perf_counter()
+    df, ancho = await consultar_serie(nombre, desde, hasta, columnas, puntos, metodo)
+    encabezado = {
+        "estacion": nombre,
+        "desde": desde.isoformat(),
+        "hasta": hasta.isoformat(),
+        "variables": columnas,
+        "metodo": metodo,
+        "bucket": str(ancho),
+        "fuente": "smn_obs_diario" if ancho >= pd.Timedelta(days=1) else "smn_obs",
+        "puntos": len(df),
+    }
+    logger.info(f"📉 Serie {nombre} {desde:%Y-%m-%d}→{hasta:%Y-%m-%d} ({metodo}, {ancho}): {len(df)} puntos en {(time.perf_counter() - inicio) * 1000:.0f} ms")
 
-    logger.info(f"📂 Archivo guardado temporalmente en: {tmp_path}")
-    
-    df = leer_y_filtrar_datohorario(tmp_path, PROVINCIA_OBJETIVO)
-    logger.info(f"📊 Datos procesados: {len(df)} filas")
-    df.sort_values("fecha_hora", inplace=True)
+    if formato == "arrow":
+        return StreamingResponse(serie_arrow(encabezado, df), media_type="application/vnd.apache.arrow.stream")
+    return StreamingResponse(serie_json(encabezado, df), media_type="application/json")
 
-    logger.info("⏳ Iniciando inserción en la base de datos...")
-    result = await insertar_uno_a_uno_async(df, delay_ms=SIM_DELAY_MS, limit=0)
+# Métricas por etapa del pipeline (data/metricas/etapas.jsonl) en formato de texto de Prometheus.
+# Cada scrape lee solo las líneas nuevas del archivo. Es síncrona: FastAPI la corre en un thread.
+metricas_pipeline = AgregadorMetricas()
 
-    tmp_path.unlink(missing_ok=True)
-    return JSONResponse(content=result)
\ No newline at end of file
+@app.get("/metrics")
+def metrics():
+    return PlainTextResponse(metricas_pipeline.prometheus(), media_type="text/plain; version=0.0.4")
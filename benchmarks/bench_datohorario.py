@@ -0,0 +1,105 @@
+"""Compara el parser de ancho fijo de datohorario contra la lectura original con expresiones regulares.
+
+Lee los archivos de data/raw/datohorario/_procesados con ambas versiones (todas las estaciones
+y filtrando por provincia), verifica que las filas que devuelve la versión original tengan los
+mismos valores en el parser nuevo y reporta los tiempos. El parser además recupera las filas
+con algún valor faltante y los nombres de estación cortados en dos líneas, que la versión
+original descartaba.
+
+Uso (desde la raíz del repositorio):
+    python benchmarks/bench_datohorario.py --provincia MISIONES
+"""
+import argparse
+import re
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+BASE_DIR = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(BASE_DIR / "pipeline"))
+sys.path.insert(0, str(BASE_DIR / "benchmarks"))
+
+from datohorario import VARIABLES, leer_datohorario  # noqa: E402
+from bench_imputacion import estaciones_de  # noqa: E402
+
+DATOHORARIO_DIR = BASE_DIR / "data" / "raw" / "datohorario" / "_procesados"
+
+
+# Lectura original (procesar_datohorario_txt) más la conversión de tipos que hacían Plata y la API
+def leer_regex(archivo, estaciones=None):
+    with open(archivo, "r", encoding="latin1") as f:
+        lines = f.readlines()
+
+    columnas = re.split(r"\s{2,}", lines[0].strip())
+    data = [
+        re.split(r"\s{2,}", line.strip(), maxsplit=len(columnas) - 1)
+        for line in lines[1:]
+        if len(line.strip()) > 0 and not line.isspace()
+    ]
+
+    df = pd.DataFrame(data, columns=columnas)
+    df.columns = df.columns.str.strip()
+    df["NOMBRE"] = df["NOMBRE"].str.strip()
+    if estaciones is not None:
+        df = df[df["NOMBRE"].isin(set(estaciones))]
+    else:
+        df = df[df["NOMBRE"].notna()]
+
+    df = df.copy()
+    df["FECHA"] = pd.to_datetime(df["FECHA"].str.zfill(8), format="%d%m%Y", errors="coerce")
+    df["HORA"] = pd.to_numeric(df["HORA"], errors="coerce")
+    for col in VARIABLES:
+        df[col] = pd.to_numeric(df[col], errors="coerce")
+    return df[df["FECHA"].notna() & df["HORA"].notna()].reset_index(drop=True)
+
+
+def medir(funcion, archivos, estaciones):
+    t0 = time.perf_counter()
+    resultado = pd.concat([funcion(archivo, estaciones) for archivo in archivos], ignore_index=True)
+    return resultado, time.perf_counter() - t0
+
+
+def comparar(original, nuevo):
+    # Los nombres cortados en dos líneas solo aparecen truncados en la versión original
+    truncados = ~original["NOMBRE"].isin(set(nuevo["NOMBRE"]))
+    original = original[~truncados]
+
+    claves = ["NOMBRE", "FECHA", "HORA"]
+    union = original.merge(nuevo, on=claves, how="left", suffixes=("", "_nuevo"), indicator=True)
+    faltan = int((union["_merge"] != "both").sum())
+    distintos = sum(
+        int((~np.isclose(union[col], union[f"{col}_nuevo"], equal_nan=True)).sum()) for col in VARIABLES
+    )
+    assert faltan == 0, f"{faltan} filas de la versión original no están en el parser nuevo"
+    assert distintos == 0, f"{distintos} valores distintos entre ambas versiones"
+    return int(truncados.sum()), len(nuevo) - len(original)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--provincia", default="MISIONES")
+    parser.add_argument("--archivos", type=int, default=0, help="Cantidad de archivos a usar (0 = todos)")
+    args = parser.parse_args()
+
+    archivos = sorted(DATOHORARIO_DIR.glob("datohorario*.txt"))
+    if args.archivos > 0:
+        archivos = archivos[: args.archivos]
+
+    print(f"Archivos: {len(archivos)}")
+    for titulo, estaciones in [("Todas las estaciones", None), (f"Provincia {args.provincia}", estaciones_de(args.provincia))]:
+        original, t_original = medir(leer_regex, archivos, estaciones)
+        nuevo, t_nuevo = medir(leer_datohorario, archivos, estaciones)
+        truncadas, recuperadas = comparar(original, nuevo)
+
+        print(f"\n{titulo}: {len(original)} filas (regex) / {len(nuevo)} filas (ancho fijo)")
+        print(f"  Filas con nombre truncado en la versión original: {truncadas}")
+        print(f"  Filas recuperadas por el parser (faltantes o nombre en dos líneas): {recuperadas}")
+        print(f"  Regex:       {t_original:8.3f} s  ({1000 * t_original / len(archivos):6.2f} ms/archivo)")
+        print(f"  Ancho fijo:  {t_nuevo:8.3f} s  ({1000 * t_nuevo / len(archivos):6.2f} ms/archivo)  (x{t_original / t_nuevo:.1f})")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,208 @@
+"""Compara las consultas de los paneles de Grafana (grafana/dashboards/smn.json) contra las anteriores.
+
+  - antes:   filas crudas filtradas y ordenadas por created_at ($__timeFilter(created_at)). created_at
+             no es la dimensión de tiempo de la hypertable, así que no se descartan chunks.
+  - después: las consultas actuales del dashboard, sobre fecha_hora con time_bucket_gapfill/locf
+             (un punto por intervalo de Grafana, los huecos como NULL).
+
+Genera una tabla sintética de varios años (estaciones × horas, con created_at = fecha_hora + el
+retraso de ingesta y un porcentaje de horas faltantes) y, para varios rangos del selector de tiempo,
+expande los macros de Grafana como lo haría el datasource y mide cada panel de una estación:
+mediana de tiempo, filas devueltas y chunks leídos (EXPLAIN ANALYZE). Usa las variables PG_* del
+.env y trabaja en una tabla propia que borra al terminar.
+
+Uso (desde la raíz del repositorio, con TimescaleDB levantada):
+    python benchmarks/bench_grafana.py --estaciones 20 --anios 5
+"""
+import argparse
+import asyncio
+import json
+import math
+import os
+import re
+import statistics
+import time
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+
+import asyncpg
+import numpy as np
+
+from bench_timescale import COLUMNAS, SQL_TABLA, generar_dia
+
+DASHBOARD = Path(__file__).resolve().parent.parent / "grafana" / "dashboards" / "smn.json"
+TABLA = "bench_smn_grafana"
+
+# Paneles anteriores del dashboard (uno por variable)
+SQL_ANTES = """SELECT
+  $__time(created_at),
+  {variable}
+FROM public.smn_obs
+WHERE estacion_nombre = ${{estacion:sqlstring}}
+  AND $__timeFilter(created_at)
+ORDER BY 1;"""
+VARIABLE_ANTES = "SELECT DISTINCT estacion_nombre FROM public.smn_obs ORDER BY 1;"
+
+RANGOS = {
+    "3 h": timedelta(hours=3),
+    "7 días": timedelta(days=7),
+    "90 días": timedelta(days=90),
+    "1 año": timedelta(days=365),
+    "5 años": timedelta(days=5 * 365),
+}
+
+
+# Intervalo de Grafana: rango / puntos del panel, con el mínimo de 1 h de los paneles
+def intervalo_ms(rango, puntos):
+    horas = max(1, math.ceil(rango / timedelta(hours=1) / puntos))
+    return horas * 3_600_000
+
+
+def literal(instante):
+    return f"'{instante.strftime('%Y-%m-%dT%H:%M:%SZ')}'"
+
+
+# Expansión de los macros que usa el dashboard, como el datasource de PostgreSQL de Grafana
+def expandir(sql, estacion, desde, hasta, intervalo):
+    sql = sql.replace("public.smn_obs", TABLA)
+    sql = sql.replace("${estacion:sqlstring}", f"'{estacion}'")
+    sql = sql.replace("$__interval_ms", str(intervalo))
+    sql = re.sub(r"\$__timeFilter\((\w+)\)", lambda m: f"{m.group(1)} BETWEEN {literal(desde)} AND {literal(hasta)}", sql)
+    sql = re.sub(r"\$__time\((\w+)\)", lambda m: f'{m.group(1)} AS "time"', sql)
+    return sql
+
+
+def consultas_dashboard():
+    tablero = json.loads(DASHBOARD.read_text(encoding="utf-8"))
+    paneles = {
+        panel["title"].split(" — ")[0]: panel["targets"][0]["rawSql"]
+        for panel in tablero["panels"] if panel.get("targets")
+    }
+    variable = tablero["templating"]["list"][0]["query"]
+    return paneles, variable
+
+
+# Paneles anteriores con el mismo título que los actuales (el de horas sin dato no existía)
+def consultas_antes(paneles):
+    anteriores = {}
+    for titulo, sql in paneles.items():
+        variable = re.search(r"avg\((\w+)\)", sql)
+        if variable and "locf" in sql:
+            anteriores[titulo] = SQL_ANTES.format(variable=variable.group(1))
+    return anteriores
+
+
+async def cargar(conn, estaciones, dias, args):
+    await conn.execute(f"DROP TABLE IF EXISTS {TABLA} CASCADE")
+    await conn.execute(SQL_TABLA.format(tabla=TABLA))
+    await conn.execute(f"SELECT create_hypertable('{TABLA}', 'fecha_hora', chunk_time_interval => INTERVAL '{args.chunk}')")
+
+    rng = np.random.default_rng(0)
+    retraso = timedelta(minutes=args.retraso_min)
+    filas = 0
+    for dia in dias:
+        registros = [
+            (*fila, fila[1] + retraso) for fila in generar_dia(estaciones, dia, rng)
+            if rng.random() >= args.faltantes
+        ]
+        await conn.copy_records_to_table(TABLA, records=registros, columns=COLUMNAS + ["created_at"])
+        filas += len(registros)
+    await conn.execute(f"ANALYZE {TABLA}")
+    chunks = await conn.fetchval(f"SELECT count(*) FROM show_chunks('{TABLA}')")
+    return filas, chunks
+
+
+# Chunks de la hypertable que el plan llegó a leer (los descartados no aparecen o no se ejecutan)
+def chunks_leidos(plan):
+    leidos = 0
+    pendientes = [plan]
+    while pendientes:
+        nodo = pendientes.pop()
+        if nodo.get("Relation Name", "").startswith("_hyper_") and nodo.get("Actual Loops", 0) > 0:
+            leidos += 1
+        pendientes.extend(nodo.get("Plans", []))
+    return leidos
+
+
+async def medir(conn, sql, repeticiones):
+    tiempos = []
+    for _ in range(repeticiones):
+        t0 = time.perf_counter()
+        filas = await conn.fetch(sql)
+        tiempos.append(time.perf_counter() - t0)
+    plan = json.loads(await conn.fetchval(f"EXPLAIN (ANALYZE, FORMAT JSON) {sql}"))[0]["Plan"]
+    return {"ms": statistics.median(tiempos) * 1000, "filas": len(filas), "chunks": chunks_leidos(plan)}
+
+
+def reportar(rango, titulo, antes, despues):
+    print(
+        f"  {rango:>8} | {titulo:<14} | "
+        f"{antes['ms']:9.1f} ms {antes['filas']:>7} filas {antes['chunks']:>4} chunks | "
+        f"{despues['ms']:9.1f} ms {despues['filas']:>6} filas {despues['chunks']:>4} chunks | "
+        f"x{antes['ms'] / despues['ms']:.1f}"
+    )
+
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--estaciones", type=int, default=20)
+    parser.add_argument("--anios", type=float, default=5)
+    parser.add_argument("--chunk", default="30 days")
+    parser.add_argument("--faltantes", type=float, default=0.03, help="Proporción de horas sin dato")
+    parser.add_argument("--retraso-min", type=int, default=10, help="Minutos entre fecha_hora y created_at")
+    parser.add_argument("--puntos", type=int, default=1000, help="Puntos por panel (ancho en píxeles)")
+    parser.add_argument("--repeticiones", type=int, default=5)
+    parser.add_argument("--conservar", action="store_true", help="No borra la tabla al terminar")
+    args = parser.parse_args()
+
+    estaciones = [f"ESTACION SINTETICA {i:03d}" for i in range(args.estaciones)]
+    hoy = datetime.now(timezone.utc).replace(hour=0, minute=0, second=0, microsecond=0)
+    total_dias = int(args.anios * 365)
+    dias = [hoy - timedelta(days=total_dias - i) for i in range(total_dias)]
+
+    paneles, variable = consultas_dashboard()
+    anteriores = consultas_antes(paneles)
+
+    conn = await asyncpg.connect(
+        host=os.getenv("PG_HOST", "localhost"),
+        port=int(os.getenv("PG_PORT", "5432")),
+        user=os.getenv("PG_USER"),
+        password=os.getenv("PG_PASSWORD"),
+        database=os.getenv("PG_DB"),
+    )
+    try:
+        filas, chunks = await cargar(conn, estaciones, dias, args)
+        print(f"Tabla sintética: {len(estaciones)} estaciones × {total_dias} días → {filas} filas en {chunks} chunks")
+        print(f"\n  {'rango':>8} | {'panel':<14} | {'antes (created_at, filas crudas)':<41} | {'después (fecha_hora, gapfill)':<40} |")
+
+        hasta = hoy
+        estacion = estaciones[0]
+        for rango, duracion in RANGOS.items():
+            desde = hasta - duracion
+            intervalo = intervalo_ms(duracion, args.puntos)
+            total_antes = total_despues = 0.0
+            for titulo, sql in paneles.items():
+                despues = await medir(conn, expandir(sql, estacion, desde, hasta, intervalo), args.repeticiones)
+                total_despues += despues["ms"]
+                if titulo not in anteriores:
+                    print(f"  {rango:>8} | {titulo:<14} | {'(panel nuevo)':<41} | {despues['ms']:9.1f} ms {despues['filas']:>6} filas {despues['chunks']:>4} chunks |")
+                    continue
+                antes = await medir(conn, expandir(anteriores[titulo], estacion, desde, hasta, intervalo), args.repeticiones)
+                total_antes += antes["ms"]
+                reportar(rango, titulo, antes, despues)
+
+            antes = await medir(conn, expandir(VARIABLE_ANTES, estacion, desde, hasta, intervalo), args.repeticiones)
+            despues = await medir(conn, expandir(variable, estacion, desde, hasta, intervalo), args.repeticiones)
+            reportar(rango, "$estacion", antes, despues)
+            print(
+                f"  {rango:>8} | refresco de una estación: {total_antes + antes['ms']:.1f} ms → "
+                f"{total_despues + despues['ms']:.1f} ms (intervalo {intervalo // 3_600_000} h)\n"
+            )
+    finally:
+        if not args.conservar:
+            await conn.execute(f"DROP TABLE IF EXISTS {TABLA} CASCADE")
+        await conn.close()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,142 @@
+"""Compara la imputación horaria de Plata contra la implementación original fila a fila.
+
+Arma la grilla horaria (estación × día × hora) de una provincia a partir de los archivos
+de muestra en data/raw/datohorario/_procesados, agrega huecos sintéticos de varios días,
+imputa con ambas versiones, verifica que el resultado sea idéntico y reporta los tiempos.
+
+Uso (desde la raíz del repositorio):
+    python benchmarks/bench_imputacion.py --provincia MISIONES --dias 60
+"""
+import argparse
+import re
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+BASE_DIR = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(BASE_DIR / "pipeline"))
+
+from pipeline_02_bronce_to_plata import imputar_promedio_dias_adyacentes  # noqa: E402
+
+DATOHORARIO_DIR = BASE_DIR / "data" / "raw" / "datohorario" / "_procesados"
+ESTACIONES_FILE = BASE_DIR / "data" / "raw" / "estaciones" / "estaciones_smn.txt"
+VARIABLES = ['TEMP', 'HUM', 'PNM', 'DD', 'FF']
+
+
+# Implementación original (closure de procesar_enriquecimiento_plata), usada como referencia
+def imputar_valores_referencia(grupo):
+    grupo = grupo.copy()
+    for var in VARIABLES:
+        for idx, fila in grupo.iterrows():
+            if pd.isna(fila[var]):
+                hora = fila['HORA']
+                fecha = fila['FECHA']
+
+                val_ant = grupo[(grupo['HORA'] == hora) & (grupo['FECHA'] < fecha)][var].last_valid_index()
+                val_ant = grupo.at[val_ant, var] if val_ant is not None else None
+
+                val_post = grupo[(grupo['HORA'] == hora) & (grupo['FECHA'] > fecha)][var].first_valid_index()
+                val_post = grupo.at[val_post, var] if val_post is not None else None
+
+                if val_ant is not None and val_post is not None:
+                    grupo.at[idx, var] = round((val_ant + val_post) / 2, 1)
+                elif val_ant is not None:
+                    grupo.at[idx, var] = val_ant
+                elif val_post is not None:
+                    grupo.at[idx, var] = val_post
+    return grupo
+
+
+def estaciones_de(provincia):
+    estaciones = []
+    with open(ESTACIONES_FILE, "r", encoding="latin1") as f:
+        for line in f.readlines()[2:]:
+            campos = re.split(r"\s{2,}", line.strip())
+            if len(campos) > 2 and campos[1].upper() == provincia.upper():
+                estaciones.append(campos[0])
+    return set(estaciones)
+
+
+def cargar_horario(archivos, estaciones):
+    dfs = []
+    for archivo in archivos:
+        with open(archivo, "r", encoding="latin1") as f:
+            lines = f.readlines()
+        columnas = re.split(r"\s{2,}", lines[0].strip())
+        data = [
+            re.split(r"\s{2,}", line.strip(), maxsplit=len(columnas) - 1)
+            for line in lines[2:]
+            if line.strip()
+        ]
+        df = pd.DataFrame(data, columns=columnas)
+        dfs.append(df[df["NOMBRE"].str.strip().isin(estaciones)])
+
+    df = pd.concat(dfs, ignore_index=True)
+    df["NOMBRE"] = df["NOMBRE"].str.strip()
+    for col in VARIABLES:
+        df[col] = pd.to_numeric(df[col], errors="coerce")
+    df["FECHA_HORA"] = pd.to_datetime(df["FECHA"].str.zfill(8), format="%d%m%Y") + pd.to_timedelta(df["HORA"].astype(int), unit="h")
+    return df[["NOMBRE", "FECHA_HORA"] + VARIABLES]
+
+
+def armar_grilla(df, fraccion_huecos, semilla):
+    # Grilla estación × día × hora observada, con huecos de 1 a 5 días a la misma hora
+    rng = np.random.default_rng(semilla)
+    dias = pd.date_range(df["FECHA_HORA"].min().floor("D"), df["FECHA_HORA"].max().floor("D"))
+    index = pd.MultiIndex.from_tuples(
+        [
+            (estacion, dia + pd.Timedelta(hours=int(hora)))
+            for estacion, horas in df.groupby("NOMBRE")["FECHA_HORA"].agg(lambda s: sorted(s.dt.hour.unique())).items()
+            for dia in dias
+            for hora in horas
+        ],
+        names=["NOMBRE", "FECHA_HORA"],
+    )
+    df = df.drop_duplicates(["NOMBRE", "FECHA_HORA"]).set_index(["NOMBRE", "FECHA_HORA"]).reindex(index).reset_index()
+    df["FECHA"] = df["FECHA_HORA"].dt.date
+    df["HORA"] = df["FECHA_HORA"].dt.hour
+    df = df.sort_values(["NOMBRE", "FECHA", "HORA"]).reset_index(drop=True)
+
+    for var in VARIABLES:
+        inicios = rng.choice(len(df), size=int(len(df) * fraccion_huecos), replace=False)
+        for inicio in inicios:
+            mismo_horario = df.index[
+                (df["NOMBRE"] == df.at[inicio, "NOMBRE"]) & (df["HORA"] == df.at[inicio, "HORA"]) & (df.index >= inicio)
+            ]
+            df.loc[mismo_horario[: rng.integers(1, 6)], var] = np.nan
+    return df
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--provincia", default="MISIONES")
+    parser.add_argument("--dias", type=int, default=30, help="Cantidad de archivos datohorario a usar")
+    parser.add_argument("--huecos", type=float, default=0.01, help="Fracción de filas que inician un hueco")
+    parser.add_argument("--semilla", type=int, default=0)
+    args = parser.parse_args()
+
+    archivos = sorted(DATOHORARIO_DIR.glob("datohorario*.txt"))[: args.dias]
+    df = armar_grilla(cargar_horario(archivos, estaciones_de(args.provincia)), args.huecos, args.semilla)
+    print(f"Grilla: {len(df)} filas, {int(df[VARIABLES].isna().sum().sum())} valores faltantes")
+
+    t0 = time.perf_counter()
+    referencia = pd.concat(
+        [imputar_valores_referencia(grupo) for _, grupo in df.groupby("NOMBRE", sort=True)]
+    ).reset_index(drop=True)
+    t_referencia = time.perf_counter() - t0
+
+    t0 = time.perf_counter()
+    vectorizado = imputar_promedio_dias_adyacentes(df, VARIABLES)
+    t_vectorizado = time.perf_counter() - t0
+
+    pd.testing.assert_frame_equal(referencia, vectorizado)
+    print("Resultados idénticos")
+    print(f"Original (iterrows): {t_referencia:8.3f} s")
+    print(f"Vectorizado:         {t_vectorizado:8.3f} s  (x{t_referencia / t_vectorizado:.0f})")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,259 @@
+"""Benchmark de punta a punta del pipeline batch (Bronce → Plata → Oro) con datos sintéticos.
+
+Para cada escala ("<estaciones>x<años>", p. ej. 12x1) genera los datohorario con
+generar_datohorario.py en un espacio de trabajo propio (data/raw/datohorario y el catálogo de
+estaciones) y corre cada etapa en un proceso aparte, con ese espacio como directorio de trabajo
+(las rutas de los pipelines son relativas al directorio actual):
+
+  - ingesta:          procesar_datohorario_txt de cada archivo → data/bronce
+  - exploracion:      procesar_exploracion_plata (Bronce → horario_archivo, diario inicial, cobertura)
+  - enriquecimiento:  procesar_enriquecimiento_plata (grilla horaria, imputación, finales de Plata)
+  - oro:              procesar_oro
+
+Con --baja-memoria, exploración y enriquecimiento se reemplazan por una sola etapa
+plata_baja_memoria (procesar_plata_baja_memoria, estación por estación): su RSS máximo debería
+mantenerse casi constante al crecer la cantidad de estaciones.
+
+Por etapa registra el tiempo, el pico de memoria del proceso (RSS máximo, y el RSS después de los
+imports como base), las filas que produce y filas/s. El reporte JSON incluye el commit, la máquina y
+los parámetros de la generación, para comparar corridas: --comparar <reporte anterior> muestra la
+relación de tiempos y memoria por escala y etapa.
+
+Uso (desde la raíz del repositorio):
+    python benchmarks/bench_pipeline.py --escalas 4x0.25,12x1,26x2
+    python benchmarks/bench_pipeline.py --escalas 4x0.25,12x1,26x2 --baja-memoria
+    python benchmarks/bench_pipeline.py --escalas 4x0.25,12x1,26x2 --comparar benchmarks/resultados/pipeline_<fecha>.json
+"""
+import argparse
+import json
+import os
+import platform
+import resource
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import date, datetime
+from pathlib import Path
+
+BASE_DIR = Path(__file__).resolve().parent.parent
+PIPELINE_DIR = BASE_DIR / "pipeline"
+sys.path.insert(0, str(PIPELINE_DIR))
+
+from estaciones import obtener_catalogo  # noqa: E402
+from generar_datohorario import agregar_argumentos, elegir_estaciones, generar  # noqa: E402
+
+RESULTADOS_DIR = BASE_DIR / "benchmarks" / "resultados"
+ETAPAS = ["ingesta", "exploracion", "enriquecimiento", "oro"]
+ETAPAS_BAJA_MEMORIA = ["ingesta", "plata_baja_memoria", "oro"]
+
+
+def rss_mb():
+    # ru_maxrss está en KB en Linux
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+## Etapas (se ejecutan en el proceso hijo, con el espacio de trabajo como directorio actual)
+
+def contar_filas(directorio):
+    import pyarrow.dataset as ds
+    return ds.dataset(str(directorio), format="parquet", partitioning="hive").count_rows()
+
+
+def ejecutar_etapa(etapa):
+    import pyarrow.parquet as pq
+
+    from pipeline_01_ingest_to_bronce import BRONCE_DIR, RAW_DIR, procesar_datohorario_txt
+    from pipeline_02_bronce_to_plata import (
+        DIARIO_FINAL_DIR, HORARIO_FINAL_DIR, PLATA_DIR, procesar_enriquecimiento_plata, procesar_exploracion_plata,
+        procesar_plata_baja_memoria,
+    )
+    from pipeline_03_plata_to_oro import ORO_DIARIO_DIR, ORO_HORARIO_DIR, procesar_oro
+
+    base = rss_mb()
+    t0 = time.perf_counter()
+    if etapa == "ingesta":
+        filas = 0
+        for archivo in sorted((RAW_DIR / "datohorario").glob("datohorario*.txt")):
+            filas += sum(len(df) for df in procesar_datohorario_txt(archivo, BRONCE_DIR).values())
+        segundos = time.perf_counter() - t0
+    elif etapa == "exploracion":
+        procesar_exploracion_plata()
+        segundos = time.perf_counter() - t0
+        filas = pq.ParquetFile(PLATA_DIR / "horario_archivo.parquet").metadata.num_rows
+    elif etapa == "enriquecimiento":
+        procesar_enriquecimiento_plata()
+        segundos = time.perf_counter() - t0
+        filas = contar_filas(HORARIO_FINAL_DIR) + contar_filas(DIARIO_FINAL_DIR)
+    elif etapa == "plata_baja_memoria":
+        procesar_plata_baja_memoria()
+        segundos = time.perf_counter() - t0
+        filas = contar_filas(HORARIO_FINAL_DIR) + contar_filas(DIARIO_FINAL_DIR)
+    elif etapa == "oro":
+        procesar_oro()
+        segundos = time.perf_counter() - t0
+        filas = contar_filas(ORO_HORARIO_DIR) + contar_filas(ORO_DIARIO_DIR)
+    else:
+        raise ValueError(f"Etapa desconocida: {etapa}")
+
+    return {
+        "segundos": round(segundos, 3),
+        "filas": filas,
+        "filas_s": round(filas / segundos, 1) if segundos else None,
+        "rss_base_mb": round(base, 1),
+        "rss_max_mb": round(rss_mb(), 1),
+    }
+
+
+## Orquestación de escalas (proceso principal)
+
+def leer_escala(texto):
+    estaciones, anios = texto.lower().split("x")
+    return int(estaciones), float(anios)
+
+
+def preparar_espacio(trabajo, estaciones, anios, args):
+    elegidas = elegir_estaciones(obtener_catalogo(args.catalogo), estaciones, args.provincia)
+    destino = trabajo / "data" / "raw" / "estaciones"
+    destino.mkdir(parents=True, exist_ok=True)
+    shutil.copy(args.catalogo, destino / "estaciones_smn.txt")
+
+    t0 = time.perf_counter()
+    archivos = generar(trabajo / "data" / "raw" / "datohorario", elegidas, args.desde, int(round(anios * 365)), args)
+    return {
+        "estaciones": len(elegidas),
+        "estaciones_provincia": int((elegidas["provincia"] == args.provincia.upper()).sum()),
+        "anios": anios,
+        "archivos": len(archivos),
+        "bytes": sum(archivo.stat().st_size for archivo in archivos),
+        "generacion_s": round(time.perf_counter() - t0, 2),
+    }
+
+
+def correr_etapa(etapa, trabajo, args):
+    resultado = trabajo / f"_etapa_{etapa}.json"
+    entorno = {
+        **os.environ,
+        "PROVINCIA_OBJETIVO": args.provincia,
+        "EXPORTAR_CSV": "true" if args.csv else "false",
+        "PYTHONPATH": os.pathsep.join([str(PIPELINE_DIR), os.environ.get("PYTHONPATH", "")]),
+    }
+    proceso = subprocess.run(
+        [sys.executable, str(Path(__file__).resolve()), "--etapa", etapa, "--resultado", str(resultado)],
+        cwd=trabajo, env=entorno, stdout=subprocess.DEVNULL, stderr=subprocess.PIPE, text=True,
+    )
+    if proceso.returncode != 0 or not resultado.exists():
+        return {"error": proceso.stderr.strip().splitlines()[-5:]}
+    return json.loads(resultado.read_text())
+
+
+def commit_actual():
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], cwd=BASE_DIR, capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def imprimir(escala, datos):
+    print(
+        f"\n{escala}: {datos['estaciones']} estaciones ({datos['estaciones_provincia']} de la provincia) × "
+        f"{datos['anios']} años → {datos['archivos']} archivos, {datos['bytes'] / 1024 ** 2:.1f} MB"
+    )
+    for etapa, r in datos["etapas"].items():
+        if "error" in r:
+            print(f"  {etapa:<18} ERROR: {' | '.join(r['error'])}")
+            continue
+        print(
+            f"  {etapa:<18} {r['segundos']:8.2f} s  {r['filas']:>10} filas  {r['filas_s']:>12,.0f} filas/s  "
+            f"RSS máx {r['rss_max_mb']:7.1f} MB (base {r['rss_base_mb']:.1f})"
+        )
+
+
+def comparar(reporte, anterior):
+    previas = {escala["escala"]: escala for escala in anterior["escalas"]}
+    print(f"\nComparación contra {anterior.get('commit')} ({anterior.get('fecha')}): tiempo y RSS máx (anterior → actual)")
+    for escala in reporte["escalas"]:
+        previa = previas.get(escala["escala"])
+        if previa is None:
+            continue
+        for etapa, r in escala["etapas"].items():
+            p = previa["etapas"].get(etapa)
+            if p is None or "error" in p or "error" in r:
+                continue
+            print(
+                f"  {escala['escala']:>8} {etapa:<18} {p['segundos']:8.2f} s → {r['segundos']:8.2f} s "
+                f"(x{p['segundos'] / r['segundos']:.2f})  {p['rss_max_mb']:7.1f} → {r['rss_max_mb']:7.1f} MB"
+            )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--escalas", default="4x0.25,12x1", help="Lista de <estaciones>x<años>")
+    parser.add_argument("--provincia", default="BUENOS AIRES", help="PROVINCIA_OBJETIVO (sus estaciones van primero)")
+    parser.add_argument("--desde", type=date.fromisoformat, default=date(2020, 1, 1))
+    parser.add_argument("--semilla", type=int, default=0)
+    parser.add_argument("--csv", action="store_true", help="Exportar también los CSV (EXPORTAR_CSV=true)")
+    parser.add_argument("--trabajo", type=Path, help="Carpeta para los espacios de trabajo (por defecto, temporal)")
+    parser.add_argument("--conservar", action="store_true", help="No borra los espacios de trabajo al terminar")
+    parser.add_argument("--reporte", type=Path, help="Ruta del reporte JSON (por defecto benchmarks/resultados/)")
+    parser.add_argument("--comparar", type=Path, help="Reporte anterior con el que comparar")
+    parser.add_argument("--baja-memoria", action="store_true", help="Plata estación por estación (procesar_plata_baja_memoria)")
+    parser.add_argument("--etapa", choices=ETAPAS + ETAPAS_BAJA_MEMORIA, help=argparse.SUPPRESS)
+    parser.add_argument("--resultado", type=Path, help=argparse.SUPPRESS)
+    agregar_argumentos(parser)
+    args = parser.parse_args()
+
+    # Proceso hijo: una sola etapa
+    if args.etapa:
+        args.resultado.write_text(json.dumps(ejecutar_etapa(args.etapa)))
+        return
+
+    trabajo = args.trabajo or Path(tempfile.mkdtemp(prefix="bench_pipeline_"))
+    reporte = {
+        "fecha": datetime.now().isoformat(timespec="seconds"),
+        "commit": commit_actual(),
+        "python": platform.python_version(),
+        "plataforma": platform.platform(),
+        "cpus": os.cpu_count(),
+        "provincia": args.provincia,
+        "csv": args.csv,
+        "baja_memoria": args.baja_memoria,
+        "generacion": {
+            clave: getattr(args, clave)
+            for clave in ["faltantes", "cortes", "sinopticas", "blancos", "invalidos", "semilla"]
+        } | {"desde": args.desde.isoformat()},
+        "escalas": [],
+    }
+
+    try:
+        for escala in args.escalas.split(","):
+            estaciones, anios = leer_escala(escala)
+            espacio = trabajo / escala
+            shutil.rmtree(espacio, ignore_errors=True)
+            datos = {"escala": escala, **preparar_espacio(espacio, estaciones, anios, args), "etapas": {}}
+            for etapa in ETAPAS_BAJA_MEMORIA if args.baja_memoria else ETAPAS:
+                datos["etapas"][etapa] = correr_etapa(etapa, espacio, args)
+                if "error" in datos["etapas"][etapa]:
+                    break
+            reporte["escalas"].append(datos)
+            imprimir(escala, datos)
+            if not args.conservar:
+                shutil.rmtree(espacio, ignore_errors=True)
+    finally:
+        if not args.conservar and args.trabajo is None:
+            shutil.rmtree(trabajo, ignore_errors=True)
+
+    destino = args.reporte or RESULTADOS_DIR / f"pipeline_{datetime.now().strftime('%Y%m%d_%H%M%S')}.json"
+    destino.parent.mkdir(parents=True, exist_ok=True)
+    destino.write_text(json.dumps(reporte, indent=1, ensure_ascii=False), encoding="utf-8")
+    print(f"\nReporte: {destino}")
+
+    if args.comparar:
+        comparar(reporte, json.loads(args.comparar.read_text(encoding="utf-8")))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,188 @@
+"""Compara el esquema original de smn_obs contra el ajustado (04_almacenamiento_smn.sql) en TimescaleDB.
+
+Genera una carga sintética de varios años (estaciones × horas, con ciclo diario y ruido) y la
+inserta día por día en dos hypertables con la misma ruta que POST /ingest/ (COPY a una tabla
+temporal + INSERT ... ON CONFLICT DO NOTHING):
+
+  - antes:   chunks por defecto (7 días), índice único duplicado de la PK, índices por estación y por hora.
+  - después: chunks de --chunk, sin índices redundantes, compresión segmentada por estación
+             y ordenada por fecha_hora (se comprimen los chunks más viejos que --compresion-tras).
+
+Reporta filas/s de inserción, cantidad de chunks y espacio en disco (tabla + índices) de cada
+variante. Usa las variables PG_* del .env y trabaja en tablas propias que borra al terminar.
+
+Uso (desde la raíz del repositorio, con TimescaleDB levantada):
+    python benchmarks/bench_timescale.py --estaciones 20 --anios 3
+"""
+import argparse
+import asyncio
+import os
+import time
+from datetime import datetime, timedelta, timezone
+
+import asyncpg
+import numpy as np
+
+COLUMNAS = ["estacion_nombre", "fecha_hora", "temp_c", "hum_pct", "pnm_hpa", "wind_dir_deg", "wind_speed_kmh"]
+
+SQL_TABLA = """
+    CREATE TABLE {tabla} (
+      estacion_nombre TEXT NOT NULL,
+      fecha_hora      TIMESTAMPTZ NOT NULL,
+      temp_c          DOUBLE PRECISION,
+      hum_pct         DOUBLE PRECISION,
+      pnm_hpa         DOUBLE PRECISION,
+      wind_dir_deg    DOUBLE PRECISION,
+      wind_speed_kmh  DOUBLE PRECISION,
+      created_at      TIMESTAMPTZ NOT NULL DEFAULT now(),
+      PRIMARY KEY (estacion_nombre, fecha_hora)
+    )
+"""
+
+# Esquema original (02_schema_smn.sql antes del ajuste)
+SQL_ANTES = [
+    "SELECT create_hypertable('{tabla}', 'fecha_hora')",
+    "CREATE UNIQUE INDEX {tabla}_ux_est_hora ON {tabla} (estacion_nombre, fecha_hora)",
+    "CREATE INDEX {tabla}_idx_ts ON {tabla} (fecha_hora DESC)",
+    "CREATE INDEX {tabla}_idx_est ON {tabla} (estacion_nombre)",
+]
+
+# Esquema ajustado (04_almacenamiento_smn.sql)
+SQL_DESPUES = [
+    "SELECT create_hypertable('{tabla}', 'fecha_hora', chunk_time_interval => INTERVAL '{chunk}')",
+    """ALTER TABLE {tabla} SET (
+         timescaledb.compress,
+         timescaledb.compress_segmentby = 'estacion_nombre',
+         timescaledb.compress_orderby = 'fecha_hora DESC'
+       )""",
+]
+
+SQL_STAGING = "CREATE TEMP TABLE bench_staging (LIKE {tabla} INCLUDING DEFAULTS) ON COMMIT DROP"
+SQL_UPSERT = """
+    INSERT INTO {tabla} ({columnas})
+    SELECT DISTINCT ON (estacion_nombre, fecha_hora) {columnas} FROM bench_staging
+    ON CONFLICT (estacion_nombre, fecha_hora) DO NOTHING
+"""
+
+
+# Un día de observaciones horarias de todas las estaciones (temperatura con ciclo diario y estacional)
+def generar_dia(estaciones, dia, rng):
+    horas = np.arange(24)
+    dia_anio = dia.timetuple().tm_yday
+    filas = []
+    for i, estacion in enumerate(estaciones):
+        base = 18 + 8 * np.cos(2 * np.pi * (dia_anio - 15) / 365) - i * 0.3
+        temp = np.round(base + 6 * np.sin(2 * np.pi * (horas - 9) / 24) + rng.normal(0, 1, 24), 1)
+        hum = np.clip(np.round(70 - 2 * (temp - base) + rng.normal(0, 5, 24)), 5, 100)
+        pnm = np.round(1013 + rng.normal(0, 4) + rng.normal(0, 0.5, 24), 1)
+        dd = rng.choice(np.arange(0, 361, 10), 24)
+        ff = np.round(np.abs(rng.normal(12, 6, 24)))
+        for h in horas:
+            filas.append((
+                estacion, dia + timedelta(hours=int(h)),
+                float(temp[h]), float(hum[h]), float(pnm[h]), float(dd[h]), float(ff[h]),
+            ))
+    return filas
+
+
+async def tamanio(conn, tabla):
+    fila = await conn.fetchrow(
+        "SELECT table_bytes, index_bytes, toast_bytes, total_bytes FROM hypertable_detailed_size($1)", tabla
+    )
+    chunks = await conn.fetchval("SELECT count(*) FROM show_chunks($1)", tabla)
+    return dict(fila), chunks
+
+
+async def medir_variante(conn, variante, args, dias, estaciones):
+    tabla = f"bench_smn_obs_{variante}"
+    await conn.execute(f"DROP TABLE IF EXISTS {tabla} CASCADE")
+    await conn.execute(SQL_TABLA.format(tabla=tabla))
+    for sql in SQL_ANTES if variante == "antes" else SQL_DESPUES:
+        await conn.execute(sql.format(tabla=tabla, chunk=args.chunk))
+
+    rng = np.random.default_rng(0)
+    columnas = ", ".join(COLUMNAS)
+    filas = 0
+    t_insercion = 0.0
+    for dia in dias:
+        registros = generar_dia(estaciones, dia, rng)
+        t0 = time.perf_counter()
+        async with conn.transaction():
+            await conn.execute(SQL_STAGING.format(tabla=tabla))
+            await conn.copy_records_to_table("bench_staging", records=registros, columns=COLUMNAS)
+            await conn.execute(SQL_UPSERT.format(tabla=tabla, columnas=columnas))
+        t_insercion += time.perf_counter() - t0
+        filas += len(registros)
+
+    resultado = {"filas": filas, "insercion_s": t_insercion}
+    resultado["tamanio"], resultado["chunks"] = await tamanio(conn, tabla)
+
+    if variante == "despues":
+        t0 = time.perf_counter()
+        comprimidos = await conn.fetch(
+            f"SELECT compress_chunk(c, if_not_compressed => TRUE) FROM show_chunks('{tabla}', older_than => INTERVAL '{args.compresion_tras}') c"
+        )
+        resultado["compresion_s"] = time.perf_counter() - t0
+        resultado["comprimidos"] = len(comprimidos)
+        resultado["tamanio_comprimido"], _ = await tamanio(conn, tabla)
+
+    if not args.conservar:
+        await conn.execute(f"DROP TABLE {tabla} CASCADE")
+    return resultado
+
+
+def mb(n):
+    return f"{(n or 0) / 1024 ** 2:9.1f} MB"
+
+
+def reportar(variante, r):
+    t = r["tamanio"]
+    print(f"\n{variante.upper()}")
+    print(f"  Inserción: {r['filas']} filas en {r['insercion_s']:.1f} s → {r['filas'] / r['insercion_s']:,.0f} filas/s")
+    print(f"  Chunks: {r['chunks']}")
+    print(f"  Tabla: {mb(t['table_bytes'])} | Índices: {mb(t['index_bytes'])} | Total: {mb(t['total_bytes'])}")
+    if "tamanio_comprimido" in r:
+        c = r["tamanio_comprimido"]
+        print(f"  Compresión de {r['comprimidos']} chunks en {r['compresion_s']:.1f} s")
+        print(f"  Comprimido → Tabla: {mb(c['table_bytes'])} | Índices: {mb(c['index_bytes'])} | Total: {mb(c['total_bytes'])}")
+
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--estaciones", type=int, default=20)
+    parser.add_argument("--anios", type=float, default=3)
+    parser.add_argument("--chunk", default="30 days")
+    parser.add_argument("--compresion-tras", default="90 days")
+    parser.add_argument("--conservar", action="store_true", help="No borra las tablas al terminar")
+    args = parser.parse_args()
+
+    estaciones = [f"ESTACION SINTETICA {i:03d}" for i in range(args.estaciones)]
+    hoy = datetime.now(timezone.utc).replace(hour=0, minute=0, second=0, microsecond=0)
+    total_dias = int(args.anios * 365)
+    dias = [hoy - timedelta(days=total_dias - i) for i in range(total_dias)]
+    print(f"Carga sintética: {len(estaciones)} estaciones × {total_dias} días × 24 h = {len(estaciones) * total_dias * 24} filas")
+
+    conn = await asyncpg.connect(
+        host=os.getenv("PG_HOST", "localhost"),
+        port=int(os.getenv("PG_PORT", "5432")),
+        user=os.getenv("PG_USER"),
+        password=os.getenv("PG_PASSWORD"),
+        database=os.getenv("PG_DB"),
+    )
+    try:
+        resultados = {}
+        for variante in ["antes", "despues"]:
+            resultados[variante] = await medir_variante(conn, variante, args, dias, estaciones)
+            reportar(variante, resultados[variante])
+    finally:
+        await conn.close()
+
+    antes, despues = resultados["antes"], resultados["despues"]
+    velocidad = (despues["filas"] / despues["insercion_s"]) / (antes["filas"] / antes["insercion_s"])
+    print(f"\nInserción: x{velocidad:.2f}")
+    print(f"Disco sin comprimir: x{antes['tamanio']['total_bytes'] / despues['tamanio']['total_bytes']:.2f} menos")
+    print(f"Disco comprimido:    x{antes['tamanio']['total_bytes'] / despues['tamanio_comprimido']['total_bytes']:.2f} menos")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,120 @@
+"""Prueba de carga de la API: N subidas de datohorario en paralelo contra una instancia local.
+
+Envía el mismo archivo --subidas veces con --concurrencia requests simultáneos (cada subida con
+un nombre distinto) y reporta la latencia p50/p99 y el throughput. Mientras dura la carga consulta
+GET /pool/ cada --intervalo segundos: si el event loop queda bloqueado por la escritura o el
+parseo de los archivos, esa latencia crece junto con la de las subidas.
+
+Por defecto usa POST /ingest/ (el archivo temporal se borra al terminar). Con --endpoint /upload/
+los archivos quedan en data/raw/datohorario y los levanta el orquestador.
+
+Uso (desde la raíz del repositorio, con la API levantada):
+    python benchmarks/carga_api.py --subidas 50 --concurrencia 10
+"""
+import argparse
+import threading
+import time
+import urllib.request
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+import numpy as np
+
+BASE_DIR = Path(__file__).resolve().parent.parent
+DATOHORARIO_DIR = BASE_DIR / "data" / "raw" / "datohorario" / "_procesados"
+
+
+# Cuerpo multipart/form-data con un único campo "file"
+def multipart(nombre, contenido):
+    limite = uuid.uuid4().hex
+    cuerpo = (
+        f"--{limite}\r\n"
+        f'Content-Disposition: form-data; name="file"; filename="{nombre}"\r\n'
+        "Content-Type: text/plain\r\n\r\n"
+    ).encode() + contenido + f"\r\n--{limite}--\r\n".encode()
+    return cuerpo, f"multipart/form-data; boundary={limite}"
+
+
+def subir(url, nombre, contenido, timeout):
+    cuerpo, tipo = multipart(nombre, contenido)
+    request = urllib.request.Request(url, data=cuerpo, method="POST", headers={"Content-Type": tipo})
+    t0 = time.perf_counter()
+    try:
+        with urllib.request.urlopen(request, timeout=timeout) as respuesta:
+            respuesta.read()
+            ok = respuesta.status == 200
+    except Exception as e:
+        print(f"  ❌ {nombre}: {e}")
+        ok = False
+    return time.perf_counter() - t0, ok
+
+
+# Consulta liviana periódica para medir cuánto tarda la API en responder durante la carga
+def sondear(url, intervalo, fin, latencias):
+    while not fin.is_set():
+        t0 = time.perf_counter()
+        try:
+            with urllib.request.urlopen(url, timeout=30) as respuesta:
+                respuesta.read()
+            latencias.append(time.perf_counter() - t0)
+        except Exception:
+            pass
+        fin.wait(intervalo)
+
+
+def resumen(titulo, latencias):
+    if not latencias:
+        print(f"{titulo}: sin datos")
+        return
+    ms = 1000 * np.array(latencias)
+    print(
+        f"{titulo}: n={len(ms)}  p50={np.percentile(ms, 50):8.1f} ms  "
+        f"p99={np.percentile(ms, 99):8.1f} ms  max={ms.max():8.1f} ms"
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--url", default="http://localhost:8000")
+    parser.add_argument("--endpoint", default="/ingest/")
+    parser.add_argument("--archivo", type=Path, default=None, help="Archivo datohorario a subir (por defecto el primero de _procesados)")
+    parser.add_argument("--subidas", type=int, default=50)
+    parser.add_argument("--concurrencia", type=int, default=10)
+    parser.add_argument("--intervalo", type=float, default=0.1, help="Segundos entre consultas a GET /pool/")
+    parser.add_argument("--timeout", type=float, default=300)
+    args = parser.parse_args()
+
+    archivo = args.archivo or sorted(DATOHORARIO_DIR.glob("datohorario*.txt"))[0]
+    contenido = archivo.read_bytes()
+    url = args.url.rstrip("/") + args.endpoint
+    print(f"Archivo: {archivo.name} ({len(contenido) / 1024:.0f} KB) → {url}")
+    print(f"Subidas: {args.subidas} | Concurrencia: {args.concurrencia}")
+
+    fin = threading.Event()
+    latencias_sondeo = []
+    sondeo = threading.Thread(
+        target=sondear, args=(args.url.rstrip("/") + "/pool/", args.intervalo, fin, latencias_sondeo), daemon=True
+    )
+    sondeo.start()
+
+    prefijo = uuid.uuid4().hex[:8]
+    t0 = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=args.concurrencia) as executor:
+        resultados = list(executor.map(
+            lambda i: subir(url, f"carga_{prefijo}_{i:04d}_{archivo.name}", contenido, args.timeout),
+            range(args.subidas),
+        ))
+    total = time.perf_counter() - t0
+    fin.set()
+    sondeo.join()
+
+    latencias = [latencia for latencia, ok in resultados if ok]
+    errores = sum(not ok for _, ok in resultados)
+    print(f"\nTiempo total: {total:.2f} s | {len(latencias) / total:.2f} subidas/s | Errores: {errores}")
+    resumen("Subidas    ", latencias)
+    resumen("GET /pool/ ", latencias_sondeo)
+
+
+if __name__ == "__main__":
+    main()
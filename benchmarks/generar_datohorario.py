@@ -0,0 +1,176 @@
+"""Genera archivos datohorario sintéticos con el mismo formato que los del SMN.
+
+Un archivo por día (datohorarioAAAAMMDD.txt, ancho fijo, latin1, CRLF, líneas de 100 caracteres),
+con las estaciones del catálogo data/raw/estaciones/estaciones_smn.txt ordenadas por nombre y sus
+observaciones de 0 a 23 h. Los nombres de más de 26 caracteres continúan en la línea siguiente,
+como en los archivos reales.
+
+Los valores siguen ciclos diarios y estacionales según la latitud y altura de cada estación
+(temperatura, humedad relativa, presión con deriva sinóptica, viento). Para ejercitar la limpieza de
+Plata se inyectan:
+  - horas sin observación (--faltantes) y cortes de varios días por estación (--cortes)
+  - estaciones que solo informan las horas sinópticas 0, 3, ..., 21 (--sinopticas)
+  - valores en blanco dentro de una fila (--blancos)
+  - direcciones de viento inválidas DD > 360 (--invalidos)
+
+Las estaciones de --provincia van primero, así con --estaciones se elige cuántas procesa el pipeline
+(PROVINCIA_OBJETIVO) y cuántas solo se leen y descartan.
+
+Uso (desde la raíz del repositorio):
+    python benchmarks/generar_datohorario.py --salida /tmp/smn/data/raw/datohorario --estaciones 40 --anios 2
+"""
+import argparse
+import sys
+from datetime import date, timedelta
+from pathlib import Path
+
+import numpy as np
+
+BASE_DIR = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(BASE_DIR / "pipeline"))
+
+from datohorario import ANCHO_NOMBRE, ENCODING  # noqa: E402
+from estaciones import obtener_catalogo  # noqa: E402
+
+ESTACIONES_FILE = BASE_DIR / "data" / "raw" / "estaciones" / "estaciones_smn.txt"
+
+ANCHO_LINEA = 100
+INICIO_CONTINUACION = 44
+ENCABEZADO = [
+    "FECHA     HORA  TEMP   HUM   PNM    DD    FF     NOMBRE",
+    "         [HOA]  [ºC]   [%]  [hPa]  [gr] [km/hr]",
+]
+# Ancho y formato de cada valor en la línea (los faltantes quedan en blanco)
+CAMPOS = [("TEMP", 6, "{:6.1f}"), ("HUM", 5, "{:5.0f}"), ("PNM", 8, "{:8.1f}"), ("DD", 5, "{:5.0f}"), ("FF", 5, "{:5.0f}")]
+HORAS = np.arange(24)
+HORAS_SINOPTICAS = np.arange(0, 24, 3)
+DD_INVALIDO = 990
+
+
+def linea(texto):
+    return texto.ljust(ANCHO_LINEA) + "\r\n"
+
+
+# Estaciones del catálogo: primero las de la provincia, después el resto (cada grupo por nombre)
+def elegir_estaciones(catalogo, cantidad, provincia=None):
+    df = catalogo.df.assign(_otra=catalogo.df["provincia"] != (provincia or "").upper())
+    df = df.sort_values(["_otra", "nombre"]).head(cantidad)
+    return df.sort_values("nombre").reset_index(drop=True)
+
+
+class Generador:
+    """Series horarias sintéticas por estación, día por día."""
+
+    def __init__(self, estaciones, args, semilla=0):
+        self.rng = np.random.default_rng(semilla)
+        self.args = args
+        self.nombres = estaciones["nombre"].tolist()
+        n = len(self.nombres)
+
+        latitud = np.nan_to_num(estaciones["latitud"].to_numpy(dtype=float), nan=-30.0)
+        altura = estaciones["altura_m"].to_numpy(dtype=float)
+
+        # Más frío hacia el sur y en altura; la amplitud estacional crece con la latitud
+        self.temp_media = 30 + 0.45 * latitud - 6.5 * altura / 1000
+        self.amplitud_anual = 4 + 0.15 * np.abs(latitud)
+        self.pnm_media = 1013 + self.rng.normal(0, 2, n)
+        self.deriva_pnm = np.zeros(n)
+        self.sinopticas = self.rng.random(n) < args.sinopticas
+        self.corte_hasta = np.full(n, -1)
+
+    def dia(self, indice, fecha):
+        """Observaciones del día: dict de matrices estaciones × 24 (NaN = en blanco) y máscara de filas presentes."""
+        rng, args = self.rng, self.args
+        n = len(self.nombres)
+        dia_anio = fecha.timetuple().tm_yday
+
+        # Hemisferio sur: máximo en enero
+        estacional = self.amplitud_anual * np.cos(2 * np.pi * (dia_anio - 15) / 365.25)
+        base = (self.temp_media + estacional + rng.normal(0, 2, n))[:, None]
+        diario = 5 * np.sin(2 * np.pi * (HORAS - 9) / 24)[None, :]
+        temp = np.round(base + diario + rng.normal(0, 0.6, (n, 24)), 1)
+
+        hum = np.clip(np.round(70 - 2.5 * (temp - base) + rng.normal(0, 6, (n, 24))), 5, 100)
+
+        self.deriva_pnm = 0.8 * self.deriva_pnm + rng.normal(0, 3, n)
+        pnm = np.round((self.pnm_media + self.deriva_pnm)[:, None] + rng.normal(0, 0.4, (n, 24)), 1)
+
+        ff = np.round(np.abs(rng.normal(12, 7, (n, 24))))
+        dd = rng.integers(1, 37, (n, 24)) * 10.0
+        dd[ff == 0] = 0
+
+        # Filas presentes: sin cortes de varios días, horas sinópticas en algunas estaciones y horas sueltas
+        inicia_corte = (rng.random(n) < args.cortes) & (self.corte_hasta < indice)
+        self.corte_hasta[inicia_corte] = indice + rng.integers(0, 10, inicia_corte.sum())
+        presentes = rng.random((n, 24)) >= args.faltantes
+        presentes[self.sinopticas] &= np.isin(HORAS, HORAS_SINOPTICAS)
+        presentes[self.corte_hasta >= indice] = False
+
+        valores = {"TEMP": temp, "HUM": hum, "PNM": pnm, "DD": dd, "FF": ff}
+        dd[rng.random((n, 24)) < args.invalidos] = DD_INVALIDO
+        for var in valores.values():
+            var[rng.random((n, 24)) < args.blancos] = np.nan
+        return valores, presentes
+
+    def texto(self, indice, fecha):
+        valores, presentes = self.dia(indice, fecha)
+        fecha_txt = fecha.strftime("%d%m%Y")
+        lineas = [linea(texto) for texto in ENCABEZADO]
+        for i, nombre in enumerate(self.nombres):
+            cabeza, resto = nombre[:ANCHO_NOMBRE], nombre[ANCHO_NOMBRE:].strip()
+            for h in np.flatnonzero(presentes[i]):
+                campos = "".join(
+                    " " * ancho if np.isnan(valores[var][i, h]) else formato.format(valores[var][i, h])
+                    for var, ancho, formato in CAMPOS
+                )
+                lineas.append(linea(f"{fecha_txt}{h:6d}{campos}     {cabeza}"))
+                if resto:
+                    lineas.append(linea(" " * INICIO_CONTINUACION + resto))
+                    lineas.append(linea(""))
+        return "".join(lineas)
+
+
+def generar(salida, estaciones, desde, dias, args, semilla=0):
+    """Escribe un archivo por día en salida; devuelve la lista de archivos."""
+    salida = Path(salida)
+    salida.mkdir(parents=True, exist_ok=True)
+    generador = Generador(estaciones, args, semilla)
+    archivos = []
+    for indice in range(dias):
+        fecha = desde + timedelta(days=indice)
+        archivo = salida / f"datohorario{fecha.strftime('%Y%m%d')}.txt"
+        with open(archivo, "w", encoding=ENCODING, newline="") as f:
+            f.write(generador.texto(indice, fecha))
+        archivos.append(archivo)
+    return archivos
+
+
+# Opciones de las anomalías inyectadas y del catálogo (compartidas con bench_pipeline.py)
+def agregar_argumentos(parser):
+    parser.add_argument("--faltantes", type=float, default=0.02, help="Proporción de horas sin observación")
+    parser.add_argument("--cortes", type=float, default=0.002, help="Probabilidad diaria de un corte de 1 a 10 días por estación")
+    parser.add_argument("--sinopticas", type=float, default=0.2, help="Proporción de estaciones que solo informan cada 3 h")
+    parser.add_argument("--blancos", type=float, default=0.005, help="Proporción de valores en blanco")
+    parser.add_argument("--invalidos", type=float, default=0.001, help="Proporción de DD inválidos (> 360)")
+    parser.add_argument("--catalogo", type=Path, default=ESTACIONES_FILE, help="estaciones_smn.txt")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--salida", type=Path, required=True, help="Carpeta donde escribir los datohorario*.txt")
+    parser.add_argument("--anios", type=float, default=1)
+    parser.add_argument("--desde", type=date.fromisoformat, default=date(2020, 1, 1))
+    parser.add_argument("--semilla", type=int, default=0)
+    parser.add_argument("--estaciones", type=int, default=20, help="Estaciones por archivo (máximo: las del catálogo)")
+    parser.add_argument("--provincia", default="MISIONES", help="Provincia cuyas estaciones van primero")
+    agregar_argumentos(parser)
+    args = parser.parse_args()
+
+    estaciones = elegir_estaciones(obtener_catalogo(args.catalogo), args.estaciones, args.provincia)
+    dias = int(round(args.anios * 365))
+    archivos = generar(args.salida, estaciones, args.desde, dias, args, args.semilla)
+    print(f"{len(archivos)} archivos ({len(estaciones)} estaciones) en {args.salida}")
+
+
+if __name__ == "__main__":
+    main()
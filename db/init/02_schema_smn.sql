@@ -15,10 +15,6 @@ CREATE TABLE smn_obs (
 -- Hypertable por tiempo
 SELECT create_hypertable('smn_obs', 'fecha_hora', if_not_exists => TRUE);
 
--- Unicidad por estación + hora (evita duplicados al reingestar)
-CREATE UNIQUE INDEX IF NOT EXISTS ux_smn_obs_est_hora
-  ON smn_obs (estacion_nombre, fecha_hora);
-
--- Índices útiles
-CREATE INDEX IF NOT EXISTS idx_smn_obs_ts ON smn_obs (fecha_hora DESC);
-CREATE INDEX IF NOT EXISTS idx_smn_obs_est ON smn_obs (estacion_nombre);
\ No newline at end of file
+-- Índices: la PRIMARY KEY (estacion_nombre, fecha_hora) ya garantiza la unicidad por estación + hora
+-- (evita duplicados al reingestar) y sirve para filtrar por estación; create_hypertable agrega el
+-- índice por fecha_hora DESC. Chunks, compresión y retención: 04_almacenamiento_smn.sql
\ No newline at end of file
@@ -0,0 +1,85 @@
+-- Agregados continuos diarios y mensuales por estación (mismas métricas que el diario de Plata:
+-- TEMP_MEAN, TEMP_MIN, TEMP_MAX, ...). Los días y meses se cortan en hora local de Argentina:
+-- la API guarda en fecha_hora el instante de cada hora de datohorario (hora local localizada),
+-- así que cada día tiene las mismas horas que el diario de Plata.
+-- La dirección del viento promedio excluye valores > 360 (calmas/variables), igual que en Plata.
+-- <var>_obs cuenta los valores que entran en cada promedio (para combinar promedios de varios días).
+-- materialized_only = false: las consultas suman en tiempo real las horas aún no materializadas.
+-- TimescaleDB crea los índices por (estacion_nombre, fecha/mes) de cada agregado.
+-- Es idempotente: en una base existente solo crea lo que falta. Los agregados se crean vacíos; para
+-- materializar la historia ya cargada se corre una vez db/mantenimiento/refrescar_agregados.sql.
+
+CREATE MATERIALIZED VIEW IF NOT EXISTS smn_obs_diario
+WITH (timescaledb.continuous, timescaledb.materialized_only = false) AS
+SELECT
+  estacion_nombre,
+  time_bucket(INTERVAL '1 day', fecha_hora, 'America/Argentina/Buenos_Aires') AS fecha,
+  avg(temp_c)                                             AS temp_mean,
+  min(temp_c)                                             AS temp_min,
+  max(temp_c)                                             AS temp_max,
+  avg(pnm_hpa)                                            AS pnm_mean,
+  min(pnm_hpa)                                            AS pnm_min,
+  max(pnm_hpa)                                            AS pnm_max,
+  avg(hum_pct)                                            AS hum_mean,
+  min(hum_pct)                                            AS hum_min,
+  max(hum_pct)                                            AS hum_max,
+  avg(wind_dir_deg) FILTER (WHERE wind_dir_deg <= 360)    AS wind_dir_mean,
+  min(wind_dir_deg)                                       AS wind_dir_min,
+  max(wind_dir_deg)                                       AS wind_dir_max,
+  avg(wind_speed_kmh)                                     AS wind_speed_mean,
+  min(wind_speed_kmh)                                     AS wind_speed_min,
+  max(wind_speed_kmh)                                     AS wind_speed_max,
+  count(*)                                                AS observaciones,
+  count(temp_c)                                           AS temp_obs,
+  count(pnm_hpa)                                          AS pnm_obs,
+  count(hum_pct)                                          AS hum_obs,
+  count(wind_dir_deg) FILTER (WHERE wind_dir_deg <= 360)  AS wind_dir_obs,
+  count(wind_speed_kmh)                                   AS wind_speed_obs
+FROM smn_obs
+GROUP BY estacion_nombre, fecha
+WITH NO DATA;
+
+CREATE MATERIALIZED VIEW IF NOT EXISTS smn_obs_mensual
+WITH (timescaledb.continuous, timescaledb.materialized_only = false) AS
+SELECT
+  estacion_nombre,
+  time_bucket(INTERVAL '1 month', fecha_hora, 'America/Argentina/Buenos_Aires') AS mes,
+  avg(temp_c)                                             AS temp_mean,
+  min(temp_c)                                             AS temp_min,
+  max(temp_c)                                             AS temp_max,
+  avg(pnm_hpa)                                            AS pnm_mean,
+  min(pnm_hpa)                                            AS pnm_min,
+  max(pnm_hpa)                                            AS pnm_max,
+  avg(hum_pct)                                            AS hum_mean,
+  min(hum_pct)                                            AS hum_min,
+  max(hum_pct)                                            AS hum_max,
+  avg(wind_dir_deg) FILTER (WHERE wind_dir_deg <= 360)    AS wind_dir_mean,
+  min(wind_dir_deg)                                       AS wind_dir_min,
+  max(wind_dir_deg)                                       AS wind_dir_max,
+  avg(wind_speed_kmh)                                     AS wind_speed_mean,
+  min(wind_speed_kmh)                                     AS wind_speed_min,
+  max(wind_speed_kmh)                                     AS wind_speed_max,
+  count(*)                                                AS observaciones,
+  count(temp_c)                                           AS temp_obs,
+  count(pnm_hpa)                                          AS pnm_obs,
+  count(hum_pct)                                          AS hum_obs,
+  count(wind_dir_deg) FILTER (WHERE wind_dir_deg <= 360)  AS wind_dir_obs,
+  count(wind_speed_kmh)                                   AS wind_speed_obs
+FROM smn_obs
+GROUP BY estacion_nombre, mes
+WITH NO DATA;
+
+-- Políticas de refresco: re-materializan la ventana reciente (datos en tiempo real y correcciones).
+-- Las inserciones de la API (POST /ingest/ y /simulate/, masivas o fila a fila) refrescan además
+-- el rango de fecha_hora que insertan.
+SELECT add_continuous_aggregate_policy('smn_obs_diario',
+  start_offset      => INTERVAL '3 days',
+  end_offset        => INTERVAL '1 hour',
+  schedule_interval => INTERVAL '30 minutes',
+  if_not_exists     => TRUE);
+
+SELECT add_continuous_aggregate_policy('smn_obs_mensual',
+  start_offset      => INTERVAL '3 months',
+  end_offset        => INTERVAL '1 day',
+  schedule_interval => INTERVAL '1 day',
+  if_not_exists     => TRUE);
@@ -0,0 +1,48 @@
+-- Ajuste de almacenamiento de smn_obs: tamaño de chunk, compresión nativa y retención.
+-- Corre al inicializar la base y también sirve como migración sobre una base existente:
+--   docker exec -i timescaledb psql -U "$PG_USER" -d "$PG_DB" < db/init/04_almacenamiento_smn.sql
+-- Es idempotente. Los valores se toman del entorno (.env) y si no están definidos se usan los de abajo.
+
+\getenv chunk_interval SMN_CHUNK_INTERVAL
+\if :{?chunk_interval}
+\else
+  \set chunk_interval '30 days'
+\endif
+\getenv compresion_tras SMN_COMPRESION_TRAS
+\if :{?compresion_tras}
+\else
+  \set compresion_tras '90 days'
+\endif
+\getenv retencion SMN_RETENCION
+\if :{?retencion}
+\else
+  \set retencion '20 years'
+\endif
+
+-- Índices redundantes de versiones anteriores del esquema: ux_smn_obs_est_hora duplica la PRIMARY KEY,
+-- idx_smn_obs_est es un prefijo de ella e idx_smn_obs_ts repite el índice por tiempo de la hypertable.
+DROP INDEX IF EXISTS ux_smn_obs_est_hora;
+DROP INDEX IF EXISTS idx_smn_obs_est;
+DROP INDEX IF EXISTS idx_smn_obs_ts;
+
+-- Chunks de un mes: ~120 estaciones × 24 h × 30 días ≈ 86 mil filas por chunk (los existentes no cambian)
+SELECT set_chunk_time_interval('smn_obs', INTERVAL :'chunk_interval');
+
+-- Compresión por estación y ordenada por hora: cada segmento es la serie de una estación en el chunk
+ALTER TABLE smn_obs SET (
+  timescaledb.compress,
+  timescaledb.compress_segmentby = 'estacion_nombre',
+  timescaledb.compress_orderby = 'fecha_hora DESC'
+);
+
+SELECT remove_compression_policy('smn_obs', if_exists => TRUE);
+SELECT add_compression_policy('smn_obs', compress_after => INTERVAL :'compresion_tras');
+
+-- Retención de los datos horarios; los agregados diarios/mensuales se conservan, porque sus
+-- políticas de refresco solo cubren la ventana reciente. Un refresco manual de un período ya
+-- borrado lo rematerializaría vacío y perdería esa historia agregada. Por eso
+-- db/mantenimiento/refrescar_agregados.sql empieza en el chunk más viejo que queda, y la API solo
+-- refresca desde el horizonte de esta política. No usar refresh_continuous_aggregate(..., NULL, NULL)
+-- a mano después de que la retención borró chunks.
+SELECT remove_retention_policy('smn_obs', if_exists => TRUE);
+SELECT add_retention_policy('smn_obs', drop_after => INTERVAL :'retencion');
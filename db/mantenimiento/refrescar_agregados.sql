@@ -0,0 +1,25 @@
+-- Materialización completa de los agregados continuos (smn_obs_diario, smn_obs_mensual) sobre todo
+-- el rango de smn_obs. Se corre una sola vez después de crearlos en una base que ya tenía datos
+-- (las políticas de refresco solo cubren la ventana reciente):
+--
+--   docker exec -i timescaledb psql -U "$PG_USER" -d "$PG_DB" < db/init/03_agregados_smn.sql
+--   docker exec -i timescaledb psql -U "$PG_USER" -d "$PG_DB" < db/mantenimiento/refrescar_agregados.sql
+--
+-- El refresco empieza en el chunk más viejo que queda en smn_obs. Antes de ese punto la retención
+-- (db/init/04_almacenamiento_smn.sql) ya borró los datos horarios, y refrescar esos períodos los
+-- rematerializaría vacíos, borrando la historia agregada que se conserva. Los buckets que el
+-- inicio corta por la mitad tampoco se tocan: TimescaleDB refresca solo los buckets completos de la
+-- ventana. Sin chunks (tabla vacía o todo borrado por la retención) no se refresca nada.
+--
+-- CALL no puede ir dentro de una transacción: psql lo ejecuta en modo autocommit.
+
+SELECT min(range_start) IS NOT NULL AS hay_datos, min(range_start) AS desde
+FROM timescaledb_information.chunks
+WHERE hypertable_name = 'smn_obs' \gset
+
+\if :hay_datos
+  CALL refresh_continuous_aggregate('smn_obs_diario', :'desde'::timestamptz, NULL);
+  CALL refresh_continuous_aggregate('smn_obs_mensual', :'desde'::timestamptz, NULL);
+\else
+  \echo 'smn_obs no tiene chunks: no hay nada para refrescar'
+\endif
@@ -0,0 +1,250 @@
+import os
+import shutil
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.dataset as ds
+import pyarrow.parquet as pq
+
+# Almacenamiento columnar (Parquet) de las capas Bronce, Plata y Oro.
+# Los CSV quedan como salida opcional (EXPORTAR_CSV=false para desactivarlos).
+EXPORTAR_CSV = os.getenv("EXPORTAR_CSV", "true").strip().lower() in ("1", "true", "si", "sí", "yes")
+
+# Columnas de identificación de estación (se guardan como categóricas)
+COLUMNAS_ESTACION = ["NOMBRE", "ESTACION"]
+
+# Filas por row group en los Parquet escritos por partes
+FILAS_POR_GRUPO = 1_000_000
+
+# Mediciones de datohorario: TEMP y PNM tienen un decimal; HUM, DD y FF son enteras
+MEDICIONES_DECIMALES = ["TEMP", "PNM"]
+MEDICIONES_ENTERAS = ["HUM", "DD", "FF"]
+
+
+# Tipos de Bronce: FECHA datetime64, HORA int8, mediciones float32 y estación categórica.
+# Todas las mediciones van en float32 para que los archivos diarios compartan el mismo esquema.
+def tipar_bronce(df):
+    df = df.copy()
+    if not pd.api.types.is_datetime64_any_dtype(df["FECHA"]):
+        df["FECHA"] = pd.to_datetime(df["FECHA"].astype(str).str.zfill(8), format="%d%m%Y", errors="coerce")
+    df["HORA"] = pd.to_numeric(df["HORA"], errors="coerce").astype("int8")
+    for col in MEDICIONES_DECIMALES + MEDICIONES_ENTERAS:
+        df[col] = pd.to_numeric(df[col], errors="coerce").astype("float32")
+    df["NOMBRE"] = df["NOMBRE"].astype("category")
+    return df
+
+
+# Tipos para procesar Bronce: los mismos que resultan de leer los CSV (float64/int64 y estación como texto)
+def destipar_bronce(df):
+    df = df.copy()
+    for col in MEDICIONES_DECIMALES + MEDICIONES_ENTERAS:
+        # float32 → float64 sin arrastrar el error de representación (resolución 0.1)
+        df[col] = df[col].astype("float64").round(1)
+        if col in MEDICIONES_ENTERAS and not df[col].isna().any():
+            df[col] = df[col].astype("int64")
+    df["HORA"] = df["HORA"].astype("int64")
+    df["NOMBRE"] = df["NOMBRE"].astype(str)
+    return df
+
+
+# Lectura conjunta de varios Parquet de Bronce en una sola pasada; devuelve además
+# la cantidad de filas de cada archivo (en el mismo orden) para poder identificar su origen
+def leer_parquets_bronce(archivos):
+    dataset = ds.dataset([str(archivo) for archivo in archivos], format="parquet")
+    filas = [fragmento.count_rows() for fragmento in dataset.get_fragments()]
+    return destipar_bronce(dataset.to_table().to_pandas()), filas
+
+
+# Tipos genéricos para Plata y Oro: fechas datetime64, estación categórica y float32
+def tipar(df, float32=True):
+    df = df.copy()
+    for col in df.columns:
+        serie = df[col]
+        if col in COLUMNAS_ESTACION:
+            df[col] = serie.astype("category")
+        elif col in ("FECHA", "FECHA_HORA", "FECHA_DIA") and not pd.api.types.is_datetime64_any_dtype(serie):
+            df[col] = pd.to_datetime(serie)
+        elif float32 and serie.dtype == np.float64:
+            df[col] = serie.astype("float32")
+    return df
+
+
+# Escritura atómica de un archivo Parquet
+def escribir_parquet(df, path, float32=True):
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = path.with_suffix(".parquet.tmp")
+    tipar(df, float32=float32).to_parquet(tmp, index=False)
+    tmp.replace(path)
+
+
+def _estacion_como_texto(df):
+    for col in df.columns:
+        if col in COLUMNAS_ESTACION:
+            df[col] = df[col].astype(str)
+    return df
+
+
+# Lectura de un archivo Parquet con la estación como texto (mismos tipos que la lectura del CSV)
+def leer_parquet(path, columnas=None, filtros=None):
+    return _estacion_como_texto(pd.read_parquet(path, columns=columnas, filters=filtros))
+
+
+# Lectura de algunos row groups de un Parquet (las partes que devolvió EscritorParquet.escribir)
+def leer_grupos(path, grupos, columnas=None):
+    return _estacion_como_texto(pq.ParquetFile(path).read_row_groups(grupos, columns=columnas).to_pandas())
+
+
+class _Escritor:
+    """Escritura por partes: al salir del bloque with se confirma, o se descarta si hubo un error."""
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, tipo, valor, traza):
+        if tipo is None:
+            self.cerrar()
+        else:
+            self.descartar()
+
+
+# CSV escrito por partes, con el encabezado solo en la primera; aparece al cerrar
+class EscritorCSV(_Escritor):
+    def __init__(self, path):
+        self.path = Path(path)
+        self.tmp = self.path.with_suffix(".csv.tmp")
+        self.tmp.parent.mkdir(parents=True, exist_ok=True)
+        self.tmp.unlink(missing_ok=True)
+        self.encabezado = True
+
+    def escribir(self, df):
+        df.to_csv(self.tmp, mode="a", header=self.encabezado, index=False)
+        self.encabezado = False
+
+    def cerrar(self):
+        self.tmp.touch()
+        self.tmp.replace(self.path)
+
+    def descartar(self):
+        self.tmp.unlink(missing_ok=True)
+
+
+# Parquet escrito por partes (p. ej. estación por estación) sin juntarlas en memoria. Cada parte
+# ocupa sus propios row groups: escribir devuelve sus índices, para releerla con leer_grupos.
+# El archivo (y el CSV opcional con las mismas filas) aparece al cerrar, de forma atómica.
+class EscritorParquet(_Escritor):
+    def __init__(self, path, float32=True, csv=None):
+        self.path = Path(path)
+        self.tmp = self.path.with_suffix(".parquet.tmp")
+        self.float32 = float32
+        self.csv = None if csv is None else EscritorCSV(csv)
+        self.escritor = None
+        self.grupos = 0
+
+    def escribir(self, df):
+        if self.csv is not None:
+            self.csv.escribir(df)
+        if df.empty:
+            return []
+        tabla = pa.Table.from_pandas(tipar(df, float32=self.float32), preserve_index=False)
+        if self.escritor is None:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            self.escritor = pq.ParquetWriter(self.tmp, tabla.schema)
+        else:
+            tabla = tabla.cast(self.escritor.schema)
+        self.escritor.write_table(tabla, row_group_size=FILAS_POR_GRUPO)
+        grupos = list(range(self.grupos, self.grupos + -(-len(tabla) // FILAS_POR_GRUPO)))
+        self.grupos += len(grupos)
+        return grupos
+
+    def cerrar(self):
+        if self.escritor is None:
+            return self.descartar()
+        self.escritor.close()
+        self.tmp.replace(self.path)
+        if self.csv is not None:
+            self.csv.cerrar()
+
+    def descartar(self):
+        if self.escritor is not None:
+            self.escritor.close()
+        self.tmp.unlink(missing_ok=True)
+        if self.csv is not None:
+            self.csv.descartar()
+
+
+# Columna auxiliar de partición temporal ("AAAA-MM" o "AAAA") a partir de una columna de fecha
+def columna_periodo(fechas, frecuencia="M"):
+    return pd.to_datetime(fechas).dt.to_period(frecuencia).astype(str)
+
+
+def _escribir_tabla(df, directorio, particiones, float32):
+    tabla = pa.Table.from_pandas(tipar(df, float32=float32), preserve_index=False)
+    ds.write_dataset(
+        tabla,
+        str(directorio),
+        format="parquet",
+        partitioning=particiones,
+        partitioning_flavor="hive",
+        existing_data_behavior="delete_matching",
+        basename_template="part-{i}.parquet",
+    )
+
+
+# Escribe (o reemplaza) solo las particiones presentes en df dentro de un dataset particionado
+def escribir_particiones(df, directorio, particiones, float32=True):
+    if df.empty:
+        return
+    Path(directorio).mkdir(parents=True, exist_ok=True)
+    _escribir_tabla(df, directorio, particiones, float32)
+
+
+# Reemplazo de un dataset particionado escrito por partes (cada una con sus propias particiones):
+# se escribe a un directorio temporal que al cerrar se intercambia con el anterior. El temporal y el
+# anterior empiezan con "_" para que no se lean como particiones cuando el directorio es a su vez una
+# partición de un dataset mayor (PROVINCIA=<provincia>, ver provincias.py).
+class EscritorDataset(_Escritor):
+    def __init__(self, directorio, particiones, float32=True):
+        self.directorio = Path(directorio)
+        self.particiones = particiones
+        self.float32 = float32
+        self.tmp = self.directorio.with_name("_" + self.directorio.name + ".tmp")
+        self.anterior = self.directorio.with_name("_" + self.directorio.name + ".old")
+        shutil.rmtree(self.tmp, ignore_errors=True)
+        shutil.rmtree(self.anterior, ignore_errors=True)
+        self.tmp.mkdir(parents=True)
+
+    def escribir(self, df):
+        if not df.empty:
+            _escribir_tabla(df, self.tmp, self.particiones, self.float32)
+
+    def cerrar(self):
+        if self.directorio.exists():
+            self.directorio.rename(self.anterior)
+        self.tmp.rename(self.directorio)
+        shutil.rmtree(self.anterior, ignore_errors=True)
+
+    def descartar(self):
+        shutil.rmtree(self.tmp, ignore_errors=True)
+
+
+# Reemplaza el dataset completo: se escribe a un directorio temporal y se intercambia
+def reemplazar_dataset(df, directorio, particiones, float32=True):
+    with EscritorDataset(directorio, particiones, float32) as escritor:
+        escritor.escribir(df)
+
+
+# Lee un dataset particionado; los filtros sobre columnas de partición evitan abrir otras carpetas
+def leer_dataset(directorio, columnas=None, filtros=None):
+    df = pd.read_parquet(directorio, columns=columnas, filters=filtros)
+    for col in df.columns:
+        if col in COLUMNAS_ESTACION and isinstance(df[col].dtype, pd.CategoricalDtype):
+            df[col] = df[col].cat.remove_unused_categories()
+    return df
+
+
+def dataset_disponible(directorio):
+    directorio = Path(directorio)
+    return directorio.is_dir() and any(directorio.rglob("*.parquet"))
@@ -0,0 +1,133 @@
+import argparse
+import logging
+import multiprocessing
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from pathlib import Path
+
+import pandas as pd
+
+from pipeline_01_ingest_to_bronce import (
+    BRONCE_DIR, RAW_DIR, leer_procesados, procesar_datohorario_provincias, procesar_datohorario_txt,
+    registrar_procesados,
+)
+from pipeline_02_bronce_to_plata import procesar_plata_incremental
+from pipeline_03_plata_to_oro import procesar_oro
+from provincias import MULTIPROVINCIA, procesar_provincias
+
+# Configuración de logs
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger("uvicorn")
+
+# Carga histórica de archivos datohorario a Bronce en paralelo. Cada archivo se ingesta en un
+# proceso del pool (la escritura de cada Parquet es atómica y reescribe el mismo archivo, así que
+# repetir la carga no duplica datos); al final se registran todos los archivos de una vez en
+# procesados.csv y se ejecuta una única corrida de Plata y Oro. Con PROVINCIAS cada archivo se lee
+# una sola vez para todas las provincias, y Plata y Oro corren por provincia (provincias.py).
+DIRECTORIO_DEFECTO = RAW_DIR / "datohorario" / "_procesados"
+
+
+# Fecha AAAAMMDD del nombre datohorarioAAAAMMDD.txt (None si no la tiene)
+def fecha_archivo(path):
+    try:
+        return pd.Timestamp(path.stem.replace("datohorario", ""))
+    except ValueError:
+        return None
+
+
+def listar_archivos(directorio, desde=None, hasta=None):
+    archivos = []
+    for path in sorted(Path(directorio).glob("datohorario*.txt")):
+        fecha = fecha_archivo(path)
+        if fecha is None:
+            logger.warning(f"⚠️ Nombre sin fecha, se omite: {path.name}")
+            continue
+        if (desde is None or fecha >= desde) and (hasta is None or fecha <= hasta):
+            archivos.append(path)
+    return archivos
+
+
+# Trabajo de cada proceso: solo vuelve la cantidad de filas, no los DataFrames escritos
+def ingestar(path):
+    if MULTIPROVINCIA:
+        escritos = procesar_datohorario_provincias(path)
+    else:
+        escritos = procesar_datohorario_txt(path, BRONCE_DIR)
+    return sum(len(df) for df in escritos.values())
+
+
+def formatear_segundos(segundos):
+    minutos, segundos = divmod(int(segundos), 60)
+    horas, minutos = divmod(minutos, 60)
+    return f"{horas:d}:{minutos:02d}:{segundos:02d}"
+
+
+def backfill(archivos, workers, downstream=True):
+    total = len(archivos)
+    logger.info(f"🚚 Backfill de {total} archivos con {workers} procesos")
+
+    ingestados = []
+    filas = 0
+    t0 = time.perf_counter()
+    # forkserver: los procesos no heredan los hilos de pyarrow del proceso principal
+    contexto = multiprocessing.get_context("forkserver")
+    with ProcessPoolExecutor(max_workers=workers, mp_context=contexto) as pool:
+        futuros = {pool.submit(ingestar, path): path for path in archivos}
+        for hechos, futuro in enumerate(as_completed(futuros), start=1):
+            path = futuros[futuro]
+            try:
+                filas += futuro.result()
+                ingestados.append(path.name)
+            except Exception as e:
+                logger.error(f"❌ Error al procesar {path.name}: {e}")
+
+            transcurrido = time.perf_counter() - t0
+            velocidad = hechos / transcurrido
+            eta = (total - hechos) / velocidad
+            logger.info(
+                f"⏳ {hechos}/{total} ({hechos / total:.0%}) | {velocidad:.1f} archivos/s | "
+                f"transcurrido {formatear_segundos(transcurrido)} | ETA {formatear_segundos(eta)}"
+            )
+
+    duracion = time.perf_counter() - t0
+    registrar_procesados(sorted(ingestados))
+    logger.info(
+        f"✅ Bronce: {len(ingestados)}/{total} archivos, {filas} filas en {duracion:.1f} s "
+        f"({len(ingestados) / duracion:.1f} archivos/s, {filas / duracion:,.0f} filas/s)"
+    )
+
+    if downstream and ingestados:
+        t0 = time.perf_counter()
+        if MULTIPROVINCIA:
+            procesar_provincias()
+        else:
+            plata = procesar_plata_incremental()
+            if plata is not None:
+                procesar_oro(plata)
+        logger.info(f"✅ Plata y Oro actualizados en {time.perf_counter() - t0:.1f} s")
+    return ingestados
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Carga histórica de archivos datohorario a Bronce → Plata → Oro")
+    parser.add_argument("--directorio", type=Path, default=DIRECTORIO_DEFECTO, help="Carpeta con datohorario*.txt")
+    parser.add_argument("--desde", type=pd.Timestamp, help="Primera fecha a cargar (AAAA-MM-DD)")
+    parser.add_argument("--hasta", type=pd.Timestamp, help="Última fecha a cargar (AAAA-MM-DD)")
+    parser.add_argument("--workers", type=int, default=os.cpu_count(), help="Procesos de ingesta")
+    parser.add_argument("--forzar", action="store_true", help="Reprocesa también los archivos ya registrados")
+    parser.add_argument("--sin-downstream", action="store_true", help="Solo Bronce, sin correr Plata y Oro")
+    args = parser.parse_args()
+
+    archivos = listar_archivos(args.directorio, args.desde, args.hasta)
+    if not args.forzar:
+        registrados = leer_procesados()
+        omitidos = [path for path in archivos if path.name in registrados]
+        archivos = [path for path in archivos if path.name not in registrados]
+        if omitidos:
+            logger.info(f"⏭️  {len(omitidos)} archivos ya registrados en procesados.csv (usar --forzar para reprocesarlos)")
+
+    if not archivos:
+        logger.info("✅ No hay archivos para cargar")
+    else:
+        backfill(archivos, args.workers, downstream=not args.sin_downstream)
@@ -0,0 +1,170 @@
+import logging
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from provincias import PARTICION_PROCESO
+
+# Configuración de logs
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger("uvicorn")
+
+# Índice de cobertura de las observaciones horarias de Plata, en un solo archivo (cobertura.npz):
+#  - bits:       matriz estación × día (uint32); el bit h de cada celda indica que hay observación a la hora h
+#  - esperadas:  máscara de horas típicas de cada estación (mismo criterio que la grilla horaria de Plata)
+#  - inicio:     día de la primera columna
+# Se actualiza por (estación, día) a medida que llegan datos, y una consulta por rango solo lee las
+# columnas de ese rango. Con PROVINCIAS hay uno por provincia (data/plata/PROVINCIA=<provincia>/).
+BASE_DIR = Path(".").resolve()
+COBERTURA_FILE = BASE_DIR / "data" / "plata" / PARTICION_PROCESO / "cobertura.npz"
+
+HORAS = np.arange(24, dtype=np.uint32)
+UN_DIA = np.timedelta64(1, "D")
+
+
+# Matriz días × 24 de booleanos a partir de los bits de cada día
+def _expandir(bits):
+    return ((bits[:, None] >> HORAS) & 1).astype(bool)
+
+
+class Cobertura:
+    """Bitmap de cobertura horaria por estación y día."""
+
+    def __init__(self, estaciones=(), inicio=None, bits=None, esperadas=None):
+        self.estaciones = list(estaciones)
+        self.posicion = {estacion: i for i, estacion in enumerate(self.estaciones)}
+        self.inicio = None if inicio is None else np.datetime64(inicio, "D")
+        self.bits = np.zeros((len(self.estaciones), 0), dtype=np.uint32) if bits is None else bits
+        self.esperadas = np.zeros(len(self.estaciones), dtype=np.uint32) if esperadas is None else esperadas
+
+    @property
+    def fin(self):
+        return None if self.inicio is None else self.inicio + (self.bits.shape[1] - 1) * UN_DIA
+
+    @classmethod
+    def cargar(cls, path=COBERTURA_FILE):
+        if not Path(path).exists():
+            return cls()
+        with np.load(path, allow_pickle=False) as datos:
+            inicio = datos["inicio"][0] if len(datos["inicio"]) else None
+            return cls(datos["estaciones"].tolist(), inicio, datos["bits"], datos["esperadas"])
+
+    # Escritura atómica (temporal + reemplazo)
+    def guardar(self, path=COBERTURA_FILE):
+        path = Path(path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = path.with_suffix(".npz.tmp")
+        with open(tmp, "wb") as f:
+            np.savez(
+                f,
+                estaciones=np.asarray(self.estaciones, dtype=str),
+                inicio=np.asarray([] if self.inicio is None else [self.inicio], dtype="datetime64[D]"),
+                bits=self.bits,
+                esperadas=self.esperadas,
+            )
+        tmp.replace(path)
+
+    # Agrega las estaciones y extiende el rango de días que falten para cubrir desde..hasta
+    def _ampliar(self, estaciones, desde, hasta):
+        nuevas = [estacion for estacion in estaciones if estacion not in self.posicion]
+        for estacion in nuevas:
+            self.posicion[estacion] = len(self.estaciones)
+            self.estaciones.append(estacion)
+        if nuevas:
+            self.bits = np.vstack([self.bits, np.zeros((len(nuevas), self.bits.shape[1]), dtype=np.uint32)])
+            self.esperadas = np.concatenate([self.esperadas, np.zeros(len(nuevas), dtype=np.uint32)])
+
+        if self.inicio is None:
+            self.inicio = desde
+            self.bits = np.zeros((len(self.estaciones), int((hasta - desde) / UN_DIA) + 1), dtype=np.uint32)
+            return
+        antes = max(0, int((self.inicio - desde) / UN_DIA))
+        despues = max(0, int((hasta - self.fin) / UN_DIA))
+        if antes or despues:
+            self.bits = np.pad(self.bits, ((0, 0), (antes, despues)))
+            self.inicio = self.inicio - antes * UN_DIA
+
+    def actualizar(self, horario, dias, umbral):
+        """Recalcula las celdas de los (NOMBRE, FECHA) de dias con las observaciones de horario
+        (NOMBRE, FECHA_HORA) de esos días, y las horas esperadas de cada estación (presentes en al
+        menos umbral de sus días con datos)."""
+        if dias.empty:
+            return
+        fechas = dias["FECHA"].to_numpy().astype("datetime64[D]")
+        self._ampliar(dias["NOMBRE"].astype(str).unique(), fechas.min(), fechas.max())
+
+        filas = dias["NOMBRE"].astype(str).map(self.posicion).to_numpy(dtype=np.int64)
+        self.bits[filas, (fechas - self.inicio).astype(int)] = 0
+
+        horario = horario[horario["FECHA_HORA"].notna()]
+        fecha_hora = horario["FECHA_HORA"].to_numpy()
+        dia = fecha_hora.astype("datetime64[D]")
+        filas = horario["NOMBRE"].astype(str).map(self.posicion).to_numpy(dtype=np.int64)
+        columnas = (dia - self.inicio).astype(int)
+        horas = (fecha_hora.astype("datetime64[h]") - dia).astype(np.int64).astype(np.uint32)
+        np.bitwise_or.at(self.bits, (filas, columnas), np.uint32(1) << horas)
+
+        # Proporción de días con datos que tienen cada hora, por estación
+        con_datos = (self.bits != 0).sum(axis=1)
+        por_hora = np.stack([((self.bits >> h) & 1).sum(axis=1) for h in HORAS], axis=1)
+        validas = por_hora >= umbral * con_datos[:, None]
+        validas &= con_datos[:, None] > 0
+        self.esperadas = (validas.astype(np.uint32) << HORAS).sum(axis=1, dtype=np.uint32)
+
+    def horas_esperadas(self, estacion):
+        return HORAS[_expandir(self.esperadas[[self.posicion[estacion]]])[0]].tolist()
+
+    def consultar(self, estacion, desde, hasta):
+        """Horas esperadas sin observación de una estación entre desde y hasta (inclusive, a nivel de hora)."""
+        fila = self.posicion[estacion]
+        desde = pd.Timestamp(desde).floor("h")
+        hasta = pd.Timestamp(hasta).floor("h")
+        dias = np.arange(np.datetime64(desde.date()), np.datetime64(hasta.date()) + UN_DIA, UN_DIA)
+
+        # Bits de los días del rango; los días fuera del índice no tienen observaciones
+        bits = np.zeros(len(dias), dtype=np.uint32)
+        if self.inicio is not None:
+            i0 = int((dias[0] - self.inicio) / UN_DIA)
+            desde_i, hasta_i = max(i0, 0), min(i0 + len(dias), self.bits.shape[1])
+            if desde_i < hasta_i:
+                bits[desde_i - i0:hasta_i - i0] = self.bits[fila, desde_i:hasta_i]
+
+        esperadas = _expandir(self.esperadas[[fila]])[0]
+        observadas = _expandir(bits)
+        horas = dias[:, None].astype("datetime64[h]") + HORAS.astype("timedelta64[h]")
+        en_rango = (horas >= desde.to_datetime64()) & (horas <= hasta.to_datetime64())
+
+        esperadas_rango = esperadas & en_rango
+        faltantes = esperadas_rango & ~observadas
+        total = int(esperadas_rango.sum())
+        return {
+            "estacion": estacion,
+            "desde": desde.isoformat(),
+            "hasta": hasta.isoformat(),
+            "horas_esperadas": self.horas_esperadas(estacion),
+            "esperadas": total,
+            "faltantes": int(faltantes.sum()),
+            "cobertura": round(1 - faltantes.sum() / total, 4) if total else None,
+            "dias_sin_datos": pd.DatetimeIndex(dias[(bits == 0) & en_rango.any(axis=1)]).strftime("%Y-%m-%d").tolist(),
+            "horas_faltantes": pd.DatetimeIndex(horas[faltantes]).strftime("%Y-%m-%dT%H:%M").tolist(),
+        }
+
+
+_cache = {}
+
+
+# Índice cacheado por proceso; se relee solo cuando cambia el archivo
+def obtener_cobertura(path=COBERTURA_FILE):
+    path = Path(path)
+    if not path.exists():
+        return Cobertura()
+    st = path.stat()
+    firma = (st.st_mtime_ns, st.st_size)
+
+    cacheado = _cache.get(path)
+    if cacheado is None or cacheado[0] != firma:
+        cacheado = (firma, Cobertura.cargar(path))
+        _cache[path] = cacheado
+        logger.info(f"🧮 Índice de cobertura cargado: {len(cacheado[1].estaciones)} estaciones ({path.name})")
+    return cacheado[1]
@@ -0,0 +1,106 @@
+import argparse
+import logging
+import time
+from collections import defaultdict
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+import pyarrow.dataset as ds
+
+from almacenamiento import EXPORTAR_CSV, escribir_parquet
+from indice_bronce import actualizar_indice, cargar_indice, es_mensual
+from pipeline_02_bronce_to_plata import BRONCE_DIR, leer_bronce, listar_archivos_bronce
+
+# Configuración de logs
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger("uvicorn")
+
+# Compactación de Bronce: los archivos diarios de cada estación (<estacion>/<AAAAMMDD>.parquet, la
+# zona de aterrizaje de la ingesta) se unen en un archivo por estación y mes (<estacion>/<AAAA-MM>.parquet).
+# Cada mes se escribe a un temporal y se reemplaza; recién entonces el índice pasa de los diarios al
+# mensual en una sola escritura y se borran los diarios. Un corte a mitad de camino deja a los
+# lectores viendo los diarios (el mensual todavía no está en el índice) y la próxima corrida lo rehace.
+
+
+# (estacion, mes) → {"diarios": [...], "mensual": path o None}, solo para los meses con diarios
+def meses_a_compactar(indice, base_dir, hasta_mes=None):
+    grupos = defaultdict(lambda: {"diarios": [], "mensual": None})
+    for ruta, entrada in indice.items():
+        archivo = Path(base_dir) / ruta
+        if entrada["mes"] is None or archivo.suffix != ".parquet":
+            continue
+        grupo = grupos[(entrada["estacion"], entrada["mes"])]
+        if es_mensual(archivo):
+            grupo["mensual"] = archivo
+        else:
+            grupo["diarios"].append(archivo)
+    return {
+        clave: grupo for clave, grupo in sorted(grupos.items())
+        if grupo["diarios"] and (hasta_mes is None or clave[1] < hasta_mes)
+    }
+
+
+def compactar_mes(base_dir, estacion, mes, diarios, mensual=None):
+    diarios = sorted(diarios)
+    dataset = ds.dataset([str(archivo) for archivo in diarios], format="parquet")
+    filas = [fragmento.count_rows() for fragmento in dataset.get_fragments()]
+    df = dataset.to_table().to_pandas()
+    df["estacion_archivo"] = np.repeat([int(archivo.stem) for archivo in diarios], filas).astype("int64")
+
+    # Un mensual previo se conserva salvo los días que vuelven a llegar como diarios
+    if mensual is not None:
+        previo = pd.read_parquet(mensual)
+        df = pd.concat([previo[~previo["estacion_archivo"].isin(df["estacion_archivo"])], df], ignore_index=True)
+
+    df = df.sort_values(["estacion_archivo", "FECHA", "HORA"], kind="stable").reset_index(drop=True)
+    destino = Path(base_dir) / estacion / f"{mes}.parquet"
+    escribir_parquet(df, destino)
+    if EXPORTAR_CSV:
+        df.to_csv(destino.with_suffix(".csv"), index=False)
+
+    actualizar_indice(base_dir, agregar=[destino], quitar=diarios)
+    for archivo in diarios:
+        archivo.unlink()
+        archivo.with_suffix(".csv").unlink(missing_ok=True)
+    return len(df)
+
+
+def compactar(base_dir=BRONCE_DIR, hasta_mes=None):
+    grupos = meses_a_compactar(cargar_indice(base_dir), base_dir, hasta_mes)
+    diarios = sum(len(grupo["diarios"]) for grupo in grupos.values())
+    logger.info(f"🗜️  Compactando {diarios} archivos diarios en {len(grupos)} archivos mensuales")
+    for (estacion, mes), grupo in grupos.items():
+        filas = compactar_mes(base_dir, estacion, mes, grupo["diarios"], grupo["mensual"])
+        logger.info(f"📦 {estacion}/{mes}: {len(grupo['diarios'])} diarios → {filas} filas")
+    return len(grupos)
+
+
+# Cantidad de archivos y tiempo de lectura de todo Bronce con el lector de Plata
+def medir_lectura():
+    archivos = listar_archivos_bronce()
+    t0 = time.perf_counter()
+    df = leer_bronce(archivos)
+    return len(archivos), len(df), time.perf_counter() - t0
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Compactación de Bronce en un archivo por estación y mes")
+    parser.add_argument(
+        "--todo",
+        action="store_true",
+        help="Compacta también el mes en curso (por defecto quedan sus diarios como zona de aterrizaje)",
+    )
+    parser.add_argument("--sin-medir", action="store_true", help="No mide la lectura antes y después")
+    args = parser.parse_args()
+
+    hasta_mes = None if args.todo else pd.Timestamp.today().strftime("%Y-%m")
+    medir = not args.sin_medir
+
+    if medir:
+        archivos_antes, filas_antes, segundos_antes = medir_lectura()
+    compactar(BRONCE_DIR, hasta_mes)
+    if medir:
+        archivos_despues, filas_despues, segundos_despues = medir_lectura()
+        logger.info(f"📊 Antes:   {archivos_antes} archivos, {filas_antes} filas, lectura en {segundos_antes:.2f} s")
+        logger.info(f"📊 Después: {archivos_despues} archivos, {filas_despues} filas, lectura en {segundos_despues:.2f} s")
@@ -0,0 +1,126 @@
+import numpy as np
+import pandas as pd
+
+# Lectura de archivos datohorario del SMN (texto de ancho fijo, latin1, CRLF):
+#
+#   FECHA     HORA  TEMP   HUM   PNM    DD    FF     NOMBRE
+#            [HOA]  [ºC]   [%]  [hPa]  [gr] [km/hr]
+#   01062024     0  14.2   82  1015.7   50   17     AEROPARQUE AERO
+#
+# Los valores faltantes quedan en blanco dentro de su columna, y los nombres de más de
+# ANCHO_NOMBRE caracteres continúan en la línea siguiente (con FECHA en blanco), p. ej.
+# "ESCUELA DE AVIACION MILITA" + "R AERO".
+
+ENCODING = "latin1"
+LINEAS_ENCABEZADO = 2  # encabezado + unidades
+
+# Posiciones [inicio, fin) de cada columna numérica
+COLUMNAS = {
+    "FECHA": (0, 8),
+    "HORA": (8, 14),
+    "TEMP": (14, 20),
+    "HUM": (20, 25),
+    "PNM": (25, 33),
+    "DD": (33, 38),
+    "FF": (38, 43),
+}
+VARIABLES = ["TEMP", "HUM", "PNM", "DD", "FF"]
+INICIO_NOMBRE = 43  # el nombre ocupa el resto de la línea
+ANCHO_NOMBRE = 26
+
+_ESPACIO, _CR, _PUNTO, _MENOS, _CERO, _NUEVE = 32, 13, 46, 45, 48, 57
+
+
+# Bytes de las líneas como matriz (filas × columnas), completando con espacios (incluye el CR de fin de línea)
+def _matriz(lineas):
+    lineas = np.array(lineas, dtype=bytes)
+    ancho = max(INICIO_NOMBRE + 1, lineas.dtype.itemsize)
+    matriz = lineas.astype(f"S{ancho}").view(np.uint8).reshape(len(lineas), ancho)
+    matriz[(matriz == 0) | (matriz == _CR)] = _ESPACIO
+    return matriz
+
+
+# Números de un bloque de columnas, una pasada por columna para todas las filas a la vez.
+# Se arma la mantisa entera y se divide por 10^decimales (mismo resultado que float(texto)).
+def _numeros(bloque):
+    filas = bloque.shape[0]
+    mantisa = np.zeros(filas, dtype=np.int64)
+    decimales = np.zeros(filas, dtype=np.int64)
+    tras_punto = np.zeros(filas, dtype=bool)
+    hay_digito = np.zeros(filas, dtype=bool)
+
+    for j in range(bloque.shape[1]):
+        caracter = bloque[:, j]
+        digito = (caracter >= _CERO) & (caracter <= _NUEVE)
+        mantisa = np.where(digito, mantisa * 10 + (caracter.astype(np.int64) - _CERO), mantisa)
+        decimales += digito & tras_punto
+        tras_punto |= caracter == _PUNTO
+        hay_digito |= digito
+
+    valores = mantisa / np.power(10.0, decimales)
+    valores[(bloque == _MENOS).any(axis=1)] *= -1
+    valores[~hay_digito] = np.nan
+    return valores
+
+
+# FECHA DDMMAAAA → datetime64 (NaT si la fecha no es válida)
+def _fechas(bloque):
+    numero = _numeros(bloque)
+    validas = ~np.isnan(numero)
+    numero = np.where(validas, numero, 0).astype(np.int64)
+    dia, mes, anio = numero // 1_000_000, numero // 10_000 % 100, numero % 10_000
+
+    validas &= (mes >= 1) & (mes <= 12) & (dia >= 1) & (dia <= 31)
+    meses = np.where(validas, (anio - 1970) * 12 + mes - 1, 0).astype("datetime64[M]")
+    fechas = meses.astype("datetime64[D]") + np.where(validas, dia - 1, 0)
+
+    # Descarta días que no existen en el mes (p. ej. 31/04)
+    validas &= fechas.astype("datetime64[M]") == meses
+    return np.where(validas, fechas, np.datetime64("NaT")).astype("datetime64[ns]")
+
+
+# Lectura de un archivo datohorario en columnas tipadas: FECHA (datetime64), HORA (int),
+# mediciones (float64, NaN si faltan) y NOMBRE. Si se indican estaciones, las filas
+# de otras estaciones se descartan antes de convertir valores. Con ancho_nombre se comparan
+# solo los primeros caracteres (el catálogo de estaciones corta los nombres largos).
+def leer_datohorario(archivo, estaciones=None, ancho_nombre=None):
+    with open(archivo, "rb") as f:
+        lineas = f.read().split(b"\n")[LINEAS_ENCABEZADO:]
+
+    matriz = _matriz(lineas)
+    nombres = np.char.strip(
+        np.ascontiguousarray(matriz[:, INICIO_NOMBRE:]).view(f"S{matriz.shape[1] - INICIO_NOMBRE}").ravel()
+    ).astype(object)
+
+    # Filas de datos: FECHA no vacía. Las líneas con FECHA vacía y texto son continuaciones de nombre.
+    fecha_vacia = (matriz[:, : COLUMNAS["FECHA"][1]] == _ESPACIO).all(axis=1)
+    for i in np.flatnonzero(fecha_vacia & (nombres != b"")):
+        if i > 0 and not fecha_vacia[i - 1]:
+            # Si el nombre cortado tiene menos de ANCHO_NOMBRE caracteres, el corte cayó en un espacio
+            separador = b" " if len(nombres[i - 1]) < ANCHO_NOMBRE else b""
+            nombres[i - 1] = nombres[i - 1] + separador + nombres[i]
+
+    filas = ~fecha_vacia
+    if estaciones is not None:
+        buscados = np.array([str(e).encode(ENCODING) for e in estaciones], dtype=bytes)
+        comparados = nombres.astype(bytes)
+        if ancho_nombre is not None:
+            buscados, comparados = buscados.astype(f"S{ancho_nombre}"), comparados.astype(f"S{ancho_nombre}")
+        filas &= np.isin(comparados, buscados)
+    matriz = matriz[filas]
+
+    # Sin hora válida no hay observación
+    hora = _numeros(matriz[:, slice(*COLUMNAS["HORA"])])
+    con_hora = ~np.isnan(hora)
+    matriz = matriz[con_hora]
+
+    # Los nombres se decodifican una sola vez por estación
+    unicos, posiciones = np.unique(nombres[filas][con_hora].astype(bytes), return_inverse=True)
+    columnas = {
+        "FECHA": _fechas(matriz[:, slice(*COLUMNAS["FECHA"])]),
+        "HORA": hora[con_hora].astype(np.int64),
+    }
+    for var in VARIABLES:
+        columnas[var] = _numeros(matriz[:, slice(*COLUMNAS[var])])
+    columnas["NOMBRE"] = np.array([nombre.decode(ENCODING) for nombre in unicos], dtype=object)[posiciones]
+    return pd.DataFrame(columnas)
@@ -0,0 +1,119 @@
+import logging
+from pathlib import Path
+
+import pandas as pd
+
+# Configuración de logs
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger("uvicorn")
+
+# Catálogo de estaciones del SMN (estaciones_smn.txt, ancho fijo, latin1):
+#
+#   NOMBRE                         PROVINCIA                              LATITUD          LONGITUD       ALTURA  NRO   NroOACI
+#                                                                       [gr]    [min]    [gr]    [min]       [m]
+#   IGUAZU AERO                    MISIONES                             -25      43       -54      28        270  87097 SARI
+#
+# Los nombres se cortan a ANCHO_NOMBRE caracteres (p. ej. "ESCUELA DE AVIACION MILITAR AE"),
+# mientras que en datohorario aparecen completos.
+BASE_DIR = Path(".").resolve()
+ESTACIONES_FILE = BASE_DIR / "data" / "raw" / "estaciones" / "estaciones_smn.txt"
+
+ENCODING = "latin1"
+LINEAS_ENCABEZADO = 2
+ANCHO_NOMBRE = 30
+INICIO_PROVINCIA = 31
+INICIO_COORDENADAS = 68
+
+
+class CatalogoEstaciones:
+    """Estaciones indexadas por nombre, provincia, número de estación y código OACI."""
+
+    def __init__(self, df):
+        self.df = df
+        self._por_nombre = {nombre: i for i, nombre in enumerate(df["nombre"])}
+        self._por_numero = {numero: i for i, numero in enumerate(df["numero"])}
+        self._por_oaci = {oaci: i for i, oaci in enumerate(df["oaci"]) if isinstance(oaci, str)}
+        self._por_provincia = {provincia: tuple(grupo["nombre"]) for provincia, grupo in df.groupby("provincia", sort=False)}
+
+    def __len__(self):
+        return len(self.df)
+
+    def _fila(self, i):
+        return None if i is None else self.df.iloc[i].to_dict()
+
+    # Nombre tal como figura en el catálogo (los nombres largos de datohorario se cortan)
+    @staticmethod
+    def clave_nombre(nombre):
+        return str(nombre).strip().upper()[:ANCHO_NOMBRE]
+
+    def por_nombre(self, nombre):
+        return self._fila(self._por_nombre.get(self.clave_nombre(nombre)))
+
+    def por_numero(self, numero):
+        return self._fila(self._por_numero.get(int(numero)))
+
+    def por_oaci(self, oaci):
+        return self._fila(self._por_oaci.get(str(oaci).strip().upper()))
+
+    def provincias(self):
+        return list(self._por_provincia)
+
+    def estaciones_provincia(self, provincia):
+        return list(self._por_provincia.get(str(provincia).strip().upper(), ()))
+
+    def provincia_de(self, nombre):
+        i = self._por_nombre.get(self.clave_nombre(nombre))
+        return None if i is None else self.df.at[i, "provincia"]
+
+
+# Coordenadas en grados y minutos → grados decimales (el signo va en los grados)
+def _grados_decimales(grados, minutos, negativo):
+    decimal = grados.abs() + minutos / 60
+    return decimal.where(~negativo, -decimal).round(5)
+
+
+def leer_catalogo(archivo=ESTACIONES_FILE):
+    with open(archivo, "r", encoding=ENCODING) as f:
+        lineas = f.read().splitlines()[LINEAS_ENCABEZADO:]
+
+    filas = []
+    for linea in lineas:
+        campos = linea[INICIO_COORDENADAS:].split()
+        if not linea.strip() or len(campos) < 6:
+            continue
+        filas.append({
+            "nombre": linea[:ANCHO_NOMBRE].strip().upper(),
+            "provincia": linea[INICIO_PROVINCIA:INICIO_COORDENADAS].strip().upper(),
+            "lat_gr": campos[0], "lat_min": campos[1],
+            "lon_gr": campos[2], "lon_min": campos[3],
+            "altura_m": campos[4],
+            "numero": campos[5],
+            "oaci": campos[6] if len(campos) > 6 else None,
+        })
+
+    df = pd.DataFrame(filas)
+    # El signo se toma del texto para no perderlo en latitudes/longitudes "-0"
+    lat_negativa = df["lat_gr"].str.startswith("-")
+    lon_negativa = df["lon_gr"].str.startswith("-")
+    for col in ["lat_gr", "lat_min", "lon_gr", "lon_min", "altura_m", "numero"]:
+        df[col] = df[col].astype(int)
+    df["latitud"] = _grados_decimales(df["lat_gr"], df["lat_min"], lat_negativa)
+    df["longitud"] = _grados_decimales(df["lon_gr"], df["lon_min"], lon_negativa)
+    return CatalogoEstaciones(df[["nombre", "provincia", "latitud", "longitud", "altura_m", "numero", "oaci"]])
+
+
+# Catálogo compartido: se parsea una vez por proceso y se vuelve a leer si cambia el archivo
+_cache = {}
+
+
+def obtener_catalogo(archivo=ESTACIONES_FILE):
+    archivo = Path(archivo)
+    st = archivo.stat()
+    firma = (st.st_mtime_ns, st.st_size)
+
+    cacheado = _cache.get(archivo)
+    if cacheado is None or cacheado[0] != firma:
+        cacheado = (firma, leer_catalogo(archivo))
+        _cache[archivo] = cacheado
+        logger.info(f"🗺️ Catálogo de estaciones cargado: {len(cacheado[1])} estaciones ({archivo.name})")
+    return cacheado[1]
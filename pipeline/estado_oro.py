@@ -0,0 +1,97 @@
+import hashlib
+import json
+import logging
+from pathlib import Path
+from urllib.parse import unquote
+
+from provincias import PARTICION_PROCESO
+
+# Configuración de logs
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger("uvicorn")
+
+# Manifiesto de la capa Oro (<oro>/_manifiesto.json): por cada dataset, las particiones de Plata
+# ya incorporadas y las marcas de agua del resultado.
+#
+#   {"diario": {"particiones": {"ESTACION=OBERA/ANIO=2024": {"firma": [mtime_ns, bytes],
+#                                                            "huella": sha1, "filas": n,
+#                                                            "desde": ..., "hasta": ...}, ...},
+#               "filas": total, "desde": ..., "hasta": ..., "actualizado": ...},
+#    "horario": {...}}
+#
+# Una partición de Plata cambió si cambia su firma (mtime y tamaño de sus archivos) y además su
+# huella (sha1 del contenido): cuando cambian los extremos de la normalización el diario final de
+# Plata se reescribe entero, pero sus particiones sin cambios quedan con el mismo contenido y no se
+# vuelven a procesar. Con PROVINCIAS cada provincia tiene el suyo (<oro>/PROVINCIA=<provincia>/).
+BASE_DIR = Path(".").resolve()
+ORO_DIR = BASE_DIR / "data" / "oro" / PARTICION_PROCESO
+MANIFIESTO_JSON = ORO_DIR / "_manifiesto.json"
+
+
+def cargar_manifiesto(path=MANIFIESTO_JSON):
+    if not Path(path).exists():
+        return {}
+    with open(path, "r", encoding="utf-8") as f:
+        return json.load(f)
+
+
+# Escritura atómica (temporal + reemplazo); es lo último que hace Oro y confirma las particiones escritas
+def guardar_manifiesto(manifiesto, path=MANIFIESTO_JSON):
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = path.with_suffix(".json.tmp")
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump(manifiesto, f, indent=1, sort_keys=True)
+    tmp.replace(path)
+
+
+def _archivos(carpeta):
+    return sorted(Path(carpeta).glob("*.parquet"))
+
+
+# {ruta relativa de la partición: firma} de un dataset particionado con niveles columnas de partición
+def listar_particiones(directorio, niveles):
+    directorio = Path(directorio)
+    if not directorio.is_dir():
+        return {}
+    particiones = {}
+    for carpeta in directorio.glob("/".join(["*"] * niveles)):
+        archivos = _archivos(carpeta)
+        if archivos:
+            estados = [archivo.stat() for archivo in archivos]
+            firma = [max(st.st_mtime_ns for st in estados), sum(st.st_size for st in estados)]
+            particiones[carpeta.relative_to(directorio).as_posix()] = firma
+    return particiones
+
+
+def huella_particion(carpeta):
+    sha1 = hashlib.sha1()
+    for archivo in _archivos(carpeta):
+        sha1.update(archivo.read_bytes())
+    return sha1.hexdigest()
+
+
+# Valores de una partición hive ("NOMBRE=OBERA%20AERO/MES=2024-01" → ("OBERA AERO", "2024-01"))
+def valores_particion(ruta):
+    return tuple(unquote(segmento.split("=", 1)[1]) for segmento in ruta.split("/"))
+
+
+def particiones_cambiadas(directorio, niveles, previas):
+    """Compara las particiones actuales de Plata con las del manifiesto.
+
+    Devuelve (actuales, cambiadas, eliminadas): actuales con {ruta: {"firma", "huella"}} de todas
+    las particiones (la huella solo se calcula si cambió la firma), cambiadas las rutas con contenido
+    nuevo y eliminadas las que ya no están en Plata."""
+    actuales = {}
+    cambiadas = []
+    for ruta, firma in listar_particiones(directorio, niveles).items():
+        previa = previas.get(ruta)
+        if previa is not None and previa["firma"] == firma:
+            actuales[ruta] = {"firma": firma, "huella": previa["huella"]}
+            continue
+        huella = huella_particion(Path(directorio) / ruta)
+        actuales[ruta] = {"firma": firma, "huella": huella}
+        if previa is None or previa["huella"] != huella:
+            cambiadas.append(ruta)
+    eliminadas = sorted(set(previas) - set(actuales))
+    return actuales, sorted(cambiadas), eliminadas
@@ -0,0 +1,283 @@
+import json
+import logging
+import shutil
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.compute as pc
+import pyarrow.dataset as ds
+
+from almacenamiento import (
+    MEDICIONES_DECIMALES, MEDICIONES_ENTERAS, columna_periodo, escribir_parquet, escribir_particiones,
+    reemplazar_dataset,
+)
+from provincias import PARTICION_PROCESO
+
+# Configuración de logs
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger("uvicorn")
+
+# Estado persistido del procesamiento incremental de Plata (con PROVINCIAS, uno por provincia)
+BASE_DIR = Path(".").resolve()
+PLATA_DIR = BASE_DIR / "data" / "plata" / PARTICION_PROCESO
+ESTADO_DIR = PLATA_DIR / "_estado"
+ESTADO_JSON = ESTADO_DIR / "estado.json"
+FRECUENCIA_FILE = ESTADO_DIR / "frecuencia_horaria.parquet"
+
+# Tablas del estado, particionadas por estación y período como los datasets finales de Plata
+# (_estado/<tabla>/NOMBRE=.../MES=AAAA-MM/): cada corrida lee y reescribe solo las particiones
+# de las ventanas afectadas.
+#  - horario_base:     observaciones horarias de Bronce (equivalente a horario_archivo)
+#  - horario_imputado: grilla imputada (últimos valores válidos para la imputación)
+#  - diario_imputado:  agregados diarios de la grilla imputada, antes de normalizar
+# La frecuencia por estación y hora del día (estación × 24) va entera en frecuencia_horaria.parquet.
+TABLAS_ESTADO = {
+    "horario_base": {"particiones": ["NOMBRE", "MES"], "fecha": "FECHA_HORA"},
+    "horario_imputado": {"particiones": ["NOMBRE", "MES"], "fecha": "FECHA_HORA"},
+    "diario_imputado": {"particiones": ["ESTACION", "ANIO"], "fecha": "FECHA"},
+}
+
+# estado.json: archivos de Bronce incorporados, rango de fechas, extremos de la normalización del
+# diario final y el manifiesto de particiones de cada tabla:
+#
+#   {"particiones": {"horario_base": {"OBERA AERO": {"2024-06": {"filas": n, "desde": ..., "hasta": ...,
+#                                                              "dias": d, "archivos": [20240601, ...],
+#                                                              "horas": {"TEMP": máscara, ...}}}}},
+#                    "diario_imputado": {"OBERA AERO": {"2024": {..., "extremos": {"TEMP_MEAN": [min, max]}}}}}
+#
+# "archivos" son los estacion_archivo de la partición (dónde buscar las filas de un archivo de Bronce
+# que se reemplaza), "horas" una máscara de bits por variable con las horas del día que tienen algún
+# valor válido (hasta qué mes leer para encontrar el valor anterior y el siguiente de una ventana) y
+# "extremos" los de las medias redondeadas (los de la normalización, sin releer el diario entero).
+
+
+def cargar_estado():
+    # Devuelve None si no hay estado persistido o si está incompleto
+    if not ESTADO_JSON.exists():
+        return None
+
+    with open(ESTADO_JSON, "r", encoding="utf-8") as f:
+        estado = json.load(f)
+
+    # Estados anteriores guardaban cada tabla entera en un solo Parquet
+    if "particiones" not in estado:
+        logger.warning("⚠️ Estado de Plata con el formato anterior (tablas enteras). Se reconstruye desde cero.")
+        return None
+    if not FRECUENCIA_FILE.exists():
+        logger.warning("⚠️ Estado de Plata incompleto (falta %s). Se reconstruye desde cero.", FRECUENCIA_FILE.name)
+        return None
+
+    estado["frecuencia_horaria"] = pd.read_parquet(FRECUENCIA_FILE)
+    estado["rango_inicio"] = pd.Timestamp(estado["rango_inicio"])
+    estado["rango_fin"] = pd.Timestamp(estado["rango_fin"])
+    return estado
+
+
+# Estado vacío para una reconstrucción: sin estado.json hasta guardar_estado, así una reconstrucción
+# interrumpida vuelve a empezar desde cero en la corrida siguiente. Se borran las tablas enteras
+# del formato anterior.
+def nuevo_estado():
+    ESTADO_JSON.unlink(missing_ok=True)
+    for tabla in ["horario_base", "diario_base", "horario_completo", "horario_imputado", "diario_imputado"]:
+        (ESTADO_DIR / f"{tabla}.parquet").unlink(missing_ok=True)
+    return {"archivos": {}, "particiones": {tabla: {} for tabla in TABLAS_ESTADO}, "normalizacion": {}}
+
+
+def guardar_estado(estado):
+    # Las particiones ya están escritas; frecuencia_horaria se reemplaza y estado.json se escribe
+    # al final: es el que confirma el conjunto de archivos de Bronce incorporados.
+    escribir_parquet(estado["frecuencia_horaria"], FRECUENCIA_FILE, float32=False)
+
+    contenido = {
+        "archivos": estado["archivos"],
+        "rango_inicio": estado["rango_inicio"].isoformat(),
+        "rango_fin": estado["rango_fin"].isoformat(),
+        "normalizacion": estado["normalizacion"],
+        "particiones": estado["particiones"],
+    }
+    tmp = ESTADO_JSON.with_suffix(".json.tmp")
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump(contenido, f, indent=1)
+    tmp.replace(ESTADO_JSON)
+
+
+## Particiones de las tablas del estado
+
+# Período de partición de cada fila: "AAAA-MM" (horario) o "AAAA" (diario)
+def periodo(tabla, fechas):
+    if TABLAS_ESTADO[tabla]["particiones"][1] == "MES":
+        return columna_periodo(fechas, "M")
+    return columna_periodo(fechas, "Y")
+
+
+# Carpeta de una partición, con los valores codificados igual que al escribir el dataset
+def ruta_particion(tabla, estacion, periodo_particion):
+    columnas = TABLAS_ESTADO[tabla]["particiones"]
+    esquema = pa.schema([(columna, pa.string()) for columna in columnas])
+    condicion = (pc.field(columnas[0]) == estacion) & (pc.field(columnas[1]) == periodo_particion)
+    ruta, _ = ds.partitioning(esquema, flavor="hive").format(condicion)
+    return ESTADO_DIR / tabla / ruta
+
+
+# Manifiesto de una tabla: {estación: {período: marcas}}
+def marcas_tabla(estado, tabla):
+    return estado["particiones"][tabla]
+
+
+def _mascara_horas(df):
+    horas = df["FECHA_HORA"].dt.hour
+    return {var: int(np.bitwise_or.reduce(1 << horas[df[var].notna()].unique().astype("int64"), initial=0))
+            for var in MEDICIONES_DECIMALES + MEDICIONES_ENTERAS}
+
+
+def _extremos(df):
+    extremos = {}
+    for col in [col for col in df.columns if col.endswith("_MEAN")]:
+        redondeada = df[col].round(1)
+        extremos[col] = None if redondeada.isna().all() else [float(redondeada.min()), float(redondeada.max())]
+    return extremos
+
+
+# Marcas de una partición a partir de sus filas
+def _marcas(tabla, df):
+    fecha = df[TABLAS_ESTADO[tabla]["fecha"]]
+    marcas = {"filas": len(df), "desde": fecha.min().isoformat(), "hasta": fecha.max().isoformat()}
+    if tabla == "horario_base":
+        marcas["dias"] = int(df["FECHA"].nunique())
+        marcas["archivos"] = sorted(int(valor) for valor in df["estacion_archivo"].dropna().unique())
+        marcas["horas"] = _mascara_horas(df)
+    elif tabla == "diario_imputado":
+        marcas["extremos"] = _extremos(df)
+    return marcas
+
+
+# Filas de las particiones (estación, período) que existen, con la columna de estación como texto
+# (sin la de período)
+def leer_particiones(tabla, claves):
+    columna = TABLAS_ESTADO[tabla]["particiones"][0]
+    partes = []
+    for estacion, periodo_particion in sorted(set(claves)):
+        for archivo in sorted(ruta_particion(tabla, estacion, periodo_particion).glob("*.parquet")):
+            df = pd.read_parquet(archivo)
+            df.insert(0, columna, estacion)
+            partes.append(df)
+    if not partes:
+        return None
+    return pd.concat(partes, ignore_index=True)
+
+
+# Todas las particiones de una estación (o de todas las estaciones)
+def leer_tabla(estado, tabla, estacion=None):
+    marcas = marcas_tabla(estado, tabla)
+    estaciones = list(marcas) if estacion is None else [estacion]
+    return leer_particiones(tabla, [(e, p) for e in estaciones for p in marcas.get(e, {})])
+
+
+def escribir_tabla(estado, tabla, df, claves=None):
+    """Escribe filas de una tabla del estado y actualiza su manifiesto.
+
+    Con claves ({(estación, período)}) se reemplazan solo esas particiones y las de df (las que
+    quedan sin filas se borran); sin claves se reemplaza la tabla entera. Devuelve las claves
+    escritas."""
+    columnas = TABLAS_ESTADO[tabla]["particiones"]
+    df = df.assign(**{columnas[1]: periodo(tabla, df[TABLAS_ESTADO[tabla]["fecha"]])})
+    grupos = df.groupby([df[columnas[0]].astype(str), df[columnas[1]]], sort=False)
+    marcas = {clave: _marcas(tabla, grupo) for clave, grupo in grupos}
+
+    manifiesto = marcas_tabla(estado, tabla)
+    if claves is None:
+        reemplazar_dataset(df, ESTADO_DIR / tabla, columnas, float32=False)
+        manifiesto.clear()
+    else:
+        escribir_particiones(df, ESTADO_DIR / tabla, columnas, float32=False)
+        for estacion, periodo_particion in set(claves) - set(marcas):
+            shutil.rmtree(ruta_particion(tabla, estacion, periodo_particion), ignore_errors=True)
+            manifiesto.get(estacion, {}).pop(periodo_particion, None)
+
+    for (estacion, periodo_particion), marca in marcas.items():
+        manifiesto.setdefault(estacion, {})[periodo_particion] = marca
+    for estacion in [estacion for estacion, periodos in manifiesto.items() if not periodos]:
+        del manifiesto[estacion]
+    return set(marcas)
+
+
+## Resúmenes a partir del manifiesto (sin leer las tablas)
+
+# Días con observaciones por estación (los meses no comparten días)
+def dias_por_estacion(estado):
+    return pd.Series(
+        {estacion: sum(m["dias"] for m in periodos.values())
+         for estacion, periodos in marcas_tabla(estado, "horario_base").items()},
+        dtype="int64",
+    )
+
+
+# Máscaras de las horas del día con algún valor válido por variable en todas las particiones de una estación
+def horas_con_datos(estado, estacion):
+    mascaras = dict.fromkeys(MEDICIONES_DECIMALES + MEDICIONES_ENTERAS, 0)
+    for marcas in marcas_tabla(estado, "horario_base").get(estacion, {}).values():
+        for var, mascara in marcas["horas"].items():
+            mascaras[var] |= mascara
+    return mascaras
+
+
+# Primer y último día con observaciones
+def rango(estado):
+    periodos = [m for periodos in marcas_tabla(estado, "horario_base").values() for m in periodos.values()]
+    return (
+        pd.Timestamp(min(m["desde"] for m in periodos)).floor("D"),
+        pd.Timestamp(max(m["hasta"] for m in periodos)).floor("D"),
+    )
+
+
+# Filas, primera y última fecha de una tabla
+def totales(estado, tabla):
+    periodos = [m for periodos in marcas_tabla(estado, tabla).values() for m in periodos.values()]
+    return (
+        sum(m["filas"] for m in periodos),
+        pd.Timestamp(min(m["desde"] for m in periodos)),
+        pd.Timestamp(max(m["hasta"] for m in periodos)),
+    )
+
+
+# Extremos globales de las medias diarias redondeadas ({col: [min, max]}, None sin valores)
+def extremos_diario(estado):
+    extremos = {}
+    for periodos in marcas_tabla(estado, "diario_imputado").values():
+        for marcas in periodos.values():
+            for col, valores in marcas["extremos"].items():
+                previos = extremos.get(col)
+                if valores is None or previos is None:
+                    extremos[col] = previos or valores
+                else:
+                    extremos[col] = [min(previos[0], valores[0]), max(previos[1], valores[1])]
+    return extremos
+
+
+## Archivos de Bronce incorporados
+
+def firma_archivo(archivo):
+    st = Path(archivo).stat()
+    return [st.st_mtime_ns, st.st_size]
+
+
+def archivos_pendientes(archivos, registrados, base_dir):
+    # Archivos nuevos o modificados respecto de los registrados en el estado
+    pendientes = []
+    for archivo in archivos:
+        clave = Path(archivo).relative_to(base_dir).as_posix()
+        if registrados.get(clave) != firma_archivo(archivo):
+            pendientes.append(archivo)
+    return pendientes
+
+
+def registrar_archivos(archivos, registrados, base_dir, vigentes=None):
+    for archivo in archivos:
+        registrados[Path(archivo).relative_to(base_dir).as_posix()] = firma_archivo(archivo)
+    # Los archivos que ya no están en Bronce (diarios compactados en su mensual) dejan de registrarse
+    if vigentes is not None:
+        claves = {Path(archivo).relative_to(base_dir).as_posix() for archivo in vigentes}
+        registrados = {clave: firma for clave, firma in registrados.items() if clave in claves}
+    return registrados
@@ -0,0 +1,110 @@
+import fcntl
+import json
+import logging
+import re
+from contextlib import contextmanager
+from pathlib import Path
+
+# Configuración de logs
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger("uvicorn")
+
+# Índice de particiones de Bronce (<bronce>/_indice.json): ruta relativa de cada archivo de datos
+# → estación y mes. Los lectores lo usan en lugar de recorrer el árbol con rglob.
+#
+# Bronce tiene dos tipos de archivo por estación:
+#  - diarios <estacion>/<AAAAMMDD>.parquet: zona de aterrizaje, uno por archivo datohorario ingestado
+#  - mensuales <estacion>/<AAAA-MM>.parquet: días ya compactados (compactar_bronce.py), con la
+#    columna estacion_archivo (AAAAMMDD del archivo diario de origen)
+# más los CSV anteriores al almacenamiento en Parquet que no tienen su Parquet.
+#
+# Las actualizaciones se serializan con un lock de archivo, porque la ingesta puede correr en
+# varios procesos a la vez (backfill.py).
+NOMBRE_INDICE = "_indice.json"
+NOMBRE_LOCK = "_indice.lock"
+
+MENSUAL = re.compile(r"^\d{4}-\d{2}$")
+
+
+def es_mensual(archivo):
+    return bool(MENSUAL.match(Path(archivo).stem))
+
+
+# Mes "AAAA-MM" de un archivo diario (AAAAMMDD) o mensual (AAAA-MM); None si el nombre no tiene fecha
+def mes_archivo(archivo):
+    stem = Path(archivo).stem
+    if es_mensual(archivo):
+        return stem
+    if len(stem) == 8 and stem.isdigit():
+        return f"{stem[:4]}-{stem[4:6]}"
+    return None
+
+
+def _entrada(archivo, base_dir):
+    archivo = Path(archivo)
+    return archivo.relative_to(base_dir).as_posix(), {"estacion": archivo.parent.name, "mes": mes_archivo(archivo)}
+
+
+@contextmanager
+def _bloqueo(base_dir):
+    Path(base_dir).mkdir(parents=True, exist_ok=True)
+    with open(Path(base_dir) / NOMBRE_LOCK, "w") as lock:
+        fcntl.flock(lock, fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            fcntl.flock(lock, fcntl.LOCK_UN)
+
+
+def _guardar(indice, base_dir):
+    path = Path(base_dir) / NOMBRE_INDICE
+    tmp = path.with_suffix(".json.tmp")
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump({"archivos": indice}, f, indent=1, sort_keys=True)
+    tmp.replace(path)
+
+
+# Índice a partir del contenido real de la carpeta (solo al crearlo o con reconstruir_indice)
+def _escanear(base_dir):
+    base_dir = Path(base_dir)
+    parquet = [archivo for archivo in base_dir.rglob("*.parquet") if archivo.parent != base_dir]
+    con_parquet = {archivo.with_suffix(".csv") for archivo in parquet}
+    csv_previos = [
+        archivo for archivo in base_dir.rglob("*.csv")
+        if archivo.parent != base_dir and archivo not in con_parquet
+        and mes_archivo(archivo) is not None and not es_mensual(archivo)
+    ]
+    return dict(_entrada(archivo, base_dir) for archivo in parquet + csv_previos)
+
+
+def reconstruir_indice(base_dir):
+    with _bloqueo(base_dir):
+        indice = _escanear(base_dir)
+        _guardar(indice, base_dir)
+    logger.info(f"🗂️  Índice de Bronce reconstruido: {len(indice)} archivos")
+    return indice
+
+
+# {ruta relativa: {"estacion", "mes"}}; si todavía no existe se crea escaneando la carpeta
+def cargar_indice(base_dir):
+    path = Path(base_dir) / NOMBRE_INDICE
+    if not path.exists():
+        return reconstruir_indice(base_dir)
+    with open(path, "r", encoding="utf-8") as f:
+        return json.load(f)["archivos"]
+
+
+# Agrega y quita archivos del índice en una sola escritura atómica
+def actualizar_indice(base_dir, agregar=(), quitar=()):
+    with _bloqueo(base_dir):
+        path = Path(base_dir) / NOMBRE_INDICE
+        indice = _escanear(base_dir) if not path.exists() else cargar_indice(base_dir)
+        for archivo in quitar:
+            indice.pop(Path(archivo).relative_to(base_dir).as_posix(), None)
+        indice.update(_entrada(archivo, base_dir) for archivo in agregar)
+        _guardar(indice, base_dir)
+
+
+# Archivos de datos de Bronce según el índice, ordenados por ruta
+def listar_archivos(base_dir):
+    return [Path(base_dir) / ruta for ruta in sorted(cargar_indice(base_dir))]
@@ -0,0 +1,280 @@
+import contextvars
+import functools
+import json
+import logging
+import os
+import resource
+import threading
+import time
+from contextlib import contextmanager
+from datetime import datetime
+from pathlib import Path
+
+import pandas as pd
+
+# Configuración de logs
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger("uvicorn")
+
+# Instrumentación de las etapas del pipeline. Cada etapa medida (una función decorada con
+# @instrumentar o un bloque `with etapa(...)`) agrega una línea JSON a data/metricas/etapas.jsonl:
+#
+#   {"ts": ..., "etapa": "plata.incremental.imputacion", "segundos": 0.41, "filas_entrada": 8760,
+#    "filas_salida": 8760, "bytes_leidos": ..., "bytes_escritos": ..., "rss_delta_bytes": ...,
+#    "rss_pico_bytes": ..., "ok": true, "pid": ...}
+#
+# Las etapas anidadas se nombran con la ruta de la etapa que las contiene, así que cada función
+# queda atribuida a quien la llamó (exploración, enriquecimiento, incremental, Oro). Los bytes son
+# los leídos/escritos por el proceso (/proc/self/io) e incluyen los de las subetapas.
+# La API los expone en formato Prometheus (GET /metrics) con AgregadorMetricas.
+BASE_DIR = Path(".").resolve()
+METRICAS_FILE = BASE_DIR / "data" / "metricas" / "etapas.jsonl"
+METRICAS_ACTIVAS = os.getenv("PIPELINE_METRICAS", "true").strip().lower() in ("1", "true", "si", "sí", "yes")
+# Al superar este tamaño el archivo se rota a etapas.jsonl.1
+METRICAS_MAX_MB = float(os.getenv("PIPELINE_METRICAS_MAX_MB", "50"))
+
+_actual = contextvars.ContextVar("etapa_actual", default=None)
+_escritura = threading.Lock()
+
+
+# Bytes que leen y escriben las propias métricas (/proc y etapas.jsonl), para descontarlos de
+# los de las etapas que contienen otras
+_propios = {"leidos": 0, "escritos": 0}
+
+
+# Bytes leídos y escritos por el proceso, menos los de las métricas hasta antes de esta lectura.
+# None si no hay /proc.
+def _io():
+    try:
+        with open("/proc/self/io", "rb") as f:
+            contenido = f.read()
+        campos = dict(linea.split(b":") for linea in contenido.splitlines())
+        io = int(campos[b"rchar"]) - _propios["leidos"], int(campos[b"wchar"]) - _propios["escritos"]
+    except (OSError, KeyError, ValueError):
+        return None
+    _propios["leidos"] += len(contenido)
+    return io
+
+
+def _rss():
+    try:
+        with open("/proc/self/statm", "rb") as f:
+            contenido = f.read()
+        _propios["leidos"] += len(contenido)
+        return int(contenido.split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError):
+        return None
+
+
+def _rss_pico():
+    # ru_maxrss está en KB en Linux
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024
+
+
+def _filas(valor, indices=True):
+    if isinstance(valor, (pd.DataFrame, pd.Series)) or (indices and isinstance(valor, pd.MultiIndex)):
+        return len(valor)
+    if isinstance(valor, tuple) and valor:
+        return _filas(valor[0], indices)
+    if isinstance(valor, dict) and valor and all(isinstance(v, pd.DataFrame) for v in valor.values()):
+        return sum(len(v) for v in valor.values())
+    return None
+
+
+class Medicion:
+    """Etapa en curso; filas_entrada y filas_salida se pueden fijar desde el bloque medido."""
+
+    def __init__(self, nombre, padre=None):
+        self.nombre = nombre if padre is None else f"{padre.nombre}.{nombre}"
+        self.padre = padre
+        self.filas_entrada = None
+        self.filas_salida = None
+
+
+def _guardar(registro, path=METRICAS_FILE):
+    linea = json.dumps(registro, ensure_ascii=False) + "\n"
+    with _escritura:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        if path.exists() and path.stat().st_size > METRICAS_MAX_MB * 1024 ** 2:
+            path.replace(path.with_name(path.name + ".1"))
+        # Una sola escritura en modo append: las líneas de varios procesos no se mezclan
+        with open(path, "a", encoding="utf-8") as f:
+            f.write(linea)
+        _propios["escritos"] += len(linea.encode("utf-8"))
+
+
+@contextmanager
+def etapa(nombre):
+    """Mide el bloque como la etapa nombre (anidada en la etapa actual, si hay una)."""
+    medicion = Medicion(nombre, _actual.get())
+    token = _actual.set(medicion)
+    if not METRICAS_ACTIVAS:
+        try:
+            yield medicion
+        finally:
+            _actual.reset(token)
+        return
+
+    rss_inicio = _rss()
+    io_inicio = _io()
+    t0 = time.perf_counter()
+    ok = True
+    try:
+        yield medicion
+    except BaseException:
+        ok = False
+        raise
+    finally:
+        segundos = time.perf_counter() - t0
+        _actual.reset(token)
+        io_fin = _io()
+        rss_fin = _rss()
+        registro = {
+            "ts": datetime.now().isoformat(timespec="milliseconds"),
+            "etapa": medicion.nombre,
+            "segundos": round(segundos, 6),
+            "filas_entrada": medicion.filas_entrada,
+            "filas_salida": medicion.filas_salida,
+            "bytes_leidos": io_fin[0] - io_inicio[0] if io_inicio and io_fin else None,
+            "bytes_escritos": io_fin[1] - io_inicio[1] if io_inicio and io_fin else None,
+            "rss_delta_bytes": rss_fin - rss_inicio if rss_inicio and rss_fin else None,
+            "rss_pico_bytes": _rss_pico(),
+            "ok": ok,
+            "pid": os.getpid(),
+        }
+        try:
+            _guardar(registro)
+        except OSError as e:
+            logger.warning(f"⚠️ No se pudo guardar la métrica de {medicion.nombre}: {e}")
+        if medicion.padre is None:
+            # Las filas solo si la etapa las conoce
+            filas = ["-" if valor is None else valor for valor in (medicion.filas_entrada, medicion.filas_salida)]
+            detalle = "" if filas == ["-", "-"] else f" | filas {filas[0]} → {filas[1]}"
+            logger.info(f"⏱️ {medicion.nombre}: {segundos:.2f} s{detalle}")
+
+
+def anotar(filas_entrada=None, filas_salida=None):
+    """Fija las filas de la etapa en curso (sin efecto fuera de una etapa)."""
+    medicion = _actual.get()
+    if medicion is None:
+        return
+    if filas_entrada is not None:
+        medicion.filas_entrada = filas_entrada
+    if filas_salida is not None:
+        medicion.filas_salida = filas_salida
+
+
+def instrumentar(nombre):
+    """Decorador: mide cada llamada como la etapa nombre. Las filas de entrada son las del primer
+    DataFrame de los argumentos y las de salida las del resultado (DataFrame, dict de DataFrames,
+    MultiIndex o el primer elemento de una tupla)."""
+    def decorador(funcion):
+        @functools.wraps(funcion)
+        def envoltura(*args, **kwargs):
+            with etapa(nombre) as medicion:
+                medicion.filas_entrada = next(
+                    (filas for valor in list(args) + list(kwargs.values()) if (filas := _filas(valor, indices=False)) is not None), None
+                )
+                resultado = funcion(*args, **kwargs)
+                if medicion.filas_salida is None:
+                    medicion.filas_salida = _filas(resultado)
+                return resultado
+        return envoltura
+    return decorador
+
+
+## Lectura de las métricas en formato Prometheus
+
+PREFIJO = "smn_pipeline_etapa"
+METRICAS_PROMETHEUS = [
+    # (nombre, tipo, ayuda)
+    ("ejecuciones_total", "counter", "Ejecuciones de la etapa, por resultado"),
+    ("segundos", "summary", "Duración de la etapa en segundos"),
+    ("ultima_duracion_segundos", "gauge", "Duración de la última ejecución"),
+    ("ultima_ejecucion_timestamp_seconds", "gauge", "Momento de la última ejecución (epoch)"),
+    ("filas_entrada_total", "counter", "Filas recibidas por la etapa"),
+    ("filas_salida_total", "counter", "Filas producidas por la etapa"),
+    ("ultima_filas_salida", "gauge", "Filas producidas en la última ejecución"),
+    ("bytes_leidos_total", "counter", "Bytes leídos por el proceso durante la etapa"),
+    ("bytes_escritos_total", "counter", "Bytes escritos por el proceso durante la etapa"),
+    ("ultima_memoria_delta_bytes", "gauge", "Variación del RSS en la última ejecución"),
+    ("ultima_memoria_pico_bytes", "gauge", "RSS máximo del proceso al terminar la última ejecución"),
+]
+
+
+class AgregadorMetricas:
+    """Acumula por etapa las líneas de etapas.jsonl. Cada actualización lee solo lo agregado desde
+    la anterior; si el archivo se rotó o se truncó, vuelve a empezar (los contadores se reinician)."""
+
+    def __init__(self, path=METRICAS_FILE):
+        self.path = Path(path)
+        self._lock = threading.Lock()
+        self._reiniciar(None)
+
+    def _reiniciar(self, inodo):
+        self.inodo = inodo
+        self.posicion = 0
+        self.etapas = {}
+
+    def _acumular(self, registro):
+        e = self.etapas.setdefault(registro["etapa"], {
+            "ok": 0, "error": 0, "segundos": 0.0, "filas_entrada": 0, "filas_salida": 0,
+            "bytes_leidos": 0, "bytes_escritos": 0, "ultima": None,
+        })
+        e["ok" if registro.get("ok", True) else "error"] += 1
+        e["segundos"] += registro["segundos"]
+        for campo in ("filas_entrada", "filas_salida", "bytes_leidos", "bytes_escritos"):
+            e[campo] += registro.get(campo) or 0
+        e["ultima"] = registro
+
+    def actualizar(self):
+        with self._lock:
+            if not self.path.exists():
+                self._reiniciar(None)
+                return self.etapas
+            st = self.path.stat()
+            if st.st_ino != self.inodo or st.st_size < self.posicion:
+                self._reiniciar(st.st_ino)
+            with open(self.path, "rb") as f:
+                f.seek(self.posicion)
+                nuevo = f.read()
+            # Solo líneas completas (la última puede estar escribiéndose)
+            completo = nuevo[: nuevo.rfind(b"\n") + 1]
+            self.posicion += len(completo)
+            for linea in completo.splitlines():
+                try:
+                    self._acumular(json.loads(linea))
+                except (ValueError, KeyError):
+                    continue
+            return self.etapas
+
+    def prometheus(self):
+        etapas = self.actualizar()
+        muestras = {nombre: [] for nombre, _, _ in METRICAS_PROMETHEUS}
+        for nombre, e in sorted(etapas.items()):
+            etiqueta = 'etapa="{}"'.format(nombre.replace("\\", "\\\\").replace('"', '\\"'))
+            ultima = e["ultima"]
+            muestras["ejecuciones_total"] += [
+                (f'{{{etiqueta},resultado="ok"}}', e["ok"]),
+                (f'{{{etiqueta},resultado="error"}}', e["error"]),
+            ]
+            muestras["segundos"] += [(f"_sum{{{etiqueta}}}", round(e["segundos"], 6)), (f"_count{{{etiqueta}}}", e["ok"] + e["error"])]
+            muestras["ultima_duracion_segundos"].append((f"{{{etiqueta}}}", ultima["segundos"]))
+            muestras["ultima_ejecucion_timestamp_seconds"].append(
+                (f"{{{etiqueta}}}", round(datetime.fromisoformat(ultima["ts"]).timestamp(), 3))
+            )
+            for campo in ("filas_entrada", "filas_salida", "bytes_leidos", "bytes_escritos"):
+                muestras[f"{campo}_total"].append((f"{{{etiqueta}}}", e[campo]))
+            for metrica, campo in [
+                ("ultima_filas_salida", "filas_salida"),
+                ("ultima_memoria_delta_bytes", "rss_delta_bytes"),
+                ("ultima_memoria_pico_bytes", "rss_pico_bytes"),
+            ]:
+                if ultima.get(campo) is not None:
+                    muestras[metrica].append((f"{{{etiqueta}}}", ultima[campo]))
+
+        lineas = []
+        for nombre, tipo, ayuda in METRICAS_PROMETHEUS:
+            lineas += [f"# HELP {PREFIJO}_{nombre} {ayuda}", f"# TYPE {PREFIJO}_{nombre} {tipo}"]
+            lineas += [f"{PREFIJO}_{nombre}{sufijo} {valor}" for sufijo, valor in muestras[nombre]]
+        return "\n".join(lineas) + "\n"
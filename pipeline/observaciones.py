@@ -0,0 +1,64 @@
+import numpy as np
+import pandas as pd
+
+# Lectura de archivos obs del SMN (temperaturas extremas diarias, texto de ancho fijo, latin1, CRLF):
+#
+#   FECHA    TMAX  TMIN  NOMBRE
+#   -------- ----- ----- ----------------------------------------
+#   29062024   9.6   3.2 AEROPARQUE AERO
+#   29062024        -0.4 BAHIA BLANCA AERO
+#
+# Los valores faltantes quedan en blanco dentro de su columna. Los nombres son los mismos
+# que en datohorario (completos), por lo que se comparan con el catálogo igual que allí.
+
+ENCODING = "latin1"
+LINEAS_ENCABEZADO = 3  # línea vacía + encabezado + guiones
+
+# Posiciones [inicio, fin) de cada columna
+COLUMNAS = {
+    "FECHA": (0, 8),
+    "TMAX": (8, 14),
+    "TMIN": (14, 20),
+}
+VARIABLES = ["TMAX", "TMIN"]
+INICIO_NOMBRE = 21
+
+
+def _numero(texto):
+    texto = texto.strip()
+    return float(texto) if texto else np.nan
+
+
+# Filas (FECHA, TMAX, TMIN, NOMBRE) de un archivo, línea por línea sin cargarlo entero
+def iterar_observaciones(archivo, estaciones=None, ancho_nombre=None):
+    if estaciones is not None:
+        buscados = {str(e)[:ancho_nombre] for e in estaciones}
+
+    with open(archivo, "r", encoding=ENCODING) as f:
+        for numero_linea, linea in enumerate(f):
+            if numero_linea < LINEAS_ENCABEZADO:
+                continue
+            fecha = linea[slice(*COLUMNAS["FECHA"])].strip()
+            nombre = linea[INICIO_NOMBRE:].strip()
+            # Sin fecha o sin nombre de estación (hay líneas con basura en la columna NOMBRE)
+            if not fecha.isdigit() or not any(c.isalpha() for c in nombre):
+                continue
+            if estaciones is not None and nombre[:ancho_nombre] not in buscados:
+                continue
+            yield (
+                fecha,
+                _numero(linea[slice(*COLUMNAS["TMAX"])]),
+                _numero(linea[slice(*COLUMNAS["TMIN"])]),
+                nombre,
+            )
+
+
+# Lectura de un archivo obs en columnas tipadas: FECHA (datetime64), TMAX/TMIN (float64) y NOMBRE
+def leer_observaciones(archivo, estaciones=None, ancho_nombre=None):
+    df = pd.DataFrame(
+        iterar_observaciones(archivo, estaciones, ancho_nombre),
+        columns=["FECHA", *VARIABLES, "NOMBRE"],
+    )
+    df["FECHA"] = pd.to_datetime(df["FECHA"].str.zfill(8), format="%d%m%Y", errors="coerce")
+    df[VARIABLES] = df[VARIABLES].astype("float64")
+    return df[df["FECHA"].notna()].reset_index(drop=True)
@@ -0,0 +1,240 @@
+import logging
+import os
+import queue
+import threading
+import time
+from pathlib import Path
+
+from watchdog.events import FileSystemEventHandler
+from watchdog.observers import Observer
+
+from pipeline_01_ingest_to_bronce import (
+    BRONCE_DIR, procesar_datohorario_provincias, procesar_datohorario_txt, procesar_observaciones_txt,
+    procesar_pronostico_txt, procesar_radiacion_txt, registrar_procesados,
+)
+from pipeline_02_bronce_to_plata import procesar_plata_incremental
+from pipeline_03_plata_to_oro import procesar_oro
+from provincias import MULTIPROVINCIA, procesar_provincias
+
+# Configuración de logs
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger("uvicorn")
+
+# Orquestador Bronce → Plata → Oro en un solo proceso (reemplaza los watchers encadenados por
+# procesados.csv). Los archivos crudos nuevos entran a una cola de trabajo; un único worker toma
+# todo lo encolado y ejecuta el grafo de etapas. Cada etapa recibe en memoria el resultado de las
+# etapas de las que depende y marca su evento de finalización al terminar.
+BASE_DIR = Path(".").resolve()
+RAW_DIR = BASE_DIR / "data" / "raw"
+
+# Carpeta de entrada → función de ingesta a Bronce. Solo datohorario alimenta Plata; con
+# PROVINCIAS cada archivo se lee una vez y se reparte entre los Bronce de las provincias.
+FUENTES = {
+    RAW_DIR / "datohorario": (
+        procesar_datohorario_provincias if MULTIPROVINCIA else lambda path: procesar_datohorario_txt(path, BRONCE_DIR)
+    ),
+    RAW_DIR / "observaciones": procesar_observaciones_txt,
+    RAW_DIR / "pronostico": procesar_pronostico_txt,
+    RAW_DIR / "radiacion": procesar_radiacion_txt,
+}
+DATOHORARIO_DIR = RAW_DIR / "datohorario"
+
+# Agrupamiento de eventos: un lote se cierra tras VENTANA_QUIETA_S segundos sin archivos nuevos,
+# o a lo sumo LATENCIA_MAXIMA_S segundos después del primero (una ráfaga continua no lo demora más)
+VENTANA_QUIETA_S = float(os.getenv("ORQUESTADOR_VENTANA_S", "5"))
+LATENCIA_MAXIMA_S = float(os.getenv("ORQUESTADOR_LATENCIA_MAX_S", "60"))
+
+
+## Etapas del grafo: cada una recibe los archivos del lote y los resultados de sus dependencias
+
+def etapa_bronce(archivos):
+    # Ingesta de cada archivo crudo; devuelve {path Parquet: DataFrame} de datohorario
+    escritos = {}
+    registrados = []
+    for path in archivos:
+        carpeta = path.parent
+        try:
+            resultado = FUENTES[carpeta](path)
+            if carpeta == DATOHORARIO_DIR:
+                escritos.update(resultado)
+                registrados.append(path.name)
+
+            destino = carpeta / "_procesados" / path.name
+            destino.parent.mkdir(parents=True, exist_ok=True)
+            path.rename(destino)
+            logger.info(f"📦 Archivo movido a _procesados: {destino}")
+        except Exception as e:
+            logger.error(f"❌ Error al procesar {path.name}: {e}")
+    registrar_procesados(registrados)
+    return escritos
+
+
+def etapa_plata(archivos, bronce):
+    # Sin archivos de datohorario en el lote no hay nada nuevo para Plata (salvo al iniciar)
+    if archivos and not bronce:
+        return None
+    # Varias provincias: Plata y Oro de cada una en su propio proceso (releen su Bronce de disco)
+    if MULTIPROVINCIA:
+        return procesar_provincias()
+    return procesar_plata_incremental(bronce_en_memoria=bronce)
+
+
+def etapa_oro(archivos, plata):
+    if plata is None:
+        return None
+    # Con PROVINCIAS, Oro ya corrió en el proceso de cada provincia
+    if MULTIPROVINCIA:
+        return all(plata.values())
+    procesar_oro(plata)
+    return True
+
+
+# Nombre → (función, dependencias), en orden topológico
+ETAPAS = {
+    "bronce": (etapa_bronce, []),
+    "plata": (etapa_plata, ["bronce"]),
+    "oro": (etapa_oro, ["plata"]),
+}
+
+
+class Ejecucion:
+    """Una corrida del grafo sobre un lote de archivos, con un evento de finalización por etapa."""
+
+    def __init__(self, archivos):
+        self.archivos = archivos
+        self.resultados = {}
+        self.eventos = {nombre: threading.Event() for nombre in ETAPAS}
+        self.duraciones = {}
+        # Avisos recibidos (un mismo archivo puede avisar más de una vez) y sus instantes
+        self.avisos = 0
+        self.primer_aviso = self.ultimo_aviso = time.monotonic()
+        self.inicio = None
+
+    def avisar(self, path):
+        self.avisos += 1
+        self.ultimo_aviso = time.monotonic()
+        if path is not None and path not in self.archivos:
+            self.archivos.append(path)
+
+    # Instante (monotónico) en que el lote deja de aceptar archivos
+    def cierre(self):
+        return min(self.ultimo_aviso + VENTANA_QUIETA_S, self.primer_aviso + LATENCIA_MAXIMA_S)
+
+    def esperar(self, etapa="oro", timeout=None):
+        return self.eventos[etapa].wait(timeout)
+
+    def correr(self):
+        self.inicio = time.monotonic()
+        for nombre, (funcion, dependencias) in ETAPAS.items():
+            for dependencia in dependencias:
+                self.eventos[dependencia].wait()
+
+            t0 = time.perf_counter()
+            try:
+                entradas = {dependencia: self.resultados[dependencia] for dependencia in dependencias}
+                self.resultados[nombre] = funcion(self.archivos, **entradas)
+            except Exception as e:
+                logger.exception(f"❌ Error en la etapa {nombre}: {e}")
+                self.resultados[nombre] = None
+            finally:
+                self.duraciones[nombre] = time.perf_counter() - t0
+                self.eventos[nombre].set()
+
+        total = time.monotonic() - self.inicio
+        espera = self.inicio - self.primer_aviso
+        resumen = " | ".join(f"{nombre} {segundos:.2f} s" for nombre, segundos in self.duraciones.items())
+        logger.info(
+            f"🏁 Lote de {len(self.archivos)} archivos ({self.avisos} avisos agrupados, "
+            f"{espera:.1f} s en cola) → total {total:.2f} s | {resumen}"
+        )
+
+
+class Orquestador:
+    """Cola de trabajo con un único worker: los lotes se ejecutan de a uno, nunca en paralelo.
+
+    Los avisos que llegan mientras un lote está abierto se agrupan en él; los que llegan mientras
+    otro corre abren el lote siguiente, que espera su turno en la cola.
+    """
+
+    def __init__(self):
+        self.cola = queue.Queue()
+        self.abierta = None  # ejecución encolada que todavía acepta archivos
+        self.lock = threading.Lock()
+        self.worker = threading.Thread(target=self._trabajar, daemon=True)
+
+    def iniciar(self):
+        self.worker.start()
+
+    # Encola un archivo crudo; devuelve la ejecución en la que se va a procesar
+    def encolar(self, path):
+        with self.lock:
+            if self.abierta is None:
+                self.abierta = Ejecucion([])
+                self.cola.put(self.abierta)
+            ejecucion = self.abierta
+            ejecucion.avisar(path)
+        return ejecucion
+
+    # Espera a que el lote quede quieto (o venza su latencia máxima) y lo cierra
+    def _esperar_cierre(self, ejecucion):
+        while True:
+            with self.lock:
+                restante = ejecucion.cierre() - time.monotonic()
+                if restante <= 0:
+                    # Lo que llegue a partir de ahora va a la próxima ejecución
+                    if self.abierta is ejecucion:
+                        self.abierta = None
+                    return
+            time.sleep(restante)
+
+    def _trabajar(self):
+        while True:
+            ejecucion = self.cola.get()
+            self._esperar_cierre(ejecucion)
+            ejecucion.correr()
+            self.cola.task_done()
+
+
+class EntradaHandler(FileSystemEventHandler):
+    # Se reacciona al cierre del archivo tras escribirlo (o a un renombre), así no hace falta
+    # esperar a que el tamaño se estabilice
+    def __init__(self, orquestador):
+        self.orquestador = orquestador
+
+    def _encolar(self, ruta):
+        path = Path(ruta)
+        if path.suffix == ".txt" and path.parent in FUENTES:
+            logger.info(f"🛰️  Nuevo archivo detectado: {path.name}")
+            self.orquestador.encolar(path)
+
+    def on_closed(self, event):
+        if not event.is_directory:
+            self._encolar(event.src_path)
+
+    def on_moved(self, event):
+        if not event.is_directory:
+            self._encolar(event.dest_path)
+
+
+# Inicialización
+if __name__ == "__main__":
+    orquestador = Orquestador()
+    orquestador.iniciar()
+
+    # Al iniciar se incorporan a Plata/Oro los archivos de Bronce que hayan quedado pendientes
+    orquestador.encolar(None)
+
+    observer = Observer()
+    handler = EntradaHandler(orquestador)
+    for carpeta in FUENTES:
+        carpeta.mkdir(parents=True, exist_ok=True)
+        observer.schedule(handler, path=str(carpeta), recursive=False)
+        logger.info(f"👂 Orquestador escuchando en: {carpeta}")
+    observer.start()
+
+    try:
+        while True:
+            time.sleep(1)
+    except KeyboardInterrupt:
+        observer.stop()
+    observer.join()
@@ -1,84 +1,265 @@
+import argparse
+import csv
 import os
-import pandas as pd
-import re
+from contextlib import ExitStack
+from datetime import datetime
 from pathlib import Path
 import logging
 
+import pandas as pd
+
+import metricas
+from almacenamiento import EXPORTAR_CSV, MEDICIONES_ENTERAS, EscritorParquet, escribir_parquet, tipar_bronce
+from datohorario import leer_datohorario
+from estaciones import ANCHO_NOMBRE, obtener_catalogo
+from indice_bronce import actualizar_indice
+from observaciones import leer_observaciones
+from pronostico import leer_pronostico
+from provincias import PROVINCIAS, bronce_provincia
+from radiacion import AgregadoRadiacion, diario_desde_horario, iterar_radiacion
+
 # Configuración de logs
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger("uvicorn")
 
-# Parámetros
+# Parámetros: una provincia (PROVINCIA_OBJETIVO) o varias en una sola pasada (PROVINCIAS, ver provincias.py)
 provincia_env = os.getenv('PROVINCIA_OBJETIVO')
-if provincia_env is None:
+if provincia_env is None and not PROVINCIAS:
     raise RuntimeError("❌ La variable de entorno PROVINCIA_OBJETIVO no está definida")
 
-PROVINCIA_OBJETIVO = provincia_env.strip()
+PROVINCIA_OBJETIVO = provincia_env.strip() if provincia_env is not None else ", ".join(PROVINCIAS)
 BASE_DIR = Path(".").resolve()
 RAW_DIR = BASE_DIR / "data" / "raw"
 BRONCE_DIR = BASE_DIR / "data" / "bronce"
+# Otras fuentes del SMN: mismas particiones estación/archivo que datohorario, en carpetas
+# separadas para que Plata (que recorre data/bronce) no las mezcle con las horarias
+BRONCE_OBSERVACIONES_DIR = BASE_DIR / "data" / "bronce_observaciones"
+BRONCE_PRONOSTICO_DIR = BASE_DIR / "data" / "bronce_pronostico"
+# Radiación solar minuto a minuto (radsolar): minutal/, horario/ y diario/ por estación y día
+BRONCE_RADIACION_DIR = BASE_DIR / "data" / "bronce_radiacion"
 ESTACIONES_FILE = RAW_DIR / "estaciones" / "estaciones_smn.txt"
+# Registro de archivos datohorario ingestados (archivo, timestamp)
+PROCESADOS_CSV = BRONCE_DIR / "procesados.csv"
 
 # Crear carpetas si no existen
-for path in [BRONCE_DIR]:
+for path in [BRONCE_DIR, BRONCE_OBSERVACIONES_DIR, BRONCE_PRONOSTICO_DIR, BRONCE_RADIACION_DIR]:
     path.mkdir(parents=True, exist_ok=True)
 
-# Cargar estaciones de la provincia
+# Estaciones de la provincia desde el catálogo compartido (se parsea una sola vez por proceso)
 def cargar_estaciones_provincia(provincia):
-    with open(ESTACIONES_FILE, "r", encoding="latin1") as f:
-        lines = f.readlines()[2:]  # omite encabezados
+    return obtener_catalogo(ESTACIONES_FILE).estaciones_provincia(provincia)
+
+# Estaciones a ingestar: las de PROVINCIA_OBJETIVO o, con PROVINCIAS, las de todas ellas
+def cargar_estaciones_objetivo():
+    if not PROVINCIAS:
+        return cargar_estaciones_provincia(PROVINCIA_OBJETIVO)
+    return [estacion for provincia in PROVINCIAS for estacion in cargar_estaciones_provincia(provincia)]
 
-    pattern = re.compile(
-        r"^(?P<nombre>.+?)\s{2,}(?P<provincia>.+?)\s{2,}(?P<lat_gr>-?\d+)\s+(?P<lat_min>\d+)\s+(?P<lon_gr>-?\d+)\s+(?P<lon_min>\d+)\s+(?P<altura_m>\d+)\s+(?P<numero>\d+)\s+(?P<numero_oaci>\S+)\s*$"
-    )
+# Registro de archivos ingestados: una sola escritura por lote, con el mismo timestamp.
+# Los archivos ya registrados no se repiten.
+def registrar_procesados(nombres):
+    registrados = leer_procesados()
+    nombres = [nombre for nombre in nombres if nombre not in registrados]
+    if not nombres:
+        return
+    timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+    with open(PROCESADOS_CSV, "a", newline="") as f:
+        csv.writer(f).writerows([nombre, timestamp] for nombre in nombres)
 
-    data = [match.groupdict() for line in lines if (match := pattern.match(line))]
-    df = pd.DataFrame(data)
-    df['provincia'] = df['provincia'].str.strip().str.upper()
-    return df[df['provincia'] == provincia.upper()]['nombre'].str.strip().unique()
 
-# Procesar archivo datohorario filtrado por provincia
+def leer_procesados():
+    if not PROCESADOS_CSV.exists():
+        return set()
+    with open(PROCESADOS_CSV, newline="") as f:
+        return {fila[0] for fila in csv.reader(f) if fila}
+
+# Procesar archivo datohorario filtrado por provincia. Devuelve {path Parquet: DataFrame tipado}
+# de lo escrito, para que Plata lo use sin releerlo de disco.
+@metricas.instrumentar("bronce.datohorario")
 def procesar_datohorario_txt(archivo_txt, salida_base_dir):
     estaciones_prov = cargar_estaciones_provincia(PROVINCIA_OBJETIVO)
     logger.info(f"📍 Estaciones en {PROVINCIA_OBJETIVO} ({len(estaciones_prov)}): {list(estaciones_prov)}")
 
-    with open(archivo_txt, "r", encoding="latin1") as f:
-        lines = f.readlines()
+    # Lectura de ancho fijo ya tipada, descartando las estaciones de otras provincias
+    with metricas.etapa("lectura"):
+        df = leer_datohorario(archivo_txt, estaciones_prov, ANCHO_NOMBRE)
+        metricas.anotar(filas_salida=len(df))
+
+    fecha_str = Path(archivo_txt).stem.replace("datohorario", "")
+    escritos, total_filas, errores = guardar_datohorario(df, salida_base_dir, fecha_str)
+    logger.info(f"[BRONCE] Procesado: {archivo_txt} → {total_filas} filas para {PROVINCIA_OBJETIVO} | errores: {errores}")
+    return escritos
 
-    columnas = re.split(r"\s{2,}", lines[0].strip())
-    data = [
-        re.split(r"\s{2,}", line.strip(), maxsplit=len(columnas)-1)
-        for line in lines[1:]
-        if len(line.strip()) > 0 and not line.isspace()
-    ]
 
-    df = pd.DataFrame(data, columns=columnas)
-    df.columns = df.columns.str.strip()
-    df["NOMBRE"] = df["NOMBRE"].str.strip()
+# Procesar archivo datohorario para todas las PROVINCIAS: una sola lectura con las estaciones de
+# todas, y cada fila al Bronce de su provincia según el catálogo. Devuelve {path Parquet: DataFrame
+# tipado} de lo escrito en todas las provincias.
+@metricas.instrumentar("bronce.datohorario_provincias")
+def procesar_datohorario_provincias(archivo_txt, provincias=None):
+    catalogo = obtener_catalogo(ESTACIONES_FILE)
+    provincias = provincias or PROVINCIAS
+    estaciones = [estacion for provincia in provincias for estacion in catalogo.estaciones_provincia(provincia)]
+    sin_estaciones = [provincia for provincia in provincias if not catalogo.estaciones_provincia(provincia)]
+    if sin_estaciones:
+        logger.warning(f"⚠️ Provincias sin estaciones en el catálogo: {sin_estaciones}")
 
-    nombres_provincia = set(estaciones_prov)
-    df = df[df["NOMBRE"].isin(nombres_provincia)]
+    with metricas.etapa("lectura"):
+        df = leer_datohorario(archivo_txt, estaciones, ANCHO_NOMBRE)
+        metricas.anotar(filas_salida=len(df))
 
     fecha_str = Path(archivo_txt).stem.replace("datohorario", "")
 
+    # Provincia de cada fila: una búsqueda en el catálogo por estación, no por fila
+    nombres = df["NOMBRE"].astype(str)
+    provincia_fila = nombres.map({nombre: catalogo.provincia_de(nombre) for nombre in nombres.unique()})
+
+    escritos = {}
+    resumen = []
+    for provincia, df_provincia in df.groupby(provincia_fila, sort=False):
+        escritos_provincia, filas, errores = guardar_datohorario(df_provincia, bronce_provincia(provincia), fecha_str)
+        escritos.update(escritos_provincia)
+        resumen.append(f"{provincia} {filas}" + (f" ({errores} errores)" if errores else ""))
+    logger.info(f"[BRONCE] Procesado: {archivo_txt} → {len(df)} filas | " + " | ".join(resumen))
+    return escritos
+
+
+# Un Parquet tipado por estación y día en salida_base_dir (CSV opcional) y el índice de particiones
+# actualizado. Devuelve ({path Parquet: DataFrame tipado}, filas escritas, errores).
+def guardar_datohorario(df, salida_base_dir, fecha_str):
     total_filas = 0
     errores = 0
+    escritos = {}
 
-    for nombre in nombres_provincia:
-        df_estacion = df[df["NOMBRE"] == nombre]
-        if df_estacion.empty:
-            continue
-
+    for nombre, df_estacion in df.groupby("NOMBRE", sort=False):
         nombre_clean = nombre.lower().replace(" ", "_")
         path_estacion = Path(salida_base_dir) / nombre_clean
         path_estacion.mkdir(parents=True, exist_ok=True)
 
-        archivo_csv = path_estacion / f"{fecha_str}.csv"
+        # Parquet tipado como formato principal; el CSV queda como salida opcional
+        archivo_parquet = path_estacion / f"{fecha_str}.parquet"
         try:
-            df_estacion.to_csv(archivo_csv, index=False)
+            df_tipado = tipar_bronce(df_estacion)
+            escribir_parquet(df_tipado, archivo_parquet)
+            escritos[archivo_parquet] = df_tipado
+            if EXPORTAR_CSV:
+                # Mismo formato que el archivo original: FECHA DDMMAAAA y mediciones enteras sin decimales
+                df_estacion.assign(
+                    FECHA=df_estacion["FECHA"].dt.strftime("%d%m%Y"),
+                    **{col: df_estacion[col].astype("Int64") for col in MEDICIONES_ENTERAS},
+                ).to_csv(path_estacion / f"{fecha_str}.csv", index=False)
             total_filas += len(df_estacion)
         except Exception as e:
             errores += 1
-            logger.error(f"❌ Error al guardar {archivo_csv}: {e}")
+            logger.error(f"❌ Error al guardar {archivo_parquet}: {e}")
 
-    logger.info(f"[BRONCE] Procesado: {archivo_txt} → {total_filas} filas para {PROVINCIA_OBJETIVO} | errores: {errores}")
+    # Los diarios nuevos quedan en el índice de particiones hasta que se compactan
+    actualizar_indice(salida_base_dir, agregar=escritos)
+    return escritos, total_filas, errores
+
+
+# Un Parquet tipado por estación: <salida>/<estacion>/<fecha>.parquet (CSV opcional)
+def guardar_por_estacion(df, salida_base_dir, fecha_str):
+    total_filas = 0
+    errores = 0
+    for nombre, df_estacion in df.groupby("NOMBRE", sort=False):
+        path_estacion = Path(salida_base_dir) / nombre.lower().replace(" ", "_")
+        path_estacion.mkdir(parents=True, exist_ok=True)
+
+        archivo_parquet = path_estacion / f"{fecha_str}.parquet"
+        try:
+            escribir_parquet(df_estacion, archivo_parquet)
+            if EXPORTAR_CSV:
+                df_estacion.to_csv(path_estacion / f"{fecha_str}.csv", index=False)
+            total_filas += len(df_estacion)
+        except Exception as e:
+            errores += 1
+            logger.error(f"❌ Error al guardar {archivo_parquet}: {e}")
+    return total_filas, errores
+
+# Procesar archivo obs (TMAX/TMIN diarias) filtrado por provincia
+def procesar_observaciones_txt(archivo_txt, salida_base_dir=BRONCE_OBSERVACIONES_DIR):
+    estaciones_prov = cargar_estaciones_objetivo()
+    df = leer_observaciones(archivo_txt, estaciones_prov, ANCHO_NOMBRE)
+
+    fecha_str = Path(archivo_txt).stem.replace("obs", "")
+    total_filas, errores = guardar_por_estacion(df, salida_base_dir, fecha_str)
+    logger.info(f"[BRONCE] Observaciones: {archivo_txt} → {total_filas} filas para {PROVINCIA_OBJETIVO} | errores: {errores}")
+
+# Procesar archivo pron (pronóstico cada 3 horas) filtrado por provincia. FECHA_EMISION
+# distingue los pronósticos de distintos días para la misma fecha y hora.
+def procesar_pronostico_txt(archivo_txt, salida_base_dir=BRONCE_PRONOSTICO_DIR):
+    catalogo = obtener_catalogo(ESTACIONES_FILE)
+    estaciones_prov = cargar_estaciones_objetivo()
+    df = leer_pronostico(archivo_txt, catalogo, estaciones_prov, ANCHO_NOMBRE)
+
+    fecha_str = Path(archivo_txt).stem.replace("pron", "")
+    df["HORA"] = df["HORA"].astype("int8")
+    df.insert(0, "FECHA_EMISION", pd.Timestamp(fecha_str))
+    total_filas, errores = guardar_por_estacion(df, salida_base_dir, fecha_str)
+    logger.info(f"[BRONCE] Pronóstico: {archivo_txt} → {total_filas} filas para {PROVINCIA_OBJETIVO} | errores: {errores}")
+
+# Procesar archivo radsolar (irradiancia minuto a minuto de los sitios del encabezado, sin filtro
+# de provincia). Se lee por bloques y en la misma pasada los minutos se escriben a
+# minutal/<estacion>/<fecha>.parquet y se acumula el agregado horario, que al final va a
+# horario/<estacion>/<fecha>.parquet (como en las otras fuentes, <fecha> es la del archivo, así que
+# reingestarlo reemplaza lo suyo sin duplicar). Los días locales que toca el archivo se recalculan
+# en diario/<estacion>/<AAAAMMDD>.parquet con las horas de los archivos vecinos. horario/ y diario/
+# son solo Parquet, para leerlos como dataset. Devuelve {"horario": DataFrame, "diario": DataFrame}.
+@metricas.instrumentar("bronce.radiacion")
+def procesar_radiacion_txt(archivo_txt, salida_base_dir=BRONCE_RADIACION_DIR):
+    salida_base_dir = Path(salida_base_dir)
+    fecha_str = Path(archivo_txt).stem.replace("radsolar", "")
+    agregado = AgregadoRadiacion()
+    total_minutos = 0
+
+    with metricas.etapa("minutal"), ExitStack() as pila:
+        escritores = {}
+        for bloque in iterar_radiacion(archivo_txt):
+            agregado.agregar(bloque)
+            total_minutos += len(bloque)
+            for nombre, df_estacion in bloque.groupby("NOMBRE", sort=False):
+                if nombre not in escritores:
+                    path = salida_base_dir / "minutal" / nombre.lower().replace(" ", "_") / f"{fecha_str}.parquet"
+                    csv = path.with_suffix(".csv") if EXPORTAR_CSV else None
+                    escritores[nombre] = pila.enter_context(EscritorParquet(path, csv=csv))
+                escritores[nombre].escribir(df_estacion)
+        metricas.anotar(filas_salida=total_minutos)
+
+    horario = agregado.horario()
+    diarios = []
+    for nombre, df_estacion in horario.groupby("NOMBRE", sort=False):
+        path_estacion = nombre.lower().replace(" ", "_")
+        escribir_parquet(df_estacion, salida_base_dir / "horario" / path_estacion / f"{fecha_str}.parquet")
+
+        # Días locales del archivo, con las horas que aportan los archivos del día anterior y siguiente
+        fecha = pd.Timestamp(fecha_str)
+        vecinos = [salida_base_dir / "horario" / path_estacion / f"{fecha + pd.Timedelta(days=d):%Y%m%d}.parquet" for d in (-1, 1)]
+        horas = pd.concat([df_estacion] + [pd.read_parquet(path) for path in vecinos if path.exists()], ignore_index=True)
+        horas = horas[horas["FECHA"].isin(df_estacion["FECHA"].unique())]
+        diario = diario_desde_horario(horas)
+        for dia, df_dia in diario.groupby("FECHA"):
+            escribir_parquet(df_dia, salida_base_dir / "diario" / path_estacion / f"{dia:%Y%m%d}.parquet")
+        diarios.append(diario)
+
+    diario = pd.concat(diarios, ignore_index=True) if diarios else pd.DataFrame()
+    logger.info(f"[BRONCE] Radiación: {archivo_txt} → {total_minutos} minutos, {len(horario)} horas y {len(diario)} días")
+    return {"horario": horario, "diario": diario}
+
+
+# Carga de los archivos existentes, uno por vez (cada archivo se lee línea por línea)
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Ingesta de observaciones, pronósticos y radiación solar del SMN a Bronce")
+    parser.add_argument("--observaciones", action="store_true", help="Procesa data/raw/observaciones/obs*.txt")
+    parser.add_argument("--pronostico", action="store_true", help="Procesa data/raw/pronostico/pron*.txt")
+    parser.add_argument("--radiacion", action="store_true", help="Procesa data/raw/radiacion/radsolar*.txt")
+    args = parser.parse_args()
+
+    if args.observaciones:
+        for archivo in sorted((RAW_DIR / "observaciones").glob("obs*.txt")):
+            procesar_observaciones_txt(archivo)
+    if args.pronostico:
+        for archivo in sorted((RAW_DIR / "pronostico").glob("pron*.txt")):
+            procesar_pronostico_txt(archivo)
+    if args.radiacion:
+        for archivo in sorted((RAW_DIR / "radiacion").glob("radsolar*.txt")):
+            procesar_radiacion_txt(archivo)
@@ -1,11 +1,25 @@
+import argparse
+import os
+import numpy as np
 import pandas as pd
 from pathlib import Path
 import logging
-import csv
-from datetime import date, datetime
+from contextlib import ExitStack
+from datetime import date
 
 import warnings
 
+import estado_plata
+import indice_bronce
+import metricas
+from cobertura import COBERTURA_FILE, Cobertura
+from estaciones import obtener_catalogo
+from almacenamiento import (
+    EXPORTAR_CSV, EscritorCSV, EscritorDataset, EscritorParquet, columna_periodo, dataset_disponible, destipar_bronce,
+    escribir_parquet, escribir_particiones, leer_grupos, leer_parquet, leer_parquets_bronce, reemplazar_dataset,
+)
+from provincias import PARTICION_PROCESO
+
 # Deshabilitar warnings futuros
 warnings.simplefilter(action='ignore', category=FutureWarning)
 
@@ -14,47 +28,146 @@ warnings.simplefilter(action='ignore', category=FutureWarning)
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger("uvicorn")
 
-# Definir rutas para capas Bronce y Plata y Diccionario
+# Definir rutas para capas Bronce y Plata y Diccionario. Con PROVINCIAS (provincias.py) el proceso
+# de cada provincia usa su carpeta PROVINCIA=<provincia> en cada una.
 BASE_DIR = Path(".").resolve()
 RAW_DIR = BASE_DIR / "data" / "raw"
-BRONCE_DIR = BASE_DIR / "data" / "bronce"
-PLATA_DIR = BASE_DIR / "data" / "plata"
+ESTACIONES_FILE = RAW_DIR / "estaciones" / "estaciones_smn.txt"
+BRONCE_DIR = BASE_DIR / "data" / "bronce" / PARTICION_PROCESO
+PLATA_DIR = BASE_DIR / "data" / "plata" / PARTICION_PROCESO
 PLATA_DIR.mkdir(parents=True, exist_ok=True)
-# Crear carpeta para faltantes si no existe
-FALTANTES_DIR = BASE_DIR / "data" / "faltantes"
-FALTANTES_DIR.mkdir(parents=True, exist_ok=True)
 # Crear carpeta para guardar los metadatos
-DICCIONARIO_DIR = BASE_DIR / "data" / "diccionario"
+DICCIONARIO_DIR = BASE_DIR / "data" / "diccionario" / PARTICION_PROCESO
 DICCIONARIO_DIR.mkdir(parents=True, exist_ok=True)
 
-# Procesamiento de archivos desde Bronce a Plata
-def procesar_exploracion_plata():
-    ## Carga inicial de datos
-    
-    # Cargar todos los archivos CSV de la capa Bronce, excluyendo procesados.csv en el raíz
-    archivos = [
-        archivo for archivo in BRONCE_DIR.rglob("*.csv")
-        if archivo.name != "procesados.csv"
-    ]
-
+# Datasets Parquet de Plata (particionados por estación y período; con PROVINCIAS, la provincia es
+# la primera partición y cada proceso escribe solo la suya)
+HORARIO_FINAL_DIR = BASE_DIR / "data" / "plata" / "horario_final" / PARTICION_PROCESO
+DIARIO_FINAL_DIR = BASE_DIR / "data" / "plata" / "diario_final" / PARTICION_PROCESO
+PARTICIONES_HORARIO = ["NOMBRE", "MES"]
+PARTICIONES_DIARIO = ["ESTACION", "ANIO"]
+
+# Imputación por promedio entre el día anterior y el posterior a la misma hora
+def imputar_promedio_dias_adyacentes(df, variables):
+    # Cada (estación, hora) es una cadena ordenada por fecha. Para un faltante se toma el
+    # valor anterior de la cadena (que puede ser uno ya imputado) y el siguiente válido
+    # original; los huecos de varios días se resuelven en tantas pasadas vectorizadas
+    # como días tenga el hueco más largo.
+    df = df.sort_values(by=['NOMBRE', 'FECHA', 'HORA']).reset_index(drop=True)
+
+    cadena = df.groupby(['NOMBRE', 'HORA'], sort=False).ngroup().to_numpy()
+    orden = np.argsort(cadena, kind='stable')
+    cadena = cadena[orden]
+    inicio_cadena = np.r_[True, cadena[1:] != cadena[:-1]]
+    posiciones = np.arange(len(df))
+
+    for var in variables:
+        valores = df[var].to_numpy(dtype='float64', na_value=np.nan)[orden]
+        faltante = np.isnan(valores)
+        if not faltante.any():
+            continue
+
+        # Siguiente valor válido (original) dentro de la misma cadena
+        posterior = pd.Series(valores).groupby(cadena).bfill().to_numpy()
+
+        # Posición de cada faltante dentro de su tramo de faltantes consecutivos
+        comienzo = faltante & (inicio_cadena | np.r_[True, ~faltante[:-1]])
+        rango = posiciones - np.maximum.accumulate(np.where(comienzo, posiciones, 0))
+
+        idx_faltantes = np.flatnonzero(faltante)
+        idx_faltantes = idx_faltantes[np.argsort(rango[idx_faltantes], kind='stable')]
+        cortes = np.searchsorted(rango[idx_faltantes], np.arange(1, rango[idx_faltantes].max() + 1))
+
+        for sel in np.split(idx_faltantes, cortes):
+            previo = np.where(inicio_cadena[sel], np.nan, valores[sel - 1])
+            siguiente = posterior[sel]
+            ambos = ~np.isnan(previo) & ~np.isnan(siguiente)
+            valores[sel] = np.where(
+                ambos,
+                np.round((previo + siguiente) / 2, 1),
+                np.where(np.isnan(previo), siguiente, previo),
+            )
+
+        resultado = np.empty_like(valores)
+        resultado[orden] = valores
+        df[var] = resultado
+
+    return df
+
+# Variables horarias a imputar y columnas de medias diarias
+VARIABLES_HORARIAS = ['TEMP', 'HUM', 'PNM', 'DD', 'FF']
+COLS_MEAN = ['TEMP_MEAN', 'PNM_MEAN', 'HUM_MEAN', 'WIND_DIR_MEAN', 'WIND_SPEED_MEAN']
+
+# Una hora es típica de una estación si aparece en al menos el 5% de sus días
+PORCENTAJE_FRECUENCIA = 0.05
+
+# Exportación de una tabla de Plata: Parquet siempre, CSV opcional (mismo nombre)
+def exportar_tabla(df, nombre, float32=True):
+    escribir_parquet(df, PLATA_DIR / f"{nombre}.parquet", float32=float32)
+    if EXPORTAR_CSV:
+        df.to_csv(PLATA_DIR / f"{nombre}.csv", index=False)
+
+# Archivos de la capa Bronce según su índice de particiones: Parquet diarios y mensuales
+# (compactados), más los CSV anteriores que no tienen su Parquet
+def listar_archivos_bronce():
+    return indice_bronce.listar_archivos(BRONCE_DIR)
+
+# Lectura de archivos de Bronce con FECHA, HORA y FECHA_HORA normalizadas. Los archivos que
+# están en en_memoria ({path: DataFrame tipado}, recién escritos por Bronce) no se releen de disco.
+@metricas.instrumentar("carga")
+def leer_bronce(archivos, en_memoria=None):
     dfs = []
+    en_memoria = {Path(archivo): df for archivo, df in (en_memoria or {}).items()}
+
+    # Parquet ya tipado (FECHA datetime64): se leen todos juntos, diarios y mensuales por separado
+    # (los mensuales traen la columna estacion_archivo)
+    archivos_parquet = [archivo for archivo in archivos if archivo.suffix == ".parquet"]
+    a_leer = [archivo for archivo in archivos_parquet if archivo not in en_memoria]
+    partes = {}
+    for grupo in (
+        [archivo for archivo in a_leer if not indice_bronce.es_mensual(archivo)],
+        [archivo for archivo in a_leer if indice_bronce.es_mensual(archivo)],
+    ):
+        if grupo:
+            df, filas = leer_parquets_bronce(grupo)
+            cortes = np.cumsum([0] + filas)
+            partes.update({archivo: df.iloc[cortes[i]:cortes[i + 1]] for i, archivo in enumerate(grupo)})
+    # Mismo orden de filas que la lectura de disco, con los DataFrames en memoria en su lugar
+    partes.update({archivo: destipar_bronce(en_memoria[archivo]) for archivo in archivos_parquet if archivo in en_memoria})
+    if archivos_parquet:
+        df = pd.concat([partes[archivo] for archivo in archivos_parquet], ignore_index=True)
+        # Agregar nombre del archivo diario (AAAAMMDD) como identificador de estación, numérico como al
+        # releer el CSV; los mensuales ya lo traen (su nombre AAAA-MM no es numérico)
+        desde_nombre = np.repeat(
+            pd.to_numeric(pd.Series([archivo.stem for archivo in archivos_parquet]), errors='coerce').to_numpy(),
+            [len(partes[archivo]) for archivo in archivos_parquet],
+        )
+        if 'estacion_archivo' in df.columns:
+            mensual = df['estacion_archivo'].notna().to_numpy()
+            df['estacion_archivo'] = df['estacion_archivo'].fillna(pd.Series(desde_nombre))
+            # Un día que volvió a llegar como diario después de compactado reemplaza al del mensual
+            claves = pd.MultiIndex.from_frame(df[['NOMBRE', 'estacion_archivo']])
+            df = df[~(mensual & claves.isin(claves[~mensual]))].reset_index(drop=True)
+            if not df['estacion_archivo'].isna().any():
+                df['estacion_archivo'] = df['estacion_archivo'].astype('int64')
+        else:
+            df['estacion_archivo'] = desde_nombre
+        dfs.append(df)
+
+    # CSV anteriores al almacenamiento en Parquet
     for archivo in archivos:
+        if archivo.suffix != ".csv":
+            continue
         df = pd.read_csv(archivo)
-        df['estacion_archivo'] = archivo.stem  # Agregar nombre del archivo como identificador de estación
+        # Convertir FECHA (DDMMAAAA) a string, formatear como DDMMAAAA y pasar a datetime
+        df['FECHA'] = pd.to_datetime(df['FECHA'].astype(str).str.zfill(8), format='%d%m%Y', errors='coerce')
+        df['estacion_archivo'] = pd.to_numeric(archivo.stem, errors='coerce')
         dfs.append(df)
 
     # Concatenar todos los DataFrames en uno solo
     df_estaciones = pd.concat(dfs, ignore_index=True)
-    print(df_estaciones)
 
-    
     ## Normalización y combinación de fecha y hora
-    
-    # Convertir FECHA (DDMMAAAA) a string y formatear como DDMMAAAA
-    df_estaciones['FECHA'] = df_estaciones['FECHA'].astype(str).str.zfill(8)
-
-    # Convertir a formato datetime (indicando el formato original)
-    df_estaciones['FECHA'] = pd.to_datetime(df_estaciones['FECHA'], format='%d%m%Y', errors='coerce')
 
     # Asegurar que HORA está en número entero (algunos datasets los tienen como string)
     df_estaciones['HORA'] = df_estaciones['HORA'].astype(int)
@@ -62,64 +175,20 @@ def procesar_exploracion_plata():
     # Crear columna combinada FECHA_HORA como datetime completo
     df_estaciones['FECHA_HORA'] = df_estaciones['FECHA'] + pd.to_timedelta(df_estaciones['HORA'], unit='h')
 
-    # Guardar el archivo con los datos horarios de las estaciones de la provincia
-    archivo_horario = PLATA_DIR / "horario_archivo.csv"
-
-    # Guardar el archivo con datos horarios
-    df_estaciones.to_csv(archivo_horario, index=False)
-    
-    
-    ## Agrupación diaria de variables por estación
-
-    # Agrupar por estación y fecha para obtener valores resumen diarios
-    df_estaciones_group = df_estaciones.groupby(['NOMBRE', 'FECHA']).agg({
-        'TEMP': ['mean', 'min', 'max'],
-        'PNM': ['mean', 'min', 'max'],
-        'HUM': ['mean', 'min', 'max'],
-        'DD': 'mean',
-        'FF': 'mean'
-    }).reset_index()
-
-    # Renombrar columnas para facilitar su uso
-    df_estaciones_group.columns = ['ESTACION', 'FECHA',
-                                'TEMP_MEAN', 'TEMP_MIN', 'TEMP_MAX',
-                                'PNM_MEAN', 'PNM_MIN', 'PNM_MAX',
-                                'HUM_MEAN', 'HUM_MIN', 'HUM_MAX',
-                                'WIND_DIR_MEAN', 'WIND_SPEED_MEAN']
-
-    
-    ## Analisis de cobertura temporal por estacion
-
-    # Crear rango completo de fechas
-    rango_fechas = pd.date_range(df_estaciones_group['FECHA'].min(), df_estaciones_group['FECHA'].max())
-
-    # Detectar días faltantes por estación y exportar
-    for estacion in df_estaciones_group['ESTACION'].unique():
-        fechas_est = pd.to_datetime(df_estaciones_group[df_estaciones_group['ESTACION'] == estacion]['FECHA'].unique())
-        dias_faltantes = sorted(set(rango_fechas) - set(fechas_est))
+    return df_estaciones
 
-        # Crear archivo por estación
-        nombre_archivo = FALTANTES_DIR / f'dias_faltantes_{estacion.replace(" ", "_").lower()}.txt'
-        with open(nombre_archivo, 'w', encoding='utf-8') as f:
-            f.write(f"Días faltantes para estación: {estacion}\n")
-            f.write(f"Total: {len(dias_faltantes)}\n\n")
-            for dia in dias_faltantes:
-                f.write(f"{dia.strftime('%Y-%m-%d')}\n")
-
-    ## Análisis exploratorio – valores máximos, mínimos, promedio diario
-
-    # Verificar valores inválidos en DD (mayores a 360)
-    valores_dd_invalidos = df_estaciones[df_estaciones['DD'] > 360]['DD'].unique()
-    print("Valores inválidos en DD (mayores a 360):", valores_dd_invalidos, "\n")
-
-    # Crear columna de fecha sin hora para agrupar
-    df_estaciones['FECHA_DIA'] = df_estaciones['FECHA'].dt.date
-
-    # Crear DD_VALID con NaN en valores > 360 (para excluir del promedio)
-    df_estaciones['DD_VALID'] = df_estaciones['DD'].where(df_estaciones['DD'] <= 360, pd.NA)
+# Agrupación diaria de variables por estación (sin redondeo ni relleno)
+@metricas.instrumentar("agregacion")
+def agregar_diario_bronce(df_estaciones):
+    df = df_estaciones.assign(
+        # Crear columna de fecha sin hora para agrupar (datetime64, sin objetos date)
+        FECHA_DIA=df_estaciones['FECHA'].dt.normalize(),
+        # Crear DD_VALID con NaN en valores > 360 (para excluir del promedio; float, no objetos)
+        DD_VALID=df_estaciones['DD'].where(df_estaciones['DD'] <= 360),
+    )
 
-    # Paso 3: Agrupar por estación y día, y calcular estadísticas
-    df_estaciones_group = df_estaciones.groupby(['NOMBRE', 'FECHA_DIA']).agg({
+    # Agrupar por estación y día, y calcular estadísticas
+    df_diario = df.groupby(['NOMBRE', 'FECHA_DIA']).agg({
         'TEMP': ['mean', 'min', 'max'],
         'PNM': ['mean', 'min', 'max'],
         'HUM': ['mean', 'min', 'max'],
@@ -129,7 +198,7 @@ def procesar_exploracion_plata():
     }).reset_index()
 
     # Renombrar columnas para facilitar lectura
-    df_estaciones_group.columns = [
+    df_diario.columns = [
         'ESTACION', 'FECHA',
         'TEMP_MEAN', 'TEMP_MIN', 'TEMP_MAX',
         'PNM_MEAN', 'PNM_MIN', 'PNM_MAX',
@@ -138,57 +207,92 @@ def procesar_exploracion_plata():
         'WIND_DIR_MIN', 'WIND_DIR_MAX',
         'WIND_SPEED_MEAN', 'WIND_SPEED_MIN', 'WIND_SPEED_MAX'
     ]
+    return df_diario
+
+# Índice de cobertura (estación × día × hora): se recalculan los días afectados, o todos al
+# reconstruir (o si todavía no existe el índice)
+@metricas.instrumentar("cobertura")
+def actualizar_cobertura(df_horario, afectados=None, reconstruir=False):
+    reconstruir = reconstruir or afectados is None or not COBERTURA_FILE.exists()
+    if reconstruir:
+        indice = Cobertura()
+        afectados = df_horario[['NOMBRE', 'FECHA']].dropna().drop_duplicates()
+        df_afectados = df_horario
+    else:
+        indice = Cobertura.cargar()
+        claves = pd.MultiIndex.from_frame(afectados)
+        df_afectados = df_horario[pd.MultiIndex.from_frame(df_horario[['NOMBRE', 'FECHA']]).isin(claves)]
+
+    indice.actualizar(df_afectados, afectados, PORCENTAJE_FRECUENCIA)
+    indice.guardar()
+    logger.info(f"🧮 Índice de cobertura actualizado: {len(afectados)} días de {afectados['NOMBRE'].nunique()} estaciones")
+
+# Redondeo, relleno y normalización del agregado diario (Capa Plata INICIAL)
+def completar_plata_inicial(df_diario):
+    df = df_diario.copy()
 
     # Redondear solo las columnas *_MEAN a 1 decimal
-    cols_mean = ['TEMP_MEAN', 'PNM_MEAN', 'HUM_MEAN', 'WIND_DIR_MEAN', 'WIND_SPEED_MEAN']
-    df_estaciones_group[cols_mean] = df_estaciones_group[cols_mean].round(1)
+    df[COLS_MEAN] = df[COLS_MEAN].round(1)
 
     ## Normalización Min-Max: ¿Por qué la aplicamos?
 
     # Rellenar valores nulos con forward fill
-    df_estaciones_group.ffill(inplace=True)
-
-    # Definir columnas *_MEAN para normalizar
-    cols_mean = ['TEMP_MEAN', 'PNM_MEAN', 'HUM_MEAN', 'WIND_DIR_MEAN', 'WIND_SPEED_MEAN']
-
-    # Aplicar normalización Min-Max y mostrar ejemplos
-    for col in cols_mean:
-        min_val = df_estaciones_group[col].min()
-        max_val = df_estaciones_group[col].max()
-        df_estaciones_group[col + '_NORM'] = (df_estaciones_group[col] - min_val) / (max_val - min_val)
-
-    # Exportar la Capa Plata INICIAL:
-    df_estaciones_group.to_csv(PLATA_DIR / 'dataset_plata_inicial.csv', index=False)
-
-    # --- Función para generar metadatos por columna ---
-    def generar_metadatos(df):
-        metadatos = []
-        for col in df.columns:
-            serie = df[col]
-            tipo = serie.dtype
-            no_nulos = serie.notnull().sum()
-            nulos = serie.isnull().sum()
-            pct_nulos = (nulos / len(serie)) * 100
-            unicos = serie.nunique()
-            ejemplo = serie.dropna().iloc[0] if no_nulos > 0 else None
-            try:
-                minimo = serie.min()
-                maximo = serie.max()
-            except:
-                minimo, maximo = None, None
-
-            metadatos.append({
-                'Columna': col,
-                'Tipo de dato': str(tipo),
-                'Valores no nulos': no_nulos,
-                'Valores nulos': nulos,
-                '% Nulos': round(pct_nulos, 2),
-                'Valor mínimo': minimo,
-                'Valor máximo': maximo,
-                'Valores únicos': unicos,
-                'Ejemplo': ejemplo
-            })
-        return pd.DataFrame(metadatos)
+    df.ffill(inplace=True)
+
+    # Aplicar normalización Min-Max
+    for col in COLS_MEAN:
+        min_val = df[col].min()
+        max_val = df[col].max()
+        df[col + '_NORM'] = (df[col] - min_val) / (max_val - min_val)
+
+    return df
+
+# --- Función para generar metadatos por columna ---
+def generar_metadatos(df):
+    metadatos = []
+    for col in df.columns:
+        serie = df[col]
+        tipo = serie.dtype
+        no_nulos = serie.notnull().sum()
+        nulos = serie.isnull().sum()
+        pct_nulos = (nulos / len(serie)) * 100
+        unicos = serie.nunique()
+        ejemplo = serie.dropna().iloc[0] if no_nulos > 0 else None
+        try:
+            minimo = serie.min()
+            maximo = serie.max()
+        except:
+            minimo, maximo = None, None
+
+        metadatos.append({
+            'Columna': col,
+            'Tipo de dato': str(tipo),
+            'Valores no nulos': no_nulos,
+            'Valores nulos': nulos,
+            '% Nulos': round(pct_nulos, 2),
+            'Valor mínimo': minimo,
+            'Valor máximo': maximo,
+            'Valores únicos': unicos,
+            'Ejemplo': ejemplo
+        })
+    return pd.DataFrame(metadatos)
+
+# Provincias de las estaciones según el catálogo; sin catálogo, PROVINCIA_OBJETIVO
+def provincias_estaciones(estaciones):
+    try:
+        catalogo = obtener_catalogo(ESTACIONES_FILE)
+        provincias = {catalogo.provincia_de(estacion) for estacion in estaciones} - {None}
+    except OSError:
+        provincias = set()
+    if not provincias and os.getenv("PROVINCIA_OBJETIVO"):
+        provincias = {os.getenv("PROVINCIA_OBJETIVO").strip().upper()}
+    return sorted(provincias)
+
+# Exportación de la Capa Plata INICIAL junto con diccionario y metadatos
+@metricas.instrumentar("exportacion_inicial")
+def exportar_plata_inicial(df_inicial, estaciones, fecha_min, fecha_max):
+    # Exportar la Capa Plata INICIAL (float64: es la entrada del enriquecimiento)
+    exportar_tabla(df_inicial, 'dataset_plata_inicial', float32=False)
 
     # --- Diccionario de variables (manual) ---
     diccionario_vars = pd.DataFrame([
@@ -213,16 +317,16 @@ def procesar_exploracion_plata():
     ], columns=["Columna", "Descripción", "Unidad", "Observaciones"])
 
     # --- Metadatos generales automáticos ---
-    estaciones = df_estaciones['NOMBRE'].unique()
-    provincia = estaciones[0].split()[-1].capitalize()
-    cobertura_geo = f"Estaciones meteorológicas de la provincia de {provincia}, Argentina"
-
-    fecha_min = df_estaciones['FECHA'].min().strftime('%Y-%m-%d')
-    fecha_max = df_estaciones['FECHA'].max().strftime('%Y-%m-%d')
-    cobertura_temporal = f"Desde {fecha_min} hasta {fecha_max}"
+    provincias = provincias_estaciones(estaciones)
+    nombres_provincias = ", ".join(provincia.title() for provincia in provincias) or "(sin datos)"
+    cobertura_geo = (
+        f"Estaciones meteorológicas de la provincia de {nombres_provincias}, Argentina" if len(provincias) <= 1
+        else f"Estaciones meteorológicas de las provincias de {nombres_provincias}, Argentina"
+    )
+    cobertura_temporal = f"Desde {fecha_min.strftime('%Y-%m-%d')} hasta {fecha_max.strftime('%Y-%m-%d')}"
 
     metadatos_generales = pd.DataFrame([
-        ["Nombre del conjunto de datos", "misiones_plata"],
+        ["Nombre del conjunto de datos", "_".join(p.lower().replace(" ", "_") for p in provincias) + "_plata"],
         ["Fuente original", "Servicio Meteorológico Nacional (SMN)"],
         ["Cobertura geográfica", cobertura_geo],
         ["Cobertura temporal", cobertura_temporal],
@@ -235,7 +339,7 @@ def procesar_exploracion_plata():
     ], columns=["Campo", "Valor"])
 
     # --- Exportar los tres archivos ---
-    metadatos_df = generar_metadatos(df_estaciones_group)
+    metadatos_df = generar_metadatos(df_inicial)
     path_metadatos = DICCIONARIO_DIR / 'metadatos_variables.csv'
     path_diccionario = DICCIONARIO_DIR / 'diccionario_variables.csv'
     path_generales = DICCIONARIO_DIR / 'metadatos_generales.csv'
@@ -243,33 +347,18 @@ def procesar_exploracion_plata():
     metadatos_df.to_csv(path_metadatos, index=False)
     diccionario_vars.to_csv(path_diccionario, index=False)
     metadatos_generales.to_csv(path_generales, index=False)
-    
+
     # Imprimir resumen de exportación
     logger.info("✅ Archivos exportados en formato Capa Plata:")
-    logger.info(f" - CSV:     {PLATA_DIR / 'dataset_plata_inicial.csv'}")
-    logger.info(f"\n Filas exportadas: {len(df_estaciones_group)}")
-    logger.info(f" Columnas exportadas: {len(df_estaciones_group.columns)}")
-    
-def procesar_enriquecimiento_plata():
-    archivo_plata = PLATA_DIR / "dataset_plata_inicial.csv"
-    archivo_horario = PLATA_DIR / "horario_archivo.csv"
-    
-    # Cargar el dataset diario
-    try:
-        df_plata = pd.read_csv(archivo_plata, parse_dates=["FECHA"])
-        logger.info("✅ Dataset diario cargado correctamente")
-    except FileNotFoundError:
-        logger.info("⚠️ El archivo diario no fue encontrado")
-        return
-
-    # Cargar el dataset horario
-    try:
-        df_horario = pd.read_csv(archivo_horario, parse_dates=["FECHA_HORA"])
-        logger.info("✅ Dataset horario cargado correctamente")
-    except FileNotFoundError:
-        logger.info("⚠️ El archivo horario no fue encontrado")
-        return
-        
+    logger.info(f" - Parquet: {PLATA_DIR / 'dataset_plata_inicial.parquet'}")
+    if EXPORTAR_CSV:
+        logger.info(f" - CSV:     {PLATA_DIR / 'dataset_plata_inicial.csv'}")
+    logger.info(f"\n Filas exportadas: {len(df_inicial)}")
+    logger.info(f" Columnas exportadas: {len(df_inicial.columns)}")
+
+# Reindexado diario por estación, con forward fill e imputación por media
+@metricas.instrumentar("completar_fechas")
+def completar_fechas_diario(df_plata):
     # Generar el rango completo de fechas esperadas
     fechas_totales = pd.date_range(start=df_plata['FECHA'].min(), end=df_plata['FECHA'].max(), freq='D')
 
@@ -284,129 +373,97 @@ def procesar_enriquecimiento_plata():
     faltantes = df_plata[df_plata.isnull().any(axis=1)][['ESTACION', 'FECHA']]
 
     if not faltantes.empty:
-        faltantes.to_csv(PLATA_DIR / "fechas_faltantes.txt", index=False, sep='\t')
-        logger.info(f"⚠️ Fechas faltantes exportadas a: {PLATA_DIR / 'fechas_faltantes.txt'}")
+        logger.info(f"⚠️ {len(faltantes)} días de estación con datos faltantes (detalle por hora en el índice de cobertura)")
     else:
         logger.info("✅ No se encontraron fechas faltantes")
 
     ## Relleno con forward fill por estación
-    
+
     # Ordenar por estación y fecha para aplicar forward fill correctamente
     df_plata_ffill = df_plata.sort_values(['ESTACION', 'FECHA']).copy()
     df_plata_ffill.update(df_plata.groupby('ESTACION').ffill())
-    
+
     ## Imputación con la media de cada estación (solo para columnas numéricas)
-    
+
     # Imputar con la media por estación
     columnas_a_imputar = ['TEMP_MEAN', 'PNM_MEAN', 'HUM_MEAN', 'WIND_SPEED_MEAN', 'WIND_DIR_MEAN']
 
     for col in columnas_a_imputar:
         df_plata_ffill[col] = df_plata_ffill.groupby('ESTACION')[col].transform(lambda x: x.fillna(x.mean()))
-    
-    ## Tratamiento de datos faltantes en el dataset horario
-    
-    # Detectar horarios reales de cada estación
-    df_horario['HORA'] = df_horario['FECHA_HORA'].dt.hour
-    horarios_por_estacion = df_horario.groupby('NOMBRE')['HORA'].value_counts().unstack(fill_value=0)
-    horarios_mas_frecuentes = horarios_por_estacion.idxmax(axis=1)
 
-    # Detectar horarios outlier (menos del 5% de los días)
-    outliers_horarios = {}
-    for estacion in horarios_por_estacion.index:
-        total_dias = df_horario[df_horario['NOMBRE'] == estacion]['FECHA_HORA'].dt.date.nunique()
-        outliers = horarios_por_estacion.loc[estacion][
-            horarios_por_estacion.loc[estacion] / total_dias < 0.05
-        ].index.tolist()
-        if outliers:
-            outliers_horarios[estacion] = outliers
+    return df_plata, df_plata_ffill
 
-    # Crear index completo por estación y sus horarios típicos
+# Recalcular FECHA (día) y HORA desde FECHA_HORA en el dataset horario
+def preparar_horario(df_horario):
+    df_horario = df_horario.copy()
+    df_horario['HORA'] = df_horario['FECHA_HORA'].dt.hour
     df_horario['FECHA'] = df_horario['FECHA_HORA'].dt.floor('D')
-    estaciones_h = df_horario['NOMBRE'].unique()
-    fecha_h_min = df_horario['FECHA'].min()
-    fecha_h_max = df_horario['FECHA'].max()
-    # rango_fechas = pd.date_range(start=fecha_h_min, end=fecha_h_max, freq='D')
-    if pd.isna(fecha_h_min) or pd.isna(fecha_h_max):
-        logger.warning("⚠️ No se puede generar rango de fechas en horario: FECHA contiene NaT")
-        return  # o manejar de otra forma
-
-    rango_fechas = pd.date_range(start=fecha_h_min, end=fecha_h_max, freq='D')
-
-    # Crear combinaciones válidas por estación
-    porcentaje_frecuencia = 0.05 # al menos en 5% de los días
-
-    index_completo_personalizado = []
-    for estacion in estaciones_h:
-        total_dias_estacion = df_horario[df_horario['NOMBRE'] == estacion]['FECHA'].nunique()
-        horas_validas = horarios_por_estacion.columns[
-            (horarios_por_estacion.loc[estacion] / total_dias_estacion) >= porcentaje_frecuencia  
-        ].tolist()
-
-        for fecha in rango_fechas:
-            for hora in horas_validas:
-                index_completo_personalizado.append((estacion, pd.Timestamp(fecha + pd.Timedelta(hours=hora))))
-
-    index_completo_h = pd.MultiIndex.from_tuples(index_completo_personalizado, names=['NOMBRE', 'FECHA_HORA'])
-
-    # Reindexar para insertar valores faltantes en los horarios esperados únicamente
-    df_horario_completo = df_horario.set_index(['NOMBRE', 'FECHA_HORA']).reindex(index_completo_h).reset_index()
-    
-    # Exportar datasets intermedios (si se desea conservar)
-    df_plata.to_csv(PLATA_DIR / "dataset_intermedio_horario_con_nan.csv", index=False)
-    df_plata_ffill.to_csv(PLATA_DIR / "dataset_intermedio_horario_ffill.csv", index=False)
-    df_horario_completo.to_csv(PLATA_DIR / "dataset_intermedio_horario_completo.csv", index=False)
+    return df_horario
+
+# Cantidad de observaciones por estación y hora del día
+def calcular_frecuencia_horaria(df_horario):
+    return (
+        df_horario.assign(HORA=df_horario['FECHA_HORA'].dt.hour)
+        .groupby('NOMBRE')['HORA'].value_counts()
+        .unstack(fill_value=0)
+    )
 
-    logger.info("✅ Dataset intermedios generados correctamente")
-    
-    ## Imputación de datos faltantes basada en promedio entre días anterior y posterior
-    
-    # Variables a imputar
-    variables_objetivo = ['TEMP', 'HUM', 'PNM', 'DD', 'FF']
+# Proporción de los días de cada estación con observación en cada hora del día
+def calcular_proporcion_horaria(horarios_por_estacion, dias_por_estacion):
+    return horarios_por_estacion.div(dias_por_estacion.reindex(horarios_por_estacion.index), axis=0)
+
+# Horas típicas por estación: presentes en al menos PORCENTAJE_FRECUENCIA de sus días
+def calcular_horas_validas(horarios_por_estacion, dias_por_estacion):
+    proporcion = calcular_proporcion_horaria(horarios_por_estacion, dias_por_estacion)
+    return {
+        estacion: horarios_por_estacion.columns[proporcion.loc[estacion] >= PORCENTAJE_FRECUENCIA].tolist()
+        for estacion in horarios_por_estacion.index
+    }
+
+# Horarios outlier por estación (menos de PORCENTAJE_FRECUENCIA de sus días), de una sola pasada
+# sobre la tabla estación × hora
+def calcular_horas_outlier(horarios_por_estacion, dias_por_estacion):
+    proporcion = calcular_proporcion_horaria(horarios_por_estacion, dias_por_estacion).stack()
+    outliers = proporcion[proporcion < PORCENTAJE_FRECUENCIA].index
+    return (
+        pd.Series(outliers.get_level_values(1), index=outliers.get_level_values(0))
+        .groupby(level=0).agg(list).to_dict()
+    )
 
+# Índice completo por estación con sus horarios típicos para cada día del rango. La máscara
+# estación × hora se combina por broadcasting con la matriz día × hora, en el orden estación,
+# día y hora.
+@metricas.instrumentar("grilla")
+def construir_grilla_horaria(horas_validas, rango_fechas):
+    estaciones = list(horas_validas)
+    mascara = np.zeros((len(estaciones), 24), dtype=bool)
+    for i, horas in enumerate(horas_validas.values()):
+        mascara[i, np.asarray(horas, dtype=int)] = True
+
+    dias = pd.DatetimeIndex(rango_fechas)
+    fechas_horas = dias.to_numpy()[:, None] + np.arange(24).astype('timedelta64[h]')
+    forma = (len(estaciones), len(dias), 24)
+    seleccion = np.broadcast_to(mascara[:, None, :], forma)
+
+    indice_estacion = np.broadcast_to(np.arange(len(estaciones))[:, None, None], forma)[seleccion]
+    nombres = np.asarray(estaciones, dtype=object)[indice_estacion]
+    fecha_hora = pd.DatetimeIndex(np.broadcast_to(fechas_horas, forma)[seleccion]).as_unit(dias.unit)
+    return pd.MultiIndex.from_arrays([nombres, fecha_hora], names=['NOMBRE', 'FECHA_HORA'])
+
+## Imputación de datos faltantes basada en promedio entre días anterior y posterior
+@metricas.instrumentar("imputacion")
+def imputar_horario(df_horario_completo):
     df_interp = df_horario_completo.copy()
 
     # Asegurar FECHA y HORA correctas
-    df_interp['FECHA'] = df_interp['FECHA_HORA'].dt.date
+    df_interp['FECHA'] = df_interp['FECHA_HORA'].dt.normalize()
     df_interp['HORA'] = df_interp['FECHA_HORA'].dt.hour
 
-    # Ordenar por estación, fecha y hora
-    df_interp = df_interp.sort_values(by=['NOMBRE', 'FECHA', 'HORA'])
-
-    # Función de imputación por promedio entre día anterior y posterior
-    def imputar_valores(grupo):
-        grupo = grupo.copy()  # para evitar advertencias de SettingWithCopy
-        for var in variables_objetivo:
-            for idx, fila in grupo.iterrows():
-                if pd.isna(fila[var]):
-                    hora = fila['HORA']
-                    fecha = fila['FECHA']
-
-                    # Buscar el valor del día anterior
-                    val_ant = grupo[(grupo['HORA'] == hora) & (grupo['FECHA'] < fecha)][var].last_valid_index()
-                    val_ant = grupo.at[val_ant, var] if val_ant is not None else None
-
-                    # Buscar el valor del día posterior
-                    val_post = grupo[(grupo['HORA'] == hora) & (grupo['FECHA'] > fecha)][var].first_valid_index()
-                    val_post = grupo.at[val_post, var] if val_post is not None else None
-
-                    # Asignar promedio o valor disponible
-                    if val_ant is not None and val_post is not None:
-                        grupo.at[idx, var] = round((val_ant + val_post) / 2, 1)
-                    elif val_ant is not None:
-                        grupo.at[idx, var] = val_ant
-                    elif val_post is not None:
-                        grupo.at[idx, var] = val_post
-        return grupo
-
-    # Aplicar por estación SIN include_groups
-    df_interp = (
-        df_interp.groupby('NOMBRE', group_keys=False)
-        .apply(imputar_valores)
-        .reset_index(drop=True)
-    )
+    # Imputar por estación y hora (vectorizado; ordena por estación, fecha y hora)
+    df_interp = imputar_promedio_dias_adyacentes(df_interp, VARIABLES_HORARIAS)
 
     # Redondear valores numéricos a 1 decimal
-    for var in variables_objetivo:
+    for var in VARIABLES_HORARIAS:
         df_interp[var] = df_interp[var].round(1)
 
     # Ajustar tipos de columnas
@@ -414,13 +471,11 @@ def procesar_enriquecimiento_plata():
     if 'estacion_archivo' in df_interp.columns:
         df_interp['estacion_archivo'] = df_interp['estacion_archivo'].astype('int64', errors='ignore')
 
-    # Exportar
-    archivo_imputado = PLATA_DIR / "dataset_plata_horario_final.csv"
-    df_interp.to_csv(archivo_imputado, index=False)
-    logger.info(f"✅ Dataset horario final generado correctamente: {archivo_imputado}")
-    
-    ## Generar dataset diario imputado (todas las estaciones)
+    return df_interp
 
+# Agregado diario de la grilla horaria imputada (antes de ajustar tipos y normalizar)
+@metricas.instrumentar("agregacion_imputada")
+def agregar_diario_imputado(df_interp):
     # Agrupar por estación y fecha
     df_diario_imputado = df_interp.groupby(['NOMBRE', 'FECHA']).agg(
         TEMP_MEAN=('TEMP', 'mean'),
@@ -443,13 +498,15 @@ def procesar_enriquecimiento_plata():
     # Renombrar y ordenar
     df_diario_imputado.rename(columns={'NOMBRE':'ESTACION'}, inplace=True)
     df_diario_imputado['FECHA'] = pd.to_datetime(df_diario_imputado['FECHA'])
-    df_diario_imputado = df_diario_imputado.sort_values(by=['ESTACION','FECHA']).reset_index(drop=True)
+    return df_diario_imputado.sort_values(by=['ESTACION','FECHA']).reset_index(drop=True)
 
-    # Ajustes de tipos y redondeo
+# Ajustes de tipos, redondeo y normalización del dataset diario imputado. Con extremos ({col: [min, max]},
+# los de todo el dataset) se normalizan solo las filas dadas con los mismos valores que el dataset entero.
+def finalizar_diario_imputado(df_diario_imputado, extremos=None):
+    df_diario_imputado = df_diario_imputado.copy()
 
     # Redondear medias a 1 decimal
-    cols_float = ['TEMP_MEAN','PNM_MEAN','HUM_MEAN','WIND_DIR_MEAN','WIND_SPEED_MEAN']
-    df_diario_imputado[cols_float] = df_diario_imputado[cols_float].round(1)
+    df_diario_imputado[COLS_MEAN] = df_diario_imputado[COLS_MEAN].round(1)
 
     # Convertir min y max a enteros
     cols_int = [
@@ -458,73 +515,663 @@ def procesar_enriquecimiento_plata():
         'WIND_DIR_MIN','WIND_DIR_MAX',
         'WIND_SPEED_MIN','WIND_SPEED_MAX'
     ]
-    df_diario_imputado[cols_int] = df_diario_imputado[cols_int].round().astype(int)
+    # (entero con nulos: una estación puede no medir alguna variable, p. ej. PNM)
+    df_diario_imputado[cols_int] = df_diario_imputado[cols_int].round().astype('Int64')
 
     # Normalización Min-Max de las variables MEAN
-
-    variables_mean = ['TEMP_MEAN','PNM_MEAN','HUM_MEAN','WIND_DIR_MEAN','WIND_SPEED_MEAN']
-    for var in variables_mean:
+    for var in COLS_MEAN:
         col_norm = var + '_NORM'
-        min_val = df_diario_imputado[var].min()
-        max_val = df_diario_imputado[var].max()
+        if extremos is None:
+            min_val, max_val = df_diario_imputado[var].min(), df_diario_imputado[var].max()
+        else:
+            min_val, max_val = extremos[var] or (np.nan, np.nan)
         df_diario_imputado[col_norm] = ((df_diario_imputado[var] - min_val) / (max_val - min_val)).round(5)
 
-    # Guardar el dataset diario imputado completo
-    archivo_diario_imputado = PLATA_DIR / "dataset_plata_diario_final.csv"
-    df_diario_imputado.to_csv(archivo_diario_imputado, index=False)
-    logger.info(f"✅ Dataset diario final generado correctamente: {archivo_diario_imputado}")
-    
-    # MARCADOR DE PROCESADO EN PLATA
+    return df_diario_imputado
+
+# Exportación de datasets intermedios y finales de Plata, y marcador de procesado
+@metricas.instrumentar("exportacion")
+def exportar_plata_final(df_plata, df_plata_ffill, df_horario_completo, df_interp, df_diario_imputado):
+    # Exportar datasets intermedios (si se desea conservar)
+    exportar_tabla(df_plata, "dataset_intermedio_horario_con_nan")
+    exportar_tabla(df_plata_ffill, "dataset_intermedio_horario_ffill")
+    exportar_tabla(df_horario_completo, "dataset_intermedio_horario_completo")
+
+    logger.info("✅ Dataset intermedios generados correctamente")
+
+    # Exportar el horario final particionado por estación y mes
+    reemplazar_dataset(
+        df_interp.assign(MES=columna_periodo(df_interp['FECHA_HORA'], 'M')), HORARIO_FINAL_DIR, PARTICIONES_HORARIO
+    )
+    if EXPORTAR_CSV:
+        df_interp.to_csv(PLATA_DIR / "dataset_plata_horario_final.csv", index=False)
+    logger.info(f"✅ Dataset horario final generado correctamente: {HORARIO_FINAL_DIR}")
+
+    exportar_diario_final(df_diario_imputado)
+    resumen_plata_final(
+        len(df_diario_imputado), df_diario_imputado["FECHA"].min(), df_diario_imputado["FECHA"].max(),
+        len(df_interp), df_interp["FECHA_HORA"].min(), df_interp["FECHA_HORA"].max(),
+    )
+
+# Guardar el dataset diario imputado completo (se reescribe entero: la normalización es global)
+def exportar_diario_final(df_diario_imputado):
+    reemplazar_dataset(
+        df_diario_imputado.assign(ANIO=pd.to_datetime(df_diario_imputado['FECHA']).dt.year),
+        DIARIO_FINAL_DIR, PARTICIONES_DIARIO,
+    )
+    if EXPORTAR_CSV:
+        df_diario_imputado.to_csv(PLATA_DIR / "dataset_plata_diario_final.csv", index=False)
+    logger.info(f"✅ Dataset diario final generado correctamente: {DIARIO_FINAL_DIR}")
+
+def resumen_plata_final(filas_diario, desde_diario, hasta_diario, filas_horario, desde_horario, hasta_horario):
+    logger.info(
+        "📝 Plata final → Diario %s filas (%s→%s), Horario %s filas (%s→%s)",
+        filas_diario, pd.Timestamp(desde_diario), pd.Timestamp(hasta_diario),
+        filas_horario, desde_horario, hasta_horario,
+    )
+
+# Procesamiento de archivos desde Bronce a Plata
+@metricas.instrumentar("plata.exploracion")
+def procesar_exploracion_plata():
+    ## Carga inicial de datos
+    df_estaciones = leer_bronce(listar_archivos_bronce())
+    logger.info(f"📥 Bronce: {len(df_estaciones)} filas de {df_estaciones['NOMBRE'].nunique()} estaciones")
+
+    # Guardar el archivo con los datos horarios de las estaciones de la provincia
+    exportar_tabla(df_estaciones, "horario_archivo", float32=False)
+
+    ## Agrupación diaria de variables por estación
+    df_diario = agregar_diario_bronce(df_estaciones)
+
+    ## Analisis de cobertura temporal por estacion
+    actualizar_cobertura(df_estaciones)
+
+    ## Análisis exploratorio – valores máximos, mínimos, promedio diario
+
+    # Verificar valores inválidos en DD (mayores a 360)
+    valores_dd_invalidos = df_estaciones[df_estaciones['DD'] > 360]['DD'].unique()
+    logger.info(f"🧭 Valores inválidos en DD (mayores a 360): {sorted(valores_dd_invalidos.tolist())}")
+
+    df_inicial = completar_plata_inicial(df_diario)
+    metricas.anotar(filas_entrada=len(df_estaciones), filas_salida=len(df_inicial))
+    exportar_plata_inicial(
+        df_inicial,
+        df_estaciones['NOMBRE'].unique(),
+        df_estaciones['FECHA'].min(),
+        df_estaciones['FECHA'].max(),
+    )
+
+@metricas.instrumentar("plata.enriquecimiento")
+def procesar_enriquecimiento_plata():
+    archivo_plata = PLATA_DIR / "dataset_plata_inicial.parquet"
+    archivo_horario = PLATA_DIR / "horario_archivo.parquet"
+
+    # Cargar el dataset diario
     try:
-        marker_csv = PLATA_DIR / "procesados.csv"
+        df_plata = leer_parquet(archivo_plata)
+        logger.info("✅ Dataset diario cargado correctamente")
+    except FileNotFoundError:
+        logger.info("⚠️ El archivo diario no fue encontrado")
+        return
 
-        # Rango/filas desde los DataFrames en memoria
-        d_fecha_min = pd.to_datetime(df_diario_imputado["FECHA"]).min()
-        d_fecha_max = pd.to_datetime(df_diario_imputado["FECHA"]).max()
-        d_rows = int(len(df_diario_imputado))
+    # Cargar el dataset horario
+    try:
+        df_horario = leer_parquet(archivo_horario)
+        logger.info("✅ Dataset horario cargado correctamente")
+    except FileNotFoundError:
+        logger.info("⚠️ El archivo horario no fue encontrado")
+        return
 
-        if "FECHA_HORA" in df_interp.columns:
-            h_fh = pd.to_datetime(df_interp["FECHA_HORA"])
-        else:
-            h_fh = pd.to_datetime(df_interp["FECHA"]) + pd.to_timedelta(df_interp["HORA"], unit="h")
-        h_fecha_hora_min = h_fh.min()
-        h_fecha_hora_max = h_fh.max()
-        h_rows = int(len(df_interp))
-
-        # Mismo timestamp para ambas filas (una por dataset)
-        ts = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-
-        header = ["timestamp", "dataset", "start", "end", "rows"]
-        rows = [
-            [ts, "plata_diario_final",
-            d_fecha_min.isoformat() if pd.notna(d_fecha_min) else None,
-            d_fecha_max.isoformat() if pd.notna(d_fecha_max) else None,
-            d_rows],
-            [ts, "plata_horario_final",
-            h_fecha_hora_min.isoformat() if pd.notna(h_fecha_hora_min) else None,
-            h_fecha_hora_max.isoformat() if pd.notna(h_fecha_hora_max) else None,
-            h_rows],
+    df_plata, df_plata_ffill = completar_fechas_diario(df_plata)
+
+    ## Tratamiento de datos faltantes en el dataset horario
+
+    # Detectar horarios reales de cada estación
+    df_horario = preparar_horario(df_horario)
+    horarios_por_estacion = calcular_frecuencia_horaria(df_horario)
+    dias_por_estacion = df_horario.groupby('NOMBRE')['FECHA'].nunique()
+
+    # Detectar horarios outlier (menos del 5% de los días)
+    outliers_horarios = calcular_horas_outlier(horarios_por_estacion, dias_por_estacion)
+    logger.info(f"⏱️ Horarios outlier por estación: {outliers_horarios}")
+
+    # Crear index completo por estación y sus horarios típicos
+    fecha_h_min = df_horario['FECHA'].min()
+    fecha_h_max = df_horario['FECHA'].max()
+    if pd.isna(fecha_h_min) or pd.isna(fecha_h_max):
+        logger.warning("⚠️ No se puede generar rango de fechas en horario: FECHA contiene NaT")
+        return  # o manejar de otra forma
+
+    rango_fechas = pd.date_range(start=fecha_h_min, end=fecha_h_max, freq='D')
+    horas_validas = calcular_horas_validas(horarios_por_estacion, dias_por_estacion)
+    index_completo_h = construir_grilla_horaria(horas_validas, rango_fechas)
+
+    # Reindexar para insertar valores faltantes en los horarios esperados únicamente
+    df_horario_completo = df_horario.set_index(['NOMBRE', 'FECHA_HORA']).reindex(index_completo_h).reset_index()
+
+    df_interp = imputar_horario(df_horario_completo)
+
+    ## Generar dataset diario imputado (todas las estaciones)
+    df_diario_imputado = finalizar_diario_imputado(agregar_diario_imputado(df_interp))
+
+    metricas.anotar(filas_entrada=len(df_horario), filas_salida=len(df_interp) + len(df_diario_imputado))
+    exportar_plata_final(df_plata, df_plata_ffill, df_horario_completo, df_interp, df_diario_imputado)
+
+## Procesamiento de Plata con memoria acotada (estación por estación)
+
+# Archivos de Bronce agrupados por carpeta de estación, en el orden del índice
+def archivos_bronce_por_estacion():
+    grupos = {}
+    for archivo in listar_archivos_bronce():
+        grupos.setdefault(archivo.parent.name, []).append(archivo)
+    return grupos
+
+# Tabla de Plata escrita por partes (Parquet y CSV opcional, como exportar_tabla)
+def escritor_tabla(nombre, float32=True):
+    return EscritorParquet(
+        PLATA_DIR / f"{nombre}.parquet", float32=float32, csv=PLATA_DIR / f"{nombre}.csv" if EXPORTAR_CSV else None
+    )
+
+# Mismas salidas que procesar_exploracion_plata + procesar_enriquecimiento_plata sin tener nunca en
+# memoria más que las observaciones horarias de una estación (y los agregados diarios, 24 veces más
+# chicos). Primera pasada: el Bronce de cada estación se agrega a horario_archivo (una parte por
+# estación), al diario y a la cobertura. Segunda pasada: cada estación se relee de horario_archivo
+# (solo sus row groups) para la grilla, la imputación y el horario final, que se escriben por partes.
+# Las mediciones se procesan en float64 dentro de cada estación (las tablas finales se guardan en
+# float32 igual que siempre) para que la imputación redondee igual que el proceso completo, y quedan
+# en float aunque a una estación no le falte ningún valor, así todas las partes comparten el esquema.
+@metricas.instrumentar("plata.baja_memoria")
+def procesar_plata_baja_memoria():
+    grupos_bronce = archivos_bronce_por_estacion()
+    if not grupos_bronce:
+        logger.info("⚠️ No hay archivos en Bronce")
+        return
+
+    ## Primera pasada: observaciones de Bronce, agregado diario y cobertura
+
+    grupos_estacion = {}
+    diarios = []
+    indice = Cobertura()
+    dd_invalidos = set()
+    extremos = []
+    filas = dias_cobertura = 0
+    with escritor_tabla("horario_archivo", float32=False) as horario_archivo:
+        for archivos in grupos_bronce.values():
+            df = leer_bronce(archivos)
+            df = df.astype({var: 'float64' for var in VARIABLES_HORARIAS})
+            grupos = horario_archivo.escribir(df)
+            for nombre in df['NOMBRE'].unique():
+                grupos_estacion.setdefault(nombre, []).extend(grupos)
+
+            diarios.append(agregar_diario_bronce(df))
+            afectados = df[['NOMBRE', 'FECHA']].dropna().drop_duplicates()
+            indice.actualizar(df, afectados, PORCENTAJE_FRECUENCIA)
+            dias_cobertura += len(afectados)
+            dd_invalidos.update(df.loc[df['DD'] > 360, 'DD'].unique().tolist())
+            filas += len(df)
+            extremos.append([df['FECHA'].min(), df['FECHA'].max(), df['FECHA_HORA'].min(), df['FECHA_HORA'].max()])
+
+    indice.guardar()
+    extremos = pd.DataFrame(extremos, columns=['FECHA_MIN', 'FECHA_MAX', 'HORA_MIN', 'HORA_MAX'])
+    fecha_min, fecha_max = extremos['FECHA_MIN'].min(), extremos['FECHA_MAX'].max()
+    dia_min, dia_max = extremos['HORA_MIN'].min().floor('D'), extremos['HORA_MAX'].max().floor('D')
+    logger.info(f"📥 Bronce: {filas} filas de {len(grupos_estacion)} estaciones")
+    logger.info(f"🧮 Índice de cobertura actualizado: {dias_cobertura} días de {len(grupos_estacion)} estaciones")
+    logger.info(f"🧭 Valores inválidos en DD (mayores a 360): {sorted(dd_invalidos)}")
+
+    df_diario = pd.concat(diarios, ignore_index=True).sort_values(['ESTACION', 'FECHA'], kind='stable')
+    exportar_plata_inicial(
+        completar_plata_inicial(df_diario.reset_index(drop=True)), list(grupos_estacion), fecha_min, fecha_max
+    )
+    del diarios, df_diario
+
+    if pd.isna(dia_min) or pd.isna(dia_max):
+        logger.warning("⚠️ No se puede generar rango de fechas en horario: FECHA contiene NaT")
+        return
+
+    ## Segunda pasada: grilla horaria, imputación y horario final por estación
+
+    df_plata, df_plata_ffill = completar_fechas_diario(leer_parquet(PLATA_DIR / "dataset_plata_inicial.parquet"))
+    exportar_tabla(df_plata, "dataset_intermedio_horario_con_nan")
+    exportar_tabla(df_plata_ffill, "dataset_intermedio_horario_ffill")
+
+    rango_fechas = pd.date_range(start=dia_min, end=dia_max, freq='D')
+    outliers_horarios = {}
+    diarios_imputados = []
+    filas_horario = 0
+    extremos_horario = []
+    with ExitStack() as salidas:
+        horario_completo = salidas.enter_context(escritor_tabla("dataset_intermedio_horario_completo"))
+        horario_final = salidas.enter_context(EscritorDataset(HORARIO_FINAL_DIR, PARTICIONES_HORARIO))
+        horario_final_csv = (
+            salidas.enter_context(EscritorCSV(PLATA_DIR / "dataset_plata_horario_final.csv")) if EXPORTAR_CSV else None
+        )
+        for estacion in sorted(grupos_estacion):
+            df_horario = leer_grupos(PLATA_DIR / "horario_archivo.parquet", sorted(set(grupos_estacion[estacion])))
+            df_horario = preparar_horario(df_horario[df_horario['NOMBRE'] == estacion])
+
+            horarios_por_estacion = calcular_frecuencia_horaria(df_horario)
+            dias_por_estacion = df_horario.groupby('NOMBRE')['FECHA'].nunique()
+            outliers_horarios.update(calcular_horas_outlier(horarios_por_estacion, dias_por_estacion))
+            grilla = construir_grilla_horaria(calcular_horas_validas(horarios_por_estacion, dias_por_estacion), rango_fechas)
+
+            df_completo = df_horario.set_index(['NOMBRE', 'FECHA_HORA']).reindex(grilla).reset_index()
+            df_completo = df_completo.astype({col: 'float64' for col in df_completo.select_dtypes('integer').columns})
+            df_interp = imputar_horario(df_completo)
+            df_interp['estacion_archivo'] = df_interp['estacion_archivo'].astype('float64')
+
+            horario_completo.escribir(df_completo)
+            horario_final.escribir(df_interp.assign(MES=columna_periodo(df_interp['FECHA_HORA'], 'M')))
+            if horario_final_csv is not None:
+                horario_final_csv.escribir(df_interp)
+            diarios_imputados.append(agregar_diario_imputado(df_interp))
+
+            filas_horario += len(df_interp)
+            extremos_horario.append([df_interp['FECHA_HORA'].min(), df_interp['FECHA_HORA'].max()])
+
+    logger.info(f"⏱️ Horarios outlier por estación: {outliers_horarios}")
+    logger.info("✅ Dataset intermedios generados correctamente")
+    logger.info(f"✅ Dataset horario final generado correctamente: {HORARIO_FINAL_DIR}")
+
+    df_diario_imputado = finalizar_diario_imputado(pd.concat(diarios_imputados, ignore_index=True))
+    exportar_diario_final(df_diario_imputado)
+    extremos_horario = pd.DataFrame(extremos_horario, columns=['DESDE', 'HASTA'])
+    resumen_plata_final(
+        len(df_diario_imputado), df_diario_imputado['FECHA'].min(), df_diario_imputado['FECHA'].max(),
+        filas_horario, extremos_horario['DESDE'].min(), extremos_horario['HASTA'].max(),
+    )
+    metricas.anotar(filas_entrada=filas, filas_salida=filas_horario + len(df_diario_imputado))
+
+## Procesamiento incremental de Plata (solo los días afectados por archivos nuevos de Bronce)
+
+def _frecuencia_a_tabla(horarios_por_estacion):
+    return (
+        horarios_por_estacion.rename_axis(index='NOMBRE', columns='HORA')
+        .stack().rename('OBSERVACIONES').reset_index()
+    )
+
+def _tabla_a_frecuencia(tabla):
+    return tabla.pivot(index='NOMBRE', columns='HORA', values='OBSERVACIONES').fillna(0).astype('int64')
+
+def _en_dias(fecha_hora, desde, hasta):
+    dia = fecha_hora.dt.floor('D')
+    return (dia >= desde) & (dia <= hasta)
+
+# Extiende [inicio, fin] hasta el último valor observado antes y el primero después para cada
+# hora y variable, de modo que los huecos que tocan los días afectados se recalculen completos.
+# horas_variable: {variable: horas de la grilla}; las que nunca tuvieron un valor válido quedan
+# afuera (son NaN en cualquier ventana y no tienen dónde apoyarse).
+def _limites_ventana(observado, horas_variable, inicio, fin, rango_inicio, rango_fin):
+    dia = observado['FECHA_HORA'].dt.floor('D')
+    hora = observado['FECHA_HORA'].dt.hour
+
+    desde, hasta = inicio, fin
+    for var, horas in horas_variable.items():
+        if not horas:
+            continue
+        validos = hora.isin(horas) & observado[var].notna()
+        previos = dia[validos & (dia < inicio)].groupby(hora[validos & (dia < inicio)]).max()
+        posteriores = dia[validos & (dia > fin)].groupby(hora[validos & (dia > fin)]).min()
+        desde = min(desde, previos.min()) if len(previos) == len(horas) else rango_inicio
+        hasta = max(hasta, posteriores.max()) if len(posteriores) == len(horas) else rango_fin
+    return desde, hasta
+
+# Filas semilla para imputar una ventana aislada: el valor ya imputado del día anterior a la
+# ventana y el primer valor observado posterior, por hora y variable
+def _semillas_ventana(imputado, observado, horas, desde, hasta, rango_inicio, rango_fin):
+    semillas = []
+    un_dia = pd.Timedelta(days=1)
+
+    if desde > rango_inicio and imputado is not None:
+        previas = imputado[imputado['FECHA_HORA'].dt.floor('D') == desde - un_dia]
+        semillas.append(previas[['FECHA_HORA'] + VARIABLES_HORARIAS])
+
+    if hasta < rango_fin:
+        hora = observado['FECHA_HORA'].dt.hour
+        posteriores = observado[(observado['FECHA_HORA'].dt.floor('D') > hasta) & hora.isin(horas)]
+        primeros = (
+            posteriores.sort_values('FECHA_HORA')
+            .groupby(posteriores['FECHA_HORA'].dt.hour)[VARIABLES_HORARIAS].first()
+            .reindex(horas)
+        )
+        primeros['FECHA_HORA'] = hasta + un_dia + pd.to_timedelta(primeros.index, unit='h')
+        semillas.append(primeros.reset_index(drop=True))
+
+    return semillas
+
+# Extremo de los meses de horario_base a leer para una ventana: a partir de mes (excluido), hacia
+# atrás (paso -1) o hacia adelante (paso 1), el mes más lejano que hace falta para encontrar el
+# primer valor válido de cada hora y variable según las máscaras del manifiesto
+def _mes_limite(marcas, horas_variable, mes, paso):
+    meses = sorted((m for m in marcas if (m < mes if paso < 0 else m > mes)), reverse=paso < 0)
+    pendientes = {var: sum(1 << int(hora) for hora in horas) for var, horas in horas_variable.items()}
+    limite = mes
+    for m in meses:
+        if not any(pendientes.values()):
+            break
+        for var in pendientes:
+            encontradas = pendientes[var] & marcas[m]['horas'][var]
+            if encontradas:
+                pendientes[var] &= ~encontradas
+                limite = m
+    return limite
+
+# Ventana de imputación de una estación leyendo solo los meses necesarios de horario_base: los de
+# los días afectados y los del valor válido anterior y siguiente de cada hora y variable (para los
+# límites), y después los de la ventana y los del primer valor válido posterior (para las semillas)
+def _ventana_estacion(estacion, marcas, horas_variable, inicio, fin, rango_inicio, rango_fin):
+    leidos = set()
+
+    def leer(desde_mes, hasta_mes):
+        meses = {mes for mes in marcas if desde_mes <= mes <= hasta_mes} - leidos
+        leidos.update(meses)
+        return estado_plata.leer_particiones("horario_base", [(estacion, mes) for mes in meses])
+
+    observado = leer(
+        _mes_limite(marcas, horas_variable, f"{inicio:%Y-%m}", -1),
+        _mes_limite(marcas, horas_variable, f"{fin:%Y-%m}", 1),
+    )
+    desde, hasta = _limites_ventana(preparar_horario(observado), horas_variable, inicio, fin, rango_inicio, rango_fin)
+
+    hasta_mes = _mes_limite(marcas, horas_variable, f"{hasta:%Y-%m}", 1) if hasta < rango_fin else f"{hasta:%Y-%m}"
+    extra = leer(f"{desde:%Y-%m}", hasta_mes)
+    if extra is not None:
+        observado = pd.concat([observado, extra], ignore_index=True)
+    return desde, hasta, preparar_horario(observado)
+
+# Reemplaza en una tabla del estado las filas de una estación dentro de [desde, hasta] (todas si es
+# completa). Solo se releen las particiones del borde que tienen filas fuera de la ventana; devuelve
+# el contenido completo de las particiones escritas.
+def _reemplazar_ventana(estado, tabla, estacion, df, desde, hasta, completa):
+    fecha = estado_plata.TABLAS_ESTADO[tabla]['fecha']
+    periodos = estado_plata.periodo(tabla, pd.Series(pd.date_range(desde, hasta, freq='D'))).unique()
+    previas = estado_plata.marcas_tabla(estado, tabla).get(estacion, {})
+    claves = {(estacion, periodo) for periodo in periodos}
+
+    if completa:
+        claves |= {(estacion, periodo) for periodo in previas}
+    else:
+        bordes = [
+            (estacion, periodo) for periodo in {periodos[0], periodos[-1]}
+            if periodo in previas and (
+                pd.Timestamp(previas[periodo]['desde']).floor('D') < desde
+                or pd.Timestamp(previas[periodo]['hasta']).floor('D') > hasta
+            )
         ]
+        conservar = estado_plata.leer_particiones(tabla, bordes)
+        if conservar is not None:
+            conservar = conservar[~conservar[fecha].dt.floor('D').between(desde, hasta)]
+            df = pd.concat([conservar[df.columns], df], ignore_index=True)
+
+    df = df.sort_values(fecha).reset_index(drop=True)
+    estado_plata.escribir_tabla(estado, tabla, df, claves)
+    return df
+
+# Reconstrucción completa desde todos los archivos de Bronce: mismas salidas que
+# procesar_exploracion_plata + procesar_enriquecimiento_plata, y el estado particionado escrito entero
+def _reconstruir_plata(archivos, pendientes, bronce_en_memoria):
+    logger.info(f"🧱 Reconstrucción completa de Plata desde {len(pendientes)} archivos de Bronce")
+    horario_base = leer_bronce(pendientes, bronce_en_memoria)
+
+    metricas.anotar(filas_entrada=len(horario_base))
+
+    valores_dd_invalidos = horario_base[horario_base['DD'] > 360]['DD'].unique()
+    logger.info(f"🧭 Valores inválidos en DD (mayores a 360): {sorted(valores_dd_invalidos.tolist())}")
+
+    diario_base = agregar_diario_bronce(horario_base).sort_values(['ESTACION', 'FECHA']).reset_index(drop=True)
+    horarios_por_estacion = calcular_frecuencia_horaria(horario_base)
+    horas_validas = calcular_horas_validas(horarios_por_estacion, diario_base.groupby('ESTACION').size())
+
+    ## Grilla horaria e imputación de todo el rango, estación por estación
+
+    rango_inicio = horario_base['FECHA_HORA'].min().floor('D')
+    rango_fin = horario_base['FECHA_HORA'].max().floor('D')
+    rango_fechas = pd.date_range(rango_inicio, rango_fin, freq='D')
+    horario_obs = preparar_horario(horario_base)
+
+    completos, imputados, diarios = [], [], []
+    for estacion, horas in horas_validas.items():
+        grilla = construir_grilla_horaria({estacion: horas}, rango_fechas)
+        observado = horario_obs[horario_obs['NOMBRE'] == estacion]
+        completo = observado.set_index(['NOMBRE', 'FECHA_HORA']).reindex(grilla).reset_index()
+        interp = imputar_horario(completo)
+
+        completos.append(completo)
+        imputados.append(interp)
+        diarios.append(agregar_diario_imputado(interp))
+        logger.info(f"   ↻ {estacion}: completa {rango_inicio.date()} → {rango_fin.date()}")
+
+    horario_completo = pd.concat(completos, ignore_index=True).sort_values(['NOMBRE', 'FECHA_HORA']).reset_index(drop=True)
+    horario_imputado = pd.concat(imputados, ignore_index=True).sort_values(['NOMBRE', 'FECHA_HORA']).reset_index(drop=True)
+    diario_imputado = pd.concat(diarios, ignore_index=True).sort_values(['ESTACION', 'FECHA']).reset_index(drop=True)
+
+    ## Exportación (mismos archivos que el procesamiento completo)
+
+    exportar_tabla(horario_base, "horario_archivo", float32=False)
+    actualizar_cobertura(horario_base)
+    exportar_plata_inicial(
+        completar_plata_inicial(diario_base),
+        horario_base['NOMBRE'].unique(),
+        horario_base['FECHA'].min(),
+        horario_base['FECHA'].max(),
+    )
+
+    # El dataset inicial se relee como en procesar_enriquecimiento_plata (es chico: un registro por día)
+    df_plata, df_plata_ffill = completar_fechas_diario(leer_parquet(PLATA_DIR / "dataset_plata_inicial.parquet"))
+
+    # estacion_archivo en float en todas las particiones (como en procesar_plata_baja_memoria), así las
+    # que después reescribe la actualización incremental comparten el esquema
+    df_interp = horario_imputado.astype({'estacion_archivo': 'float64'})
+    df_diario_final = finalizar_diario_imputado(diario_imputado)
+    exportar_plata_final(df_plata, df_plata_ffill, horario_completo, df_interp, df_diario_final)
+
+    with metricas.etapa("estado"):
+        estado = estado_plata.nuevo_estado()
+        estado_plata.escribir_tabla(estado, "horario_base", horario_base)
+        estado_plata.escribir_tabla(estado, "horario_imputado", horario_imputado)
+        estado_plata.escribir_tabla(estado, "diario_imputado", diario_imputado)
+        estado.update({
+            'archivos': estado_plata.registrar_archivos(pendientes, {}, BRONCE_DIR, vigentes=archivos),
+            'rango_inicio': rango_inicio,
+            'rango_fin': rango_fin,
+            'frecuencia_horaria': _frecuencia_a_tabla(horarios_por_estacion),
+            'normalizacion': estado_plata.extremos_diario(estado),
+        })
+        estado_plata.guardar_estado(estado)
+    logger.info(f"✅ Plata reconstruida: {len(horas_validas)} estaciones")
+    return {"diario": df_diario_final, "horario": df_interp}
+
+# Actualización incremental: se leen y reescriben solo las particiones (estación, mes o año) del
+# estado y de los datasets finales que cubren las ventanas afectadas. Las tablas enteras de
+# exploración (horario_archivo, dataset_plata_inicial, intermedias y CSV completos) quedan como las
+# dejó la última reconstrucción.
+def _actualizar_plata(estado, archivos, pendientes, bronce_en_memoria):
+    logger.info(f"🔄 Plata incremental: {len(pendientes)} archivos nuevos o modificados de {len(archivos)}")
+    df_nuevo = leer_bronce(pendientes, bronce_en_memoria)
+
+    metricas.anotar(filas_entrada=len(df_nuevo))
+
+    valores_dd_invalidos = df_nuevo[df_nuevo['DD'] > 360]['DD'].unique()
+    logger.info(f"🧭 Valores inválidos en DD (mayores a 360): {sorted(valores_dd_invalidos.tolist())}")
+
+    ## Actualización de las observaciones horarias (un archivo de Bronce = estación + día)
+
+    # Particiones con filas nuevas o con filas de los archivos que se reemplazan (según el manifiesto)
+    marcas_base = estado_plata.marcas_tabla(estado, "horario_base")
+    nuevos = df_nuevo[['NOMBRE', 'estacion_archivo']].dropna().drop_duplicates()
+    claves_archivo = set(zip(nuevos['NOMBRE'], nuevos['estacion_archivo'].astype('int64')))
+    claves_base = set(zip(df_nuevo['NOMBRE'], estado_plata.periodo("horario_base", df_nuevo['FECHA_HORA'])))
+    claves_base |= {
+        (estacion, mes)
+        for estacion, meses in marcas_base.items() for mes, marcas in meses.items()
+        if any((estacion, archivo) in claves_archivo for archivo in marcas['archivos'])
+    }
+    claves_base = {(estacion, mes) for estacion, mes in claves_base if not pd.isna(mes)}
+
+    horario_previo = estado_plata.leer_particiones("horario_base", claves_base)
+    if horario_previo is None:
+        horario_base = df_nuevo
+        removidas = df_nuevo.iloc[0:0]
+    else:
+        claves = pd.MultiIndex.from_frame(df_nuevo[['NOMBRE', 'estacion_archivo']].drop_duplicates())
+        reemplazadas = pd.MultiIndex.from_frame(horario_previo[['NOMBRE', 'estacion_archivo']]).isin(claves)
+        removidas = horario_previo[reemplazadas]
+        horario_base = pd.concat([horario_previo[~reemplazadas], df_nuevo], ignore_index=True)
+
+    afectados = pd.concat([removidas, df_nuevo])[['NOMBRE', 'FECHA']].dropna().drop_duplicates()
+
+    ## Tabla de frecuencia por hora del día (se suma lo nuevo y se resta lo reemplazado)
+
+    frecuencia_previa = _tabla_a_frecuencia(estado['frecuencia_horaria'])
+    horarios_por_estacion = frecuencia_previa.add(calcular_frecuencia_horaria(df_nuevo), fill_value=0)
+    if not removidas.empty:
+        horarios_por_estacion = horarios_por_estacion.sub(calcular_frecuencia_horaria(removidas), fill_value=0)
+    horarios_por_estacion = horarios_por_estacion.fillna(0).astype('int64').sort_index(axis=1)
+
+    # Los días por estación y las horas con algún valor válido salen del manifiesto de horario_base,
+    # antes y después de escribirlo
+    horas_previas = calcular_horas_validas(frecuencia_previa, estado_plata.dias_por_estacion(estado))
+    con_datos_previas = {estacion: estado_plata.horas_con_datos(estado, estacion) for estacion in marcas_base}
+    estado_plata.escribir_tabla(estado, "horario_base", horario_base, claves_base)
+    horas_validas = calcular_horas_validas(horarios_por_estacion, estado_plata.dias_por_estacion(estado))
+
+    # Sin índice de cobertura hay que reconstruirlo con todas las observaciones
+    if COBERTURA_FILE.exists():
+        actualizar_cobertura(horario_base, afectados)
+    else:
+        actualizar_cobertura(estado_plata.leer_tabla(estado, "horario_base"))
+
+    ## Recalcular la grilla horaria e imputación solo en la ventana afectada de cada estación
 
-        # Crear carpeta y escribir en modo append (NO atómico)
-        marker_csv.parent.mkdir(parents=True, exist_ok=True)
-        write_header = not marker_csv.exists() or marker_csv.stat().st_size == 0
-        with open(marker_csv, "a", newline="", encoding="utf-8") as f:
-            w = csv.writer(f)
-            if write_header:
-                w.writerow(header)
-            w.writerows(rows)
-
-        logger.info(
-            "📝 Marker de Plata (append) → %s | Diario %s→%s (%s filas), Horario %s→%s (%s filas)",
-            marker_csv,
-            d_fecha_min.date() if pd.notna(d_fecha_min) else "NA",
-            d_fecha_max.date() if pd.notna(d_fecha_max) else "NA", d_rows,
-            h_fecha_hora_min, h_fecha_hora_max, h_rows
+    rango_inicio, rango_fin = estado_plata.rango(estado)
+    dias_nuevos_rango = pd.date_range(rango_inicio, rango_fin).difference(
+        pd.date_range(estado['rango_inicio'], estado['rango_fin'])
+    )
+
+    horario_final, diario_final = [], []
+    for estacion, horas in horas_validas.items():
+        dias_afectados = pd.DatetimeIndex(afectados.loc[afectados['NOMBRE'] == estacion, 'FECHA']).union(dias_nuevos_rango)
+        completa = horas != horas_previas.get(estacion)
+        marcas = marcas_base.get(estacion)
+        if not marcas or (not completa and len(dias_afectados) == 0):
+            continue
+
+        if completa:
+            desde, hasta = rango_inicio, rango_fin
+            observado = preparar_horario(estado_plata.leer_tabla(estado, "horario_base", estacion))
+            semillas = []
+        else:
+            con_datos = estado_plata.horas_con_datos(estado, estacion)
+            previas = con_datos_previas.get(estacion, {})
+            horas_variable = {
+                var: [hora for hora in horas if (con_datos[var] | previas.get(var, 0)) >> int(hora) & 1]
+                for var in VARIABLES_HORARIAS
+            }
+            desde, hasta, observado = _ventana_estacion(
+                estacion, marcas, horas_variable, dias_afectados.min(), dias_afectados.max(), rango_inicio, rango_fin
+            )
+            dia_previo = desde - pd.Timedelta(days=1)
+            imputado_previo = None
+            if desde > rango_inicio:
+                imputado_previo = estado_plata.leer_particiones("horario_imputado", [(estacion, f"{dia_previo:%Y-%m}")])
+            semillas = _semillas_ventana(imputado_previo, observado, horas, desde, hasta, rango_inicio, rango_fin)
+
+        grilla = construir_grilla_horaria({estacion: horas}, pd.date_range(desde, hasta, freq='D'))
+        completo = observado.set_index(['NOMBRE', 'FECHA_HORA']).reindex(grilla).reset_index()
+
+        interp = imputar_horario(pd.concat([completo] + [s.assign(NOMBRE=estacion) for s in semillas], ignore_index=True))
+        interp = interp[_en_dias(interp['FECHA_HORA'], desde, hasta)]
+
+        # Reemplazar en el estado las filas de la ventana recalculada
+        horario_final.append(_reemplazar_ventana(estado, "horario_imputado", estacion, interp, desde, hasta, completa))
+        diario_final.append(_reemplazar_ventana(
+            estado, "diario_imputado", estacion, agregar_diario_imputado(interp), desde, hasta, completa
+        ))
+        logger.info(f"   ↻ {estacion}: {'completa' if completa else 'ventana'} {desde.date()} → {hasta.date()}")
+
+    ## Exportación: solo las particiones de los datasets finales que cubren ventanas recalculadas
+
+    plata = None
+    if horario_final:
+        plata = _exportar_ventanas(estado, horario_final, diario_final)
+        resumen_plata_final(
+            *estado_plata.totales(estado, "diario_imputado"), *estado_plata.totales(estado, "horario_imputado")
         )
-    except Exception as e:
-        logger.exception("❌ No se pudo generar procesados.csv en Plata: %s", e)
-    
+
+    with metricas.etapa("estado"):
+        estado.update({
+            'archivos': estado_plata.registrar_archivos(pendientes, estado['archivos'], BRONCE_DIR, vigentes=archivos),
+            'rango_inicio': rango_inicio,
+            'rango_fin': rango_fin,
+            'frecuencia_horaria': _frecuencia_a_tabla(horarios_por_estacion),
+        })
+        estado_plata.guardar_estado(estado)
+    logger.info(f"✅ Plata actualizada: {len(horario_final)} estaciones recalculadas")
+    return plata
+
+# Escribe las particiones de los datasets finales que cubren ventanas recalculadas (el contenido
+# completo de cada una, tal como quedó en el estado) y las devuelve para Oro
+@metricas.instrumentar("exportacion")
+def _exportar_ventanas(estado, horario_final, diario_final):
+    df_interp = pd.concat(horario_final, ignore_index=True).astype({'estacion_archivo': 'float64'})
+    df_horario_final = df_interp.assign(MES=columna_periodo(df_interp['FECHA_HORA'], 'M'))
+    escribir_particiones(df_horario_final, HORARIO_FINAL_DIR, PARTICIONES_HORARIO)
+
+    # La normalización es global: si cambian sus extremos se reescribe el diario final entero
+    extremos = estado_plata.extremos_diario(estado)
+    if extremos == estado['normalizacion']:
+        df_diario_final = finalizar_diario_imputado(pd.concat(diario_final, ignore_index=True), extremos)
+        df_diario_final = df_diario_final.assign(ANIO=df_diario_final['FECHA'].dt.year)
+        escribir_particiones(df_diario_final, DIARIO_FINAL_DIR, PARTICIONES_DIARIO)
+    else:
+        logger.info("🔁 Cambiaron los extremos de la normalización: se reescribe el diario final completo")
+        df_diario_final = finalizar_diario_imputado(estado_plata.leer_tabla(estado, "diario_imputado"), extremos)
+        df_diario_final = df_diario_final.assign(ANIO=df_diario_final['FECHA'].dt.year)
+        reemplazar_dataset(df_diario_final, DIARIO_FINAL_DIR, PARTICIONES_DIARIO)
+        estado['normalizacion'] = extremos
+
+    logger.info(
+        f"✅ Particiones reescritas: {len(df_horario_final[PARTICIONES_HORARIO].drop_duplicates())} del horario final "
+        f"y {len(df_diario_final[PARTICIONES_DIARIO].drop_duplicates())} del diario final"
+    )
+    return {"diario": df_diario_final.drop(columns='ANIO'), "horario": df_interp}
+
+# Devuelve los datasets finales de Plata ({"diario", "horario"}) para pasarlos a Oro sin releerlos
+# (en una actualización incremental, solo las particiones reescritas), o None si no había archivos
+# nuevos. bronce_en_memoria: {path: DataFrame} recién escritos por Bronce.
+@metricas.instrumentar("plata.incremental")
+def procesar_plata_incremental(reconstruir=False, bronce_en_memoria=None):
+    estado = None if reconstruir else estado_plata.cargar_estado()
+    if estado is not None and not (dataset_disponible(HORARIO_FINAL_DIR) and dataset_disponible(DIARIO_FINAL_DIR)):
+        logger.warning("⚠️ Faltan los datasets finales de Plata. Se reconstruye desde cero.")
+        estado = None
+    registrados = {} if estado is None else estado['archivos']
+
+    archivos = listar_archivos_bronce()
+    pendientes = estado_plata.archivos_pendientes(archivos, registrados, BRONCE_DIR)
+    if not pendientes:
+        logger.info("✅ Plata al día: no hay archivos nuevos en Bronce")
+        return None
+
+    if estado is None:
+        return _reconstruir_plata(archivos, pendientes, bronce_en_memoria)
+    return _actualizar_plata(estado, archivos, pendientes, bronce_en_memoria)
+
 if __name__ == "__main__":
-    procesar_exploracion_plata()
-    procesar_enriquecimiento_plata()
+    parser = argparse.ArgumentParser(description="Procesamiento Bronce → Plata")
+    parser.add_argument(
+        "--completo",
+        action="store_true",
+        help="Reconstruye Plata desde todos los archivos de Bronce, descartando el estado incremental",
+    )
+    parser.add_argument(
+        "--baja-memoria",
+        action="store_true",
+        help="Reconstruye Plata completa estación por estación, con memoria acotada (sin usar el estado incremental)",
+    )
+    args = parser.parse_args()
+
+    if args.baja_memoria:
+        procesar_plata_baja_memoria()
+    else:
+        procesar_plata_incremental(reconstruir=args.completo)
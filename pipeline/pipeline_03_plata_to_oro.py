@@ -1,8 +1,14 @@
 import pandas as pd
 from pathlib import Path
 import logging
-from datetime import date, datetime
-import csv
+import shutil
+
+import pyarrow.dataset as ds
+
+import estado_oro
+import metricas
+from almacenamiento import EXPORTAR_CSV, columna_periodo, escribir_particiones, leer_dataset, reemplazar_dataset, tipar
+from provincias import PARTICION_PROCESO
 
 
 # Configuración de logs
@@ -12,92 +18,181 @@ logger = logging.getLogger("uvicorn")
 # Definir rutas para capas Bronce y Plata y Diccionario
 BASE_DIR = Path(".").resolve()
 PLATA_DIR = BASE_DIR / "data" / "plata"
-ORO_DIR = BASE_DIR / "data" / "oro"
+ORO_DIR = BASE_DIR / "data" / "oro" / PARTICION_PROCESO
 ORO_DIR.mkdir(parents=True, exist_ok=True)
-marker_csv_oro = ORO_DIR / "procesados.csv"
-
-# Procesamiento de archivos desde Plata a Oro
-def procesar_oro():
-    
-    ## Carga de Datos
 
-    # Archivos de entrada
-    archivo_diario = PLATA_DIR / 'dataset_plata_diario_final.csv'
-    archivo_horario = PLATA_DIR / 'dataset_plata_horario_final.csv'
+# Datasets Parquet de Plata (entrada) y de Oro (salida). Con PROVINCIAS el proceso de cada
+# provincia lee y escribe solo su partición PROVINCIA=<provincia> (y deja en ORO_DIR sus CSV).
+PLATA_DIARIO_DIR = PLATA_DIR / "diario_final" / PARTICION_PROCESO
+PLATA_HORARIO_DIR = PLATA_DIR / "horario_final" / PARTICION_PROCESO
+ORO_DIARIO_DIR = BASE_DIR / "data" / "oro" / "diario" / PARTICION_PROCESO
+ORO_HORARIO_DIR = BASE_DIR / "data" / "oro" / "horario" / PARTICION_PROCESO
+
+# Columnas que se leen de Plata (las columnas auxiliares de partición MES/ANIO se descartan)
+COLUMNAS_DIARIO = [
+    'ESTACION', 'FECHA', 'TEMP_MEAN', 'TEMP_MIN', 'TEMP_MAX', 'PNM_MEAN', 'PNM_MIN', 'PNM_MAX',
+    'HUM_MEAN', 'HUM_MIN', 'HUM_MAX', 'WIND_DIR_MEAN', 'WIND_DIR_MIN', 'WIND_DIR_MAX',
+    'WIND_SPEED_MEAN', 'WIND_SPEED_MIN', 'WIND_SPEED_MAX', 'TEMP_MEAN_NORM', 'PNM_MEAN_NORM',
+    'HUM_MEAN_NORM', 'WIND_DIR_MEAN_NORM', 'WIND_SPEED_MEAN_NORM',
+]
+COLUMNAS_HORARIO = ['NOMBRE', 'FECHA_HORA', 'FECHA', 'HORA', 'TEMP', 'HUM', 'PNM', 'DD', 'FF', 'estacion_archivo']
+COLUMNAS_DERIVADAS = ['AMP_TERMICA', 'RANGO_PRESION', 'RANGO_HUMEDAD']
+
+# Datasets de Oro: mismas particiones que en Plata, así cada partición de Plata tiene una sola de Oro
+DATASETS = {
+    "diario": {
+        "plata": PLATA_DIARIO_DIR, "oro": ORO_DIARIO_DIR, "columnas": COLUMNAS_DIARIO,
+        "salida": COLUMNAS_DIARIO + COLUMNAS_DERIVADAS, "particiones": ['ESTACION', 'ANIO'], "fecha": 'FECHA',
+        "csv": 'dataset_oro_diario.csv',
+    },
+    "horario": {
+        "plata": PLATA_HORARIO_DIR, "oro": ORO_HORARIO_DIR, "columnas": COLUMNAS_HORARIO,
+        "salida": COLUMNAS_HORARIO, "particiones": ['NOMBRE', 'MES'], "fecha": 'FECHA_HORA',
+        "csv": 'dataset_oro_horario.csv',
+    },
+}
+
+
+# Columna auxiliar de partición temporal (ANIO del diario, MES "AAAA-MM" del horario)
+def agregar_periodo(df, nombre):
+    if nombre == "diario":
+        return df.assign(ANIO=df['FECHA'].dt.year)
+    return df.assign(MES=columna_periodo(df['FECHA_HORA'], 'M'))
+
+
+# Variables derivadas diarias, redondeadas a 1 decimal para consistencia
+def derivar_diario(df_diario):
+    df_diario['AMP_TERMICA'] = df_diario['TEMP_MAX'] - df_diario['TEMP_MIN']
+    df_diario['RANGO_PRESION'] = df_diario['PNM_MAX'] - df_diario['PNM_MIN']
+    df_diario['RANGO_HUMEDAD'] = df_diario['HUM_MAX'] - df_diario['HUM_MIN']
+    df_diario[COLUMNAS_DERIVADAS] = df_diario[COLUMNAS_DERIVADAS].round(1)
+    return df_diario
+
+
+# Filas de Plata de las particiones cambiadas: del DataFrame que pasa Plata (las particiones que
+# reescribió) o leyendo únicamente los archivos de esas particiones. Las cambiadas que no vienen en
+# memoria (p. ej. de una corrida anterior de Plata sin Oro) se leen de disco.
+@metricas.instrumentar("carga")
+def leer_particiones(nombre, rutas, en_memoria=None):
+    spec = DATASETS[nombre]
+    estacion = spec["particiones"][0]
+    partes = []
+    if en_memoria is not None:
+        claves = {estado_oro.valores_particion(ruta) for ruta in rutas}
+        df = en_memoria[en_memoria[estacion].astype(str).isin({clave[0] for clave in claves})][spec["columnas"]]
+        df = agregar_periodo(tipar(df), nombre)
+        valores = pd.MultiIndex.from_arrays([df[col].astype(str) for col in spec["particiones"]])
+        en_claves = valores.isin(list(claves))
+        partes.append(df[en_claves].drop(columns=spec["particiones"][1:]))
+        en_memoria = set(valores[en_claves])
+        rutas = [ruta for ruta in rutas if estado_oro.valores_particion(ruta) not in en_memoria]
+
+    if rutas:
+        archivos = [str(archivo) for ruta in rutas for archivo in sorted((spec["plata"] / ruta).glob("*.parquet"))]
+        dataset = ds.dataset(archivos, format="parquet", partitioning="hive", partition_base_dir=str(spec["plata"]))
+        partes.append(tipar(dataset.to_table(columns=spec["columnas"]).to_pandas()))
+    return pd.concat(partes, ignore_index=True)
+
+
+# Marcas de agua de una partición a partir de sus filas
+def marcas(df, fecha):
+    return {"filas": len(df), "desde": df[fecha].min().isoformat(), "hasta": df[fecha].max().isoformat()}
+
+
+# Actualiza un dataset de Oro con las particiones de Plata que cambiaron desde el manifiesto;
+# devuelve la entrada nueva del manifiesto y la cantidad de particiones escritas y eliminadas
+def actualizar_dataset(nombre, manifiesto, en_memoria=None):
+    spec = DATASETS[nombre]
+    previo = manifiesto.get(nombre, {}) if spec["oro"].exists() else {}
+    previas = previo.get("particiones", {})
+    actuales, cambiadas, eliminadas = estado_oro.particiones_cambiadas(spec["plata"], len(spec["particiones"]), previas)
+
+    escritas = {}
+    if cambiadas:
+        df = leer_particiones(nombre, cambiadas, en_memoria)
+        df = df.sort_values(spec["particiones"][:1] + [spec["fecha"]]).reset_index(drop=True)
+        if nombre == "diario":
+            df = derivar_diario(df)
+        df = agregar_periodo(df, nombre)
+
+        # Sin manifiesto se escribe el dataset entero; si no, solo se reemplazan las particiones cambiadas
+        with metricas.etapa("escritura"):
+            metricas.anotar(filas_entrada=len(df))
+            if not previas:
+                reemplazar_dataset(df, spec["oro"], spec["particiones"])
+            else:
+                escribir_particiones(df, spec["oro"], spec["particiones"])
+        metricas.anotar(filas_salida=len(df))
+
+        for clave, grupo in df.groupby([df[col].astype(str) for col in spec["particiones"]], sort=False):
+            escritas[clave] = marcas(grupo, spec["fecha"])
+
+    # Particiones que ya no están en Plata (o que quedaron vacías)
+    vacias = [ruta for ruta in cambiadas if estado_oro.valores_particion(ruta) not in escritas]
+    for ruta in eliminadas + vacias:
+        shutil.rmtree(spec["oro"] / ruta, ignore_errors=True)
+
+    # Marcas de agua: las de las particiones sin cambios se conservan del manifiesto
+    particiones = {}
+    for ruta, entrada in actuales.items():
+        if ruta in cambiadas:
+            entrada.update(escritas.get(estado_oro.valores_particion(ruta), {"filas": 0, "desde": None, "hasta": None}))
+        else:
+            entrada.update({k: previas[ruta][k] for k in ("filas", "desde", "hasta")})
+        particiones[ruta] = entrada
+
+    con_filas = [entrada for entrada in particiones.values() if entrada["filas"]]
+    actualizado = bool(cambiadas or eliminadas)
+    entrada = {
+        "particiones": particiones,
+        "filas": sum(p["filas"] for p in con_filas),
+        "desde": min((p["desde"] for p in con_filas), default=None),
+        "hasta": max((p["hasta"] for p in con_filas), default=None),
+        "actualizado": pd.Timestamp.now().isoformat(timespec="seconds") if actualizado else previo.get("actualizado"),
+    }
+    return entrada, len(cambiadas), len(eliminadas)
+
+
+# Procesamiento incremental de Plata a Oro: solo se recalculan y reescriben las particiones de Plata
+# que cambiaron desde la última corrida (según el manifiesto de Oro). Con plata ({"diario",
+# "horario"}, las particiones que reescribió procesar_plata_incremental) las filas de esas
+# particiones se toman de memoria en lugar de leerlas de disco.
+@metricas.instrumentar("oro")
+def procesar_oro(plata=None):
 
-    # Verificar existencia de archivos
     try:
-        if not archivo_diario.exists() or not archivo_horario.exists():
-            logger.warning("Faltan archivos en Plata. Diario: %s | Horario: %s", archivo_diario.exists(), archivo_horario.exists())
-            return
-
-    ## Generación de Variables Derivadas
-
-        # Lectura de datasets
-        df_diario = pd.read_csv(archivo_diario, parse_dates=['FECHA'])
-        df_horario = pd.read_csv(archivo_horario, parse_dates=['FECHA_HORA'])
-
-        # Variables derivadas diarias
-        df_diario['AMP_TERMICA'] = df_diario['TEMP_MAX'] - df_diario['TEMP_MIN']
-        df_diario['RANGO_PRESION'] = df_diario['PNM_MAX'] - df_diario['PNM_MIN']
-        df_diario['RANGO_HUMEDAD'] = df_diario['HUM_MAX'] - df_diario['HUM_MIN']
-
-        # Redondeo a 1 decimal para consistencia
-        cols_derivadas = ['AMP_TERMICA', 'RANGO_PRESION', 'RANGO_HUMEDAD']
-        df_diario[cols_derivadas] = df_diario[cols_derivadas].round(1)
-
-
-        ## Exportación de la Capa Oro
-
-        # Exportación a CSV
-        df_diario.to_csv(ORO_DIR / 'dataset_oro_diario.csv', index=False)
-        df_horario.to_csv(ORO_DIR / 'dataset_oro_horario.csv', index=False) 
-        
-        # Rango/filas desde los DataFrames en memoria (ya leídos arriba)
-        # Diario Oro (usa FECHA)
-        o_d_fecha_min = pd.to_datetime(df_diario["FECHA"]).min()
-        o_d_fecha_max = pd.to_datetime(df_diario["FECHA"]).max()
-        o_d_rows = int(len(df_diario))
-
-        # Horario Oro (usa FECHA_HORA)
-        o_h_fecha_hora_min = pd.to_datetime(df_horario["FECHA_HORA"]).min()
-        o_h_fecha_hora_max = pd.to_datetime(df_horario["FECHA_HORA"]).max()
-        o_h_rows = int(len(df_horario))
-
-        # Mismo timestamp para ambas filas (una por dataset)
-        ts = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-
-        header = ["timestamp", "dataset", "start", "end", "rows"]
-        rows = [
-            [ts, "oro_diario",
-             o_d_fecha_min.isoformat() if pd.notna(o_d_fecha_min) else None,
-             o_d_fecha_max.isoformat() if pd.notna(o_d_fecha_max) else None,
-             o_d_rows],
-            [ts, "oro_horario",
-             o_h_fecha_hora_min.isoformat() if pd.notna(o_h_fecha_hora_min) else None,
-             o_h_fecha_hora_max.isoformat() if pd.notna(o_h_fecha_hora_max) else None,
-             o_h_rows],
-        ]
-
-        # Crear carpeta y escribir en modo append (NO atómico)
-        marker_csv_oro.parent.mkdir(parents=True, exist_ok=True)
-        write_header = not marker_csv_oro.exists() or marker_csv_oro.stat().st_size == 0
-        with open(marker_csv_oro, "a", newline="", encoding="utf-8") as f:
-            w = csv.writer(f)
-            if write_header:
-                w.writerow(header)
-            w.writerows(rows)
-
-        logger.info(
-            "📝 Marker de Oro → %s | Diario %s→%s (%s filas), Horario %s→%s (%s filas)",
-            marker_csv_oro,
-            o_d_fecha_min.date() if pd.notna(o_d_fecha_min) else "NA",
-            o_d_fecha_max.date() if pd.notna(o_d_fecha_max) else "NA", o_d_rows,
-            o_h_fecha_hora_min, o_h_fecha_hora_max, o_h_rows
-        )
-    
+        manifiesto = estado_oro.cargar_manifiesto()
+        resumen = {}
+        for nombre, spec in DATASETS.items():
+            if not spec["plata"].is_dir():
+                logger.warning("Falta el dataset %s de Plata: %s", nombre, spec["plata"])
+                return
+
+            with metricas.etapa(nombre):
+                entrada, escritas, eliminadas = actualizar_dataset(nombre, manifiesto, None if plata is None else plata[nombre])
+                manifiesto[nombre] = entrada
+                resumen[nombre] = (escritas, eliminadas)
+
+                # CSV opcional: copia completa del dataset de Oro, solo si cambió
+                if EXPORTAR_CSV and (escritas or eliminadas or not (ORO_DIR / spec["csv"]).exists()):
+                    with metricas.etapa("csv"):
+                        completo = leer_dataset(spec["oro"], columnas=spec["salida"])
+                        completo = completo.sort_values(spec["particiones"][:1] + [spec["fecha"]])
+                        completo.to_csv(ORO_DIR / spec["csv"], index=False)
+                        metricas.anotar(filas_salida=len(completo))
+
+        estado_oro.guardar_manifiesto(manifiesto)
+
+        for nombre, (escritas, eliminadas) in resumen.items():
+            entrada = manifiesto[nombre]
+            logger.info(
+                "📝 Oro %s → %s particiones actualizadas, %s eliminadas de %s | %s filas (%s→%s)",
+                nombre, escritas, eliminadas, len(entrada["particiones"]),
+                entrada["filas"], entrada["desde"], entrada["hasta"],
+            )
+
     except Exception as e:
         logger.exception("❌ Error en procesar_oro: %s", e)
-    
+
 if __name__ == "__main__":
     procesar_oro()
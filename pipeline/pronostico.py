@@ -0,0 +1,109 @@
+import re
+
+import numpy as np
+import pandas as pd
+
+# Lectura de archivos pron del SMN (pronóstico del modelo cada 3 horas, UTF-8, CRLF),
+# un bloque por estación:
+#
+#   AEROPARQUE
+#   ================================================================================
+#        FECHA *          TEMPERATURA      VIENTO      PRECIPITACION(mm)
+#                                        (DIR | KM/H)
+#   ================================================================================
+#    19/AGO/2024 00Hs.        10.8       184 |   5         0.0
+#    ...
+#   ================================================================================
+#
+# El nombre del bloque es la línea que precede a un separador "====" y usa "_" en lugar de
+# espacios; muchas veces difiere del nombre del catálogo (sin "AERO", abreviado, etc.).
+
+ENCODING = "utf-8"
+VARIABLES = ["TEMP", "DD", "FF", "PRECIP"]
+
+MESES = {
+    "ENE": 1, "FEB": 2, "MAR": 3, "ABR": 4, "MAY": 5, "JUN": 6,
+    "JUL": 7, "AGO": 8, "SEP": 9, "OCT": 10, "NOV": 11, "DIC": 12,
+}
+
+FILA = re.compile(
+    r"^\s*(\d{2})/([A-Z]{3})/(\d{4})\s+(\d{2})Hs\.\s+(-?\d+\.\d)\s+(-?\d+)\s*\|\s*(\d+)\s+(\d+\.\d)"
+)
+
+# Nombres del pronóstico que no se resuelven agregando o quitando "AERO"
+ALIAS = {
+    "BUENOS AIRES": "BUENOS AIRES OBSERVATORIO",
+    "ESC.AVIACION MILITAR AERO": "ESCUELA DE AVIACION MILITAR AERO",
+    "LA QUIACA OBS": "LA QUIACA OBSERVATORIO",
+    "PCIA. ROQUE SAENZ PEÑA AERO": "PRESIDENCIA ROQUE SAENZ PEÑA AERO",
+    "PILAR OBS": "PILAR OBSERVATORIO",
+    "PUNTA INDIO B.A": "PUNTA INDIO B.A.",
+    "VILLA MARIA DEL RIO SECO": "VILLA DE MARIA DEL RIO SECO",
+}
+
+# Valores imposibles que el modelo usa como faltantes (p. ej. -274.2 ºC, -303º)
+TEMP_MINIMA = -90.0
+
+
+# Nombre del bloque → nombre de la estación como figura en datohorario / catálogo
+def nombre_estacion(nombre, catalogo):
+    nombre = nombre.strip().replace("_", " ")
+    nombre = ALIAS.get(nombre, nombre)
+    if catalogo.por_nombre(nombre) is not None:
+        return nombre
+    for alternativa in (f"{nombre} AERO", nombre.removesuffix(" AERO")):
+        if catalogo.por_nombre(alternativa) is not None:
+            return alternativa
+    return nombre
+
+
+def _es_nombre(linea):
+    texto = linea.strip()
+    return bool(texto) and not texto.startswith(("=", "*", "(")) and not FILA.match(linea) and "FECHA" not in texto
+
+
+# Filas (NOMBRE, FECHA, HORA, TEMP, DD, FF, PRECIP) de un archivo, línea por línea sin cargarlo entero.
+# Con estaciones se descartan los bloques de otras estaciones sin convertir sus valores.
+def iterar_pronostico(archivo, catalogo, estaciones=None, ancho_nombre=None):
+    if estaciones is not None:
+        buscados = {str(e)[:ancho_nombre] for e in estaciones}
+
+    anterior = ""
+    estacion = None
+    incluir = False
+    with open(archivo, "r", encoding=ENCODING) as f:
+        for linea in f:
+            if linea.startswith("="):
+                # Un separador precedido por un nombre abre el bloque de una estación nueva
+                if _es_nombre(anterior):
+                    estacion = nombre_estacion(anterior, catalogo)
+                    incluir = estaciones is None or estacion[:ancho_nombre] in buscados
+            elif incluir:
+                fila = FILA.match(linea)
+                if fila:
+                    dia, mes, anio, hora, temp, dd, ff, precip = fila.groups()
+                    yield (
+                        estacion,
+                        f"{anio}-{MESES[mes]:02d}-{dia}",
+                        int(hora),
+                        float(temp),
+                        int(dd),
+                        int(ff),
+                        float(precip),
+                    )
+            anterior = linea
+
+
+# Lectura de un archivo pron en columnas tipadas: NOMBRE, FECHA (datetime64), HORA (int),
+# TEMP, DD, FF y PRECIP (float64, NaN si el valor es imposible)
+def leer_pronostico(archivo, catalogo, estaciones=None, ancho_nombre=None):
+    df = pd.DataFrame(
+        iterar_pronostico(archivo, catalogo, estaciones, ancho_nombre),
+        columns=["NOMBRE", "FECHA", "HORA", *VARIABLES],
+    )
+    df["FECHA"] = pd.to_datetime(df["FECHA"], format="%Y-%m-%d")
+    df["HORA"] = df["HORA"].astype("int64")
+    df[VARIABLES] = df[VARIABLES].astype("float64")
+    df.loc[df["TEMP"] < TEMP_MINIMA, "TEMP"] = np.nan
+    df.loc[~df["DD"].between(0, 360), "DD"] = np.nan
+    return df[["FECHA", "HORA", *VARIABLES, "NOMBRE"]]
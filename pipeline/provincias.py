@@ -0,0 +1,129 @@
+import argparse
+import logging
+import os
+import subprocess
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from pathlib import Path
+
+import metricas
+
+# Configuración de logs
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger("uvicorn")
+
+# Varias provincias en una sola pasada. Con PROVINCIAS (lista separada por comas, en lugar de
+# PROVINCIA_OBJETIVO) cada archivo datohorario se lee una sola vez con las estaciones de todas ellas
+# y sus filas se reparten por provincia según el catálogo de estaciones. Las provincias comparten
+# los datasets de Plata y Oro, con PROVINCIA como primera columna de partición:
+#
+#   data/plata/horario_final/PROVINCIA=<provincia>/NOMBRE=<estacion>/MES=<AAAA-MM>/
+#   data/oro/diario/PROVINCIA=<provincia>/ESTACION=<estacion>/ANIO=<AAAA>/
+#
+# y los demás archivos de cada provincia (Bronce, estado de Plata, cobertura, diccionario,
+# manifiesto de Oro) van en una carpeta PROVINCIA=<provincia> dentro de la que usan con una sola
+# provincia (data/bronce/PROVINCIA=<provincia>/, data/plata/PROVINCIA=<provincia>/, ...).
+#
+# Plata y Oro corren para cada provincia en un proceso aparte, hasta PROVINCIAS_WORKERS provincias
+# a la vez. El proceso recibe su provincia en PROVINCIA_PROCESO, y los pipelines agregan
+# PARTICION_PROCESO a sus rutas al importarse. Las métricas de todas van al etapas.jsonl
+# principal, bajo la etapa provincia.<provincia>.
+BASE_DIR = Path(".").resolve()
+BRONCE_DIR = BASE_DIR / "data" / "bronce"
+
+PROVINCIAS = [provincia.strip().upper() for provincia in os.getenv("PROVINCIAS", "").split(",") if provincia.strip()]
+MULTIPROVINCIA = bool(PROVINCIAS)
+PROVINCIAS_WORKERS = int(os.getenv("PROVINCIAS_WORKERS", str(min(len(PROVINCIAS) or 1, os.cpu_count() or 1))))
+PROVINCIA_PROCESO = os.getenv("PROVINCIA_PROCESO", "").strip().upper()
+
+
+# Clave de la provincia en las rutas: minúsculas y "_" en lugar de espacios, como las estaciones de Bronce
+def clave_provincia(provincia):
+    return str(provincia).strip().lower().replace(" ", "_")
+
+
+# Carpeta de la provincia en un dataset particionado (o en un directorio de datos)
+def particion_provincia(provincia):
+    return f"PROVINCIA={clave_provincia(provincia)}"
+
+
+# Carpeta del proceso de una provincia; vacía fuera de provincias.py (las rutas no cambian)
+PARTICION_PROCESO = particion_provincia(PROVINCIA_PROCESO) if PROVINCIA_PROCESO else ""
+
+
+def bronce_provincia(provincia):
+    return BRONCE_DIR / particion_provincia(provincia)
+
+
+## Plata y Oro de una provincia (en el proceso hijo, con PROVINCIA_PROCESO)
+
+def procesar_provincia(provincia):
+    from pipeline_02_bronce_to_plata import procesar_plata_incremental
+    from pipeline_03_plata_to_oro import procesar_oro
+
+    with metricas.etapa(f"provincia.{clave_provincia(provincia)}"):
+        plata = procesar_plata_incremental()
+        if plata is not None:
+            procesar_oro(plata)
+
+
+## Pool de procesos por provincia (proceso principal)
+
+# Un proceso nuevo por provincia (y no un pool reutilizable): las rutas se fijan al importar los pipelines
+def correr_provincia(provincia):
+    entorno = {**os.environ, "PROVINCIA_OBJETIVO": provincia, "PROVINCIA_PROCESO": provincia}
+    entorno.pop("PROVINCIAS", None)
+    t0 = time.perf_counter()
+    proceso = subprocess.run([sys.executable, str(Path(__file__).resolve()), "--provincia", provincia], env=entorno)
+    return proceso.returncode, time.perf_counter() - t0
+
+
+# Plata y Oro de cada provincia, a lo sumo workers a la vez; devuelve {provincia: True si terminó bien}
+def procesar_provincias(provincias=None, workers=None):
+    provincias = provincias or PROVINCIAS
+    workers = min(workers or PROVINCIAS_WORKERS, len(provincias))
+    logger.info(f"🗺️ Plata y Oro de {len(provincias)} provincias con {workers} procesos: {provincias}")
+
+    resultados = {}
+    t0 = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        futuros = {pool.submit(correr_provincia, provincia): provincia for provincia in provincias}
+        for futuro in as_completed(futuros):
+            provincia = futuros[futuro]
+            try:
+                codigo, segundos = futuro.result()
+            except OSError as e:
+                logger.error(f"❌ {provincia}: no se pudo iniciar el proceso: {e}")
+                resultados[provincia] = False
+                continue
+            resultados[provincia] = codigo == 0
+            if codigo == 0:
+                logger.info(f"✅ {provincia}: Plata y Oro en {segundos:.1f} s")
+            else:
+                logger.error(f"❌ {provincia}: Plata y Oro terminaron con código {codigo} ({segundos:.1f} s)")
+
+    logger.info(
+        f"🏁 Provincias: {sum(resultados.values())}/{len(provincias)} correctas en {time.perf_counter() - t0:.1f} s"
+    )
+    return resultados
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Plata y Oro por provincia (PROVINCIAS), en procesos en paralelo")
+    parser.add_argument("--provincias", help="Lista separada por comas (por defecto, PROVINCIAS)")
+    parser.add_argument("--workers", type=int, help="Provincias procesadas a la vez (por defecto, PROVINCIAS_WORKERS)")
+    parser.add_argument("--provincia", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    # Proceso hijo: una sola provincia
+    if args.provincia:
+        if clave_provincia(args.provincia) != clave_provincia(PROVINCIA_PROCESO):
+            raise SystemExit("❌ --provincia se usa con PROVINCIA_PROCESO de la misma provincia (lo fija correr_provincia)")
+        procesar_provincia(args.provincia)
+    else:
+        provincias = [p.strip().upper() for p in args.provincias.split(",") if p.strip()] if args.provincias else PROVINCIAS
+        if not provincias:
+            raise SystemExit("❌ No hay provincias: definir PROVINCIAS o usar --provincias")
+        resultados = procesar_provincias(provincias, args.workers)
+        sys.exit(0 if all(resultados.values()) else 1)
@@ -0,0 +1,136 @@
+import re
+
+import pandas as pd
+
+# Lectura de archivos radsolar del SMN (irradiancia solar minuto a minuto, CSV con encabezado):
+#
+#   TIMESTAMP,Global BsAs [W/m2],Difusa BsAs [W/m2],Global Ush [W/m2],Difusa Ush [W/m2]
+#   2024-08-05 00:00:00,-1.736,-1.988,-0.602,-0.382
+#
+# Un archivo por día (1440 filas) con las series Global y Difusa de cada sitio. La medianoche a
+# veces viene solo con la fecha ("2024-08-07") y hay minutos repetidos (la misma fila dos veces
+# seguidas), que se descartan. TIMESTAMP está en UTC (el máximo de irradiancia cae a las 15-16 h):
+# se pasa a hora local, la de la grilla de datohorario, para que los agregados horarios se
+# crucen por NOMBRE y FECHA_HORA sin desfase. El archivo se lee por bloques de FILAS_POR_BLOQUE
+# filas, sin cargarlo entero, y cada bloque sale en formato largo: FECHA_HORA, NOMBRE, GLOBAL, DIFUSA.
+
+ENCODING = "latin1"
+FILAS_POR_BLOQUE = 50_000
+ZONA_HORARIA = "America/Argentina/Buenos_Aires"
+
+# Encabezado de cada serie: "<Global|Difusa> <sitio> [W/m2]"
+SERIE = re.compile(r"^(Global|Difusa)\s+(\S+)\s+\[W/m2\]$", re.IGNORECASE)
+VARIABLES = ["GLOBAL", "DIFUSA"]
+
+# Sitio del encabezado → estación del catálogo (el nombre de datohorario), para cruzar los
+# agregados con la grilla horaria. Los sitios que no están acá conservan su nombre.
+ESTACIONES_SITIO = {
+    "BSAS": "BUENOS AIRES OBSERVATORIO",
+    "USH": "USHUAIA AERO",
+}
+
+# Minutos por muestra: la energía de cada minuto es W/m² × 1/60 h (Wh/m²)
+MINUTOS_POR_MUESTRA = 1
+
+
+# Columnas de cada sitio: {estación: {"GLOBAL": columna, "DIFUSA": columna}}
+def series_por_estacion(columnas):
+    series = {}
+    for columna in columnas:
+        coincidencia = SERIE.match(str(columna).strip())
+        if coincidencia is None:
+            continue
+        variable, sitio = coincidencia.groups()
+        estacion = ESTACIONES_SITIO.get(sitio.upper(), sitio.upper())
+        series.setdefault(estacion, {})[variable.upper()] = columna
+    return series
+
+
+# Bloques tipados de un archivo radsolar: FECHA_HORA (datetime64), NOMBRE y GLOBAL/DIFUSA (float64)
+def iterar_radiacion(archivo, filas_por_bloque=FILAS_POR_BLOQUE):
+    ultimo = None
+    with pd.read_csv(archivo, encoding=ENCODING, chunksize=filas_por_bloque, dtype=str) as lector:
+        for bloque in lector:
+            fechas = pd.to_datetime(bloque.iloc[:, 0].str.strip(), format="ISO8601", errors="coerce", utc=True)
+            fechas = fechas.dt.tz_convert(ZONA_HORARIA).dt.tz_localize(None)
+            # Sin fecha, repetidas dentro del bloque o en el borde con el bloque anterior
+            validas = fechas.notna() & ~fechas.duplicated()
+            if ultimo is not None:
+                validas &= fechas > ultimo
+            if not validas.any():
+                continue
+            ultimo = fechas[validas].max() if ultimo is None else max(ultimo, fechas[validas].max())
+
+            partes = []
+            for estacion, columnas in series_por_estacion(bloque.columns).items():
+                partes.append(pd.DataFrame({
+                    "FECHA_HORA": fechas[validas],
+                    "NOMBRE": estacion,
+                    **{
+                        variable: pd.to_numeric(bloque.loc[validas, columnas[variable]], errors="coerce")
+                        if variable in columnas else float("nan")
+                        for variable in VARIABLES
+                    },
+                }))
+            if partes:
+                yield pd.concat(partes, ignore_index=True)
+
+
+class AgregadoRadiacion:
+    """Media, máximo y energía integrada por estación y hora, acumulados bloque a bloque.
+
+    De cada bloque se guardan solo sumas, conteos y máximos por hora, así que la memoria depende
+    de las horas cubiertas y no de los minutos. Los valores negativos (el offset nocturno del
+    piranómetro) cuentan como 0.
+    """
+
+    def __init__(self):
+        self.parciales = []
+
+    def agregar(self, df):
+        valores = df[VARIABLES].clip(lower=0)
+        grupos = valores.groupby([df["NOMBRE"], df["FECHA_HORA"].dt.floor("h")])
+        self.parciales.append(pd.concat({"SUMA": grupos.sum(), "MINUTOS": grupos.count(), "MAX": grupos.max()}, axis=1))
+
+    # Agregado horario: NOMBRE, FECHA_HORA (inicio de la hora), FECHA, HORA y por variable
+    # <VAR>_MEAN/_MAX (W/m²), <VAR>_ENERGIA (Wh/m²) y <VAR>_MINUTOS (minutos con dato)
+    def horario(self):
+        if not self.parciales:
+            return pd.DataFrame(columns=["NOMBRE", "FECHA_HORA", "FECHA", "HORA"] + COLUMNAS_AGREGADAS)
+        todo = pd.concat(self.parciales).rename_axis(["NOMBRE", "FECHA_HORA"])
+        df = _agregadas(todo.groupby(level=[0, 1]).agg({col: "max" if col[0] == "MAX" else "sum" for col in todo.columns}))
+        df = df.reset_index()
+        df.insert(2, "FECHA", df["FECHA_HORA"].dt.normalize())
+        df.insert(3, "HORA", df["FECHA_HORA"].dt.hour.astype("int8"))
+        return df
+
+
+COLUMNAS_AGREGADAS = [
+    f"{variable}_{medida}" for variable in VARIABLES for medida in ("MEAN", "MAX", "ENERGIA", "MINUTOS")
+]
+
+
+# Columnas publicadas a partir de sumas, conteos y máximos por variable
+def _agregadas(parciales):
+    df = pd.DataFrame(index=parciales.index)
+    for variable in VARIABLES:
+        suma, minutos = parciales[("SUMA", variable)], parciales[("MINUTOS", variable)]
+        df[f"{variable}_MEAN"] = suma / minutos.where(minutos > 0)
+        df[f"{variable}_MAX"] = parciales[("MAX", variable)]
+        df[f"{variable}_ENERGIA"] = suma * MINUTOS_POR_MUESTRA / 60
+        df[f"{variable}_MINUTOS"] = minutos.astype("int64")
+    return df
+
+
+# Agregado diario (NOMBRE, FECHA y las mismas columnas que el horario) a partir de filas horarias.
+# Un día local abarca dos archivos (TIMESTAMP en UTC), así que se recalcula con las horas de ambos.
+def diario_desde_horario(horario):
+    parciales = {}
+    for variable in VARIABLES:
+        parciales[("SUMA", variable)] = horario[f"{variable}_ENERGIA"].astype("float64") * 60 / MINUTOS_POR_MUESTRA
+        parciales[("MINUTOS", variable)] = horario[f"{variable}_MINUTOS"]
+        parciales[("MAX", variable)] = horario[f"{variable}_MAX"]
+    parciales = pd.DataFrame(parciales)
+    claves = [horario["NOMBRE"].astype(str), horario["FECHA"]]
+    diario = parciales.groupby(claves).agg({col: "max" if col[0] == "MAX" else "sum" for col in parciales.columns})
+    return _agregadas(diario).reset_index()
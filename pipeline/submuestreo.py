@@ -0,0 +1,48 @@
+import numpy as np
+
+# Submuestreo de series temporales para gráficos: Largest-Triangle-Three-Buckets (LTTB).
+# Conserva el primer y el último punto y, en cada tramo intermedio, el punto que forma el
+# triángulo de mayor área con el elegido en el tramo anterior y el promedio del tramo siguiente,
+# así los picos y valles sobreviven aunque se descarte la mayoría de los puntos.
+
+
+# Índices (ordenados) de los puntos que LTTB conserva de la serie (x, y). Los NaN de y se ignoran.
+def indices_lttb(x, y, puntos):
+    x = np.asarray(x, dtype="float64")
+    y = np.asarray(y, dtype="float64")
+    validos = np.flatnonzero(~np.isnan(y))
+    n = len(validos)
+    if n <= puntos:
+        return validos
+    if puntos < 3:
+        return validos[[0, n - 1]][:max(puntos, 0)]
+
+    xv, yv = x[validos], y[validos]
+    # Tramos intermedios: los puntos 1..n-2 repartidos en puntos-2 tramos
+    bordes = np.floor(np.linspace(1, n - 1, puntos - 1)).astype(int)
+    elegidos = np.empty(puntos, dtype=int)
+    elegidos[0], elegidos[-1] = 0, n - 1
+
+    anterior = 0
+    for i in range(puntos - 2):
+        inicio, fin = bordes[i], bordes[i + 1]
+        # Promedio del tramo siguiente (el último punto para el último tramo)
+        sig_inicio, sig_fin = fin, bordes[i + 2] if i + 2 < len(bordes) else n
+        x_sig, y_sig = xv[sig_inicio:sig_fin].mean(), yv[sig_inicio:sig_fin].mean()
+
+        areas = np.abs(
+            (xv[anterior] - x_sig) * (yv[inicio:fin] - yv[anterior])
+            - (xv[anterior] - xv[inicio:fin]) * (y_sig - yv[anterior])
+        )
+        anterior = inicio + int(np.argmax(areas))
+        elegidos[i + 1] = anterior
+
+    return validos[elegidos]
+
+
+# Filas a conservar de una tabla con varias variables: la unión de LTTB de cada una, repartiendo
+# el total de puntos entre ellas para que el resultado no supere puntos filas
+def filas_lttb(x, columnas, puntos):
+    por_variable = max(3, puntos // max(len(columnas), 1))
+    filas = [indices_lttb(x, y, por_variable) for y in columnas]
+    return np.unique(np.concatenate(filas)) if filas else np.arange(0)